@@ -1,6 +1,11 @@
+import os
 import sys
+import time
+import json
 import logging
 
+import numpy as np
+
 import ANNarchy_future.api as api
 import ANNarchy_future.generator as generator
 
@@ -42,6 +47,11 @@ class Network(object):
 
         When `logfile` is specified, the logging messages will be saved in that file instead of stdout.
 
+        Random variables are drawn with a counter-based generator (Philox4x32-10) keyed by the `seed`: 
+        each number only depends on the population, the neuron, the random variable and the step, so a 
+        seeded network gives the same results with any backend, number of threads or loop fusion. 
+        With `seed=-1`, the key is taken from the current time.
+
         Args:
             dt: simulation step size in ms. 
             seed: seed for the random number generators.
@@ -87,6 +97,22 @@ class Network(object):
         # Communicator
         self._interface = None
 
+        # Monitored attributes
+        self._monitored = {}
+
+        # Profiling: wall time spent in step() and simulate() and number of calls
+        self._profile = False
+        self._profile_time = 0.0
+        self._profile_calls = 0
+        self._trace = 0
+
+        # Compilation settings, used by the memory estimates
+        self._precision = 'float64'
+        self._fused = False
+
+        # Checkpoint loaded before compile(): (path, state, mmap)
+        self._pending_state = None
+
     ###########################################################################
     # Interface
     ###########################################################################
@@ -151,6 +177,14 @@ class Network(object):
         """
 
         self._logger.info("Adding Projection(" + pre.name + ", " + post.name + ", " + target + ").")
+
+        if not target in post._parser.inputs or target in post._parser.shared:
+            self._logger.error("connect(): " + target + " is not an input variable of " + post.neuron_class + ".")
+            sys.exit(1)
+
+        if post._parser.dtypes[target] != 'float':
+            self._logger.error("connect(): the input variable " + target + " of " + post.neuron_class + " must have the dtype 'float'.")
+            sys.exit(1)
         
         proj = api.Projection(pre, post, target, synapse, name)
         id_proj = len(self._projections)
@@ -170,16 +204,80 @@ class Network(object):
  
     def compile(self,
         backend: str = 'single',
-        clean:bool = False):
+        clean:bool = False,
+        num_threads: int = None,
+        fused: bool = False,
+        cache: bool = True,
+        precision: str = 'float64',
+        codegen_workers: int = 1,
+        profile: bool = False,
+        trace: int = 0,
+        memory_budget: float = None):
 
         """Compiles and instantiates the network.
 
+        When `fused` is True, the random number generation, neural update, spike emission and reset 
+        of each population are performed in a single loop over the neurons instead of one loop per phase. 
+
+        With `precision='float32'`, floating-point attributes are stored and computed in single precision: 
+        the arrays take half the memory and twice as many values fit in a SIMD register. Integer and boolean 
+        attributes are not affected. The time `t` stays in double precision.
+
+        For models with many neuron and synapse types, `codegen_workers` distributes the code generation 
+        of the types over a pool of processes (`fork()` is required). The generated files are the same 
+        as with a single process.
+
+        With `profile=True`, the kernel measures the time spent in each phase of the simulation 
+        step, for each population and projection (see `profile()`). Without it, the timers are 
+        not generated at all. A positive `trace` additionally records each timed call in a ring 
+        buffer keeping the last `trace` events (32 bytes each), which can be exported with `save_trace()`.
+
+        When `memory_budget` is set, the memory needed by the populations and projections is estimated 
+        before any code is generated or allocated (see `memory_report()`) and a warning is issued if it 
+        exceeds the budget.
+
         Args:
             backend: choose between `'single'`, `'openmp'`, `'cuda'` or `'mpi'`.
-            clean: forces recompilation.
+            clean: erases the compilation folder before generating the code (use `cache=False` to force the compilation).
+            num_threads: number of threads used by the `'openmp'` backend (default: all available cores).
+            fused: fuses the neural phases into a single loop per population.
+            cache: reuses a previously compiled library from the global compilation cache (see `CompilationCache`).
+            precision: floating-point precision of the attributes, `'float64'` (default) or `'float32'`.
+            codegen_workers: number of processes generating the code of the neuron and synapse types.
+            profile: instruments the simulation step with timers.
+            trace: number of events kept by the trace recorder (implies `profile=True`).
+            memory_budget: memory in MB above which a warning is issued.
         """
 
         self._backend = backend
+        self._num_threads = num_threads
+
+        if not isinstance(trace, int) or trace < 0:
+            self._logger.error("compile(): trace must be a non-negative integer.")
+            sys.exit(1)
+
+        self._trace = trace
+        self._profile = profile or trace > 0
+        self._profile_time = 0.0
+        self._profile_calls = 0
+
+        if num_threads is not None and backend != 'openmp':
+            self._logger.warning("compile(): num_threads is only used by the openmp backend.")
+
+        if not precision in ['float64', 'float32']:
+            self._logger.error("compile(): precision must be 'float64' or 'float32'.")
+            sys.exit(1)
+
+        if not isinstance(codegen_workers, int) or codegen_workers < 1:
+            self._logger.error("compile(): codegen_workers must be a positive integer.")
+            sys.exit(1)
+
+        self._precision = precision
+        self._fused = fused
+
+        # Projected footprint, before any allocation
+        if memory_budget is not None:
+            self._check_memory_budget(memory_budget)
 
         # Gather all parsed information
         self._description = self._gather_generated_code()
@@ -188,7 +286,12 @@ class Network(object):
         self._compiler = generator.Compiler(
             self,
             backend=backend,
-            clean=clean
+            clean=clean,
+            fused=fused,
+            cache=cache,
+            precision=precision,
+            workers=codegen_workers,
+            profile=self._profile,
         )
 
         # Code generation
@@ -209,7 +312,28 @@ class Network(object):
             self._logger.error("step(): the network is not compiled yet.")
             sys.exit(1)
 
-        self._interface.step()
+        if self._profile:
+            tstart = time.perf_counter()
+            self._interface.step()
+            self._profile_time += time.perf_counter() - tstart
+            self._profile_calls += 1
+        else:
+            self._interface.step()
+
+    def set_num_threads(self, num_threads:int):
+        """Sets the number of threads used by the `'openmp'` backend.
+
+        Args:
+
+            num_threads: number of threads.
+
+        """
+        if self._interface is None:
+            self._logger.error("set_num_threads(): the network is not compiled yet.")
+            sys.exit(1)
+
+        self._num_threads = num_threads
+        self._interface.set_num_threads(num_threads)
 
     def simulate(self, duration:float):
         """Simulates for the specified duration in ms.
@@ -223,33 +347,534 @@ class Network(object):
             self._logger.error("step(): the network is not compiled yet.")
             sys.exit(1)
 
-        self._interface.simulate(int(duration/self.dt))
+        if self._profile:
+            tstart = time.perf_counter()
+            self._interface.simulate(int(duration/self.dt))
+            self._profile_time += time.perf_counter() - tstart
+            self._profile_calls += 1
+        else:
+            self._interface.simulate(int(duration/self.dt))
+
+    ###########################################################################
+    # Profiling
+    ###########################################################################
+
+    def profile(self, reset:bool = False) -> dict:
+        """Returns the time spent in each phase of the simulation since the compilation.
+
+        The network must be compiled with `profile=True`:
+
+        ```python
+        net.compile(profile=True)
+        net.simulate(1000.)
+        profile = net.profile()
+        for phase, objects in profile.items():
+            for name, entry in objects.items():
+                print(phase, name, entry['time'], entry['calls'])
+        ```
+
+        The phases are `'rng'`, `'reset_inputs'`, `'update'`, `'spike'`, `'reset'` (or `'fused_update'`) 
+        for the populations, `'collect_inputs'` and `'synaptic_update'` for the projections, `'record'` 
+        and `'reserve'` (preallocation of the buffers in `simulate()`) for the monitors and `'step'` 
+        for the whole simulation steps. The phase `'python'` is the time 
+        spent in `step()` and `simulate()` outside of the simulation steps of the kernel.
+
+        Args:
+
+            reset: sets the accumulated times and counts to zero after reading them.
+
+        Returns:
+
+            a dictionary (phase -> dictionary (name -> {'time': seconds, 'calls': number of calls})), 
+            where names are the ones of the populations and projections, `'monitors'` or `'network'`.
+        """
+
+        if self._interface is None:
+            self._logger.error("profile(): the network is not compiled yet.")
+            sys.exit(1)
+
+        if not self._profile:
+            self._logger.error("profile(): the network must be compiled with profile=True.")
+            sys.exit(1)
+
+        containers = self._profiled_objects()
+
+        profile = {}
+        for phase, kind, type_name, times, calls in self._interface.get_profile():
+            for rank, name in enumerate(containers.get((kind, type_name), [type_name])):
+                profile.setdefault(phase, {})[name] = {
+                    'time': times[rank] if rank < len(times) else 0.0,
+                    'calls': calls[rank] if rank < len(calls) else 0,
+                }
+
+        # Overhead of the Python calls
+        step_time = sum(entry['time'] for entry in profile.get('step', {}).values())
+        profile['python'] = {'network': {
+            'time': max(0.0, self._profile_time - step_time), 
+            'calls': self._profile_calls
+        }}
+
+        if reset:
+            self._interface.reset_profile()
+            self._profile_time = 0.0
+            self._profile_calls = 0
+
+        return profile
+
+    def save_trace(self, filename:str, clear:bool = False):
+        """Saves the events of the trace recorder in the Chrome trace event format.
+
+        The network must be compiled with a positive `trace`. Only the last events fitting in the ring buffer 
+        are kept. The file can be opened in `chrome://tracing` or https://ui.perfetto.dev, where each phase 
+        of each population or projection appears as a slice nested in its simulation step:
+
+        ```python
+        net.compile(trace=100000)
+        net.simulate(1000.)
+        net.save_trace("trace.json")
+        ```
+
+        Args:
+
+            filename: path to the JSON file.
+            clear: removes the saved events from the ring buffer.
+        """
+
+        if self._interface is None:
+            self._logger.error("save_trace(): the network is not compiled yet.")
+            sys.exit(1)
+
+        if self._trace == 0:
+            self._logger.error("save_trace(): the network must be compiled with a positive trace.")
+            sys.exit(1)
+
+        containers = self._profiled_objects()
+        sites = [
+            (phase, kind, containers.get((kind, type_name), [type_name]))
+            for phase, kind, type_name, _, _ in self._interface.get_profile()
+        ]
+
+        events = [
+            {'name': 'process_name', 'ph': 'M', 'pid': 0, 'tid': 0, 'args': {'name': 'ANNarchy'}},
+        ]
+        for site, rank, start, duration in self._interface.get_trace():
+            phase, kind, names = sites[site]
+            name = names[rank] if rank < len(names) else names[-1]
+            events.append({
+                'name': phase if kind == 'network' else phase + " (" + name + ")",
+                'cat': kind,
+                'ph': 'X',
+                'ts': 1e6 * start,
+                'dur': 1e6 * duration,
+                'pid': 0,
+                'tid': 0,
+                'args': {'object': name},
+            })
+
+        with open(filename, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+        if clear:
+            self._interface.clear_trace()
 
     ###########################################################################
     # Monitor
     ###########################################################################
 
     def monitor(self, variables:dict):
+        """Records attributes of populations during the following simulations.
+
+        ```python
+        net.monitor({pop: ['v', 'r']})
+        net.simulate(1000.)
+        data = net.get_monitored()
+        v = data[pop]['v'] # (10000, pop.size) array
+        ```
+
+        Recording is performed by the C++ kernel in buffers preallocated by each call to `simulate()`.
+        Calling `monitor()` again replaces the previous monitors and their recordings.
+
+        Args:
+
+            variables: dictionary (population -> list of attribute names).
+        """
 
         if self._interface is None:
             self._logger.error("monitor(): the network is not compiled yet.")
             sys.exit(1)
 
-        self._monitored = variables
+        monitored = {}
+        for pop, attributes in variables.items():
+            if not pop in self._populations:
+                self._logger.error("monitor(): " + str(pop.name) + " does not belong to the network.")
+                sys.exit(1)
+            if isinstance(attributes, str):
+                attributes = [attributes]
+            for attr in attributes:
+                if not attr in pop.attributes:
+                    self._logger.error("monitor(): " + pop.name + " has no attribute " + attr + ".")
+                    sys.exit(1)
+            monitored[pop] = list(attributes)
+
+        self._monitored = monitored
 
         self._interface.monitor(self._monitored)
 
-    def get_monitored(self):
+    def get_monitored(self) -> dict:
+        """Returns the attributes recorded since the call to `monitor()`.
+
+        Returns:
+
+            a dictionary (population -> dictionary (attribute -> array)). Arrays have the shape (time, neurons), 
+            or (time,) for shared attributes.
+        """
 
         if self._interface is None:
-            self._logger.error("monitor(): the network is not compiled yet.")
+            self._logger.error("get_monitored(): the network is not compiled yet.")
+            sys.exit(1)
+
+        return dict(zip(self._monitored.keys(), self._interface.get_monitored()))
+
+    ###########################################################################
+    # Memory
+    ###########################################################################
+
+    def memory_report(self, precision:str = None, fused:bool = None) -> dict:
+        """Returns the memory used by each population, projection and monitor of the network.
+
+        Before `compile()`, the sizes are estimated from the number of neurons, the types of the attributes 
+        and the expected number of synapses of the connectors. After `compile()`, they are also measured 
+        in the kernel (allocated capacity of the arrays). Monitors only exist after `compile()`: their estimate 
+        corresponds to the recorded steps.
+
+        ```python
+        report = net.memory_report()
+        for name, items in report.items():
+            total = sum(item['estimated'] for item in items.values())
+            print(name, total / 1024**2, "MB")
+        ```
+
+        Args:
+
+            precision: floating-point precision of the estimates, `'float64'` or `'float32'` 
+                (default: the one passed to `compile()`, `'float64'` before).
+            fused: whether the neural phases are fused (default: the value passed to `compile()`).
+
+        Returns:
+
+            a dictionary (object name -> dictionary (item -> {'kind', 'estimated', 'measured'})). Items are 
+            the attributes, the buffered random variables, the connectivity and the internal arrays, of kind 
+            `'attribute'`, `'random'`, `'connectivity'`, `'monitor'` or `'internal'`. Sizes are in bytes, 
+            `'measured'` is None before `compile()`.
+        """
+
+        precision = self._precision if precision is None else precision
+        fused = self._fused if fused is None else fused
+
+        def merge(estimated:dict, measured:dict) -> dict:
+            items = {}
+            for name, (kind, size) in estimated.items():
+                items[name] = {'kind': kind, 'estimated': size, 
+                    'measured': measured.get(name, 0) if measured is not None else None}
+            if measured is not None:
+                for name, size in measured.items():
+                    if not name in items:
+                        items[name] = {'kind': 'internal', 'estimated': 0, 'measured': size}
+            return items
+
+        report = {}
+
+        for pop in self._populations:
+            measured = self._interface.population_memory(pop._id_pop) if self._interface is not None else None
+            report[pop.name] = merge(pop._memory_estimate(precision, fused), measured)
+
+        for proj in self._projections:
+            measured = self._interface.projection_memory(proj.id_proj) if self._interface is not None else None
+            report[proj.name] = merge(proj._memory_estimate(precision), measured)
+
+        if self._interface is not None:
+            for pop, (nb_steps, measured) in zip(self._monitored.keys(), self._interface.monitor_memory()):
+                estimated = {}
+                for attr in self._monitored[pop]:
+                    itemsize = generator.type_sizes[generator.attribute_type(pop._parser.dtypes[attr], precision)]
+                    size = 1 if attr in pop._parser.shared else pop.size
+                    estimated[attr] = ('monitor', nb_steps * size * itemsize)
+                report["Monitor (" + pop.name + ")"] = merge(estimated, measured)
+
+        return report
+
+    def _check_memory_budget(self, memory_budget:float):
+        "Warns if the estimated memory of the populations and projections exceeds the budget (in MB)."
+
+        items = []
+        for name, report in self.memory_report().items():
+            for item, entry in report.items():
+                items.append((entry['estimated'], name, item))
+
+        total = sum(size for size, _, _ in items)
+        if total <= memory_budget * 1024**2:
+            return
+
+        largest = ""
+        for size, name, item in sorted(items, reverse=True)[:5]:
+            largest += "\n    " + name + ", " + item + ": {:.1f} MB".format(size / 1024**2)
+
+        self._logger.warning("compile(): the network is estimated to use {:.1f} MB, more than the budget of {:.1f} MB. ".format(
+            total / 1024**2, memory_budget) + "Largest arrays:" + largest)
+
+    ###########################################################################
+    # Checkpoints
+    ###########################################################################
+
+    def save_state(self, path:str):
+        """Saves the complete state of the network in the directory `path`.
+
+        The state contains the attributes of all populations and projections, the connectivity of 
+        the projections, the last spikes of the spiking populations, the time `t` and the state of the 
+        random streams. Each array is written directly from the memory of the kernel in a NumPy `.npy` 
+        file, the description of the network in `state.json`:
+
+        ```python
+        net.simulate(1000.)
+        net.save_state("checkpoint")
+        ```
+
+        `state.json` is written last, so that an interrupted save never leaves a complete-looking checkpoint. 
+        Monitors and their recordings are not saved.
+
+        Args:
+            path: directory of the checkpoint, created if needed. Existing files are overwritten.
+        """
+
+        if self._interface is None:
+            self._logger.error("save_state(): the network is not compiled yet.")
+            sys.exit(1)
+
+        os.makedirs(path, exist_ok=True)
+
+        # Invalidate a previous checkpoint in the same directory before overwriting its arrays
+        description = os.path.join(path, "state.json")
+        if os.path.exists(description):
+            os.remove(description)
+
+        def save(name:str, value):
+            np.save(os.path.join(path, name + ".npy"), np.asarray(value))
+
+        t, steps, rng_key = self._interface.get_clock()
+
+        state = {
+            'version': 1,
+            'dt': self.dt,
+            't': t,
+            'steps': steps,
+            'seed': self.seed,
+            'rng_key': rng_key,
+            'precision': self._precision,
+            'populations': [],
+            'projections': [],
+        }
+
+        for pop in self._populations:
+            for attr in pop.attributes:
+                save("population_" + str(pop._id_pop) + "_" + attr, self._interface.population_get(pop._id_pop, attr))
+            if pop._parser.is_spiking():
+                save("population_" + str(pop._id_pop) + "_spikes", self._interface.population_get_spikes(pop._id_pop))
+            state['populations'].append({
+                'name': pop.name,
+                'neuron_class': pop.neuron_class,
+                'size': pop.size,
+                'attributes': list(pop.attributes),
+                'spiking': pop._parser.is_spiking(),
+            })
+
+        for proj in self._projections:
+            row_ptr, col_idx = self._interface.projection_get_connectivity(proj.id_proj)
+            save("projection_" + str(proj.id_proj) + "_row_ptr", row_ptr)
+            save("projection_" + str(proj.id_proj) + "_col_idx", col_idx)
+            for attr in proj.attributes:
+                save("projection_" + str(proj.id_proj) + "_" + attr, self._interface.projection_get(proj.id_proj, attr))
+            state['projections'].append({
+                'name': proj.name,
+                'synapse_class': proj.synapse_class,
+                'pre': proj.pre.name,
+                'post': proj.post.name,
+                'target': proj.target,
+                'nb_synapses': int(col_idx.size),
+                'attributes': list(proj.attributes),
+            })
+
+        tmp = description + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, description)
+
+    def load_state(self, path:str, mmap:bool = True):
+        """Restores a state saved by `save_state()`.
+
+        The network must have the same populations and projections (names, types, sizes and attributes) 
+        as the saved one. The simulation resumes exactly where it was saved: the time, the last spikes 
+        and the random streams are restored, so that the following steps are the same as without the 
+        interruption.
+
+        Before `compile()`, the checkpoint is applied at the instantiation of the kernel and the connectors 
+        of the projections are not called. After `compile()`, a projection whose connectivity differs from 
+        the saved one is reallocated: NumPy views previously obtained on its attributes become invalid.
+
+        With `mmap=True`, the arrays are memory-mapped instead of being read in memory first, so that 
+        they are copied only once, directly into the kernel.
+
+        Args:
+            path: directory of the checkpoint.
+            mmap: memory-maps the arrays of the checkpoint.
+        """
+
+        description = os.path.join(path, "state.json")
+        if not os.path.exists(description):
+            self._logger.error("load_state(): " + description + " does not exist.")
             sys.exit(1)
 
-        return self._interface.get_monitored()
+        with open(description, 'r') as f:
+            state = json.load(f)
+
+        self._check_state(state)
+
+        if self._interface is None:
+            self._pending_state = (path, state, mmap)
+            return
+
+        self._restore_state(path, state, mmap)
+
+    def snapshot(self):
+        """Copies the complete state of the network inside the kernel and returns a handle on the copy.
+
+        Unlike `save_state()`, nothing leaves the kernel: each array is copied in C++ memory. 
+        The copy is freed when the handle is deleted. It is meant for repeated trials starting 
+        from the same state:
+
+        ```python
+        initial = net.snapshot()
+        for trial in range(1000):
+            net.restore(initial, include_weights=False)
+            net.simulate(100.)
+        ```
+
+        Returns:
+
+            an opaque handle to pass to `restore()`.
+        """
+
+        if self._interface is None:
+            self._logger.error("snapshot(): the network is not compiled yet.")
+            sys.exit(1)
+
+        return self._interface.snapshot()
+
+    def restore(self, snapshot, include_weights:bool = True, seed:int = None):
+        """Restores the state copied by `snapshot()`.
+
+        The time, the random streams, the attributes and the last spikes of the populations are copied back 
+        in place with a single copy per array, so that existing NumPy views stay valid. With `include_weights=False`, 
+        the attributes of the projections keep their current values, e.g. to carry the learned weights 
+        over the trials.
+
+        As the random streams are restored, each trial draws the same random numbers. A different `seed` 
+        changes the key of the streams after the restoration. As in the constructor, `seed=-1` (or any 
+        negative value) takes the key from the current time, here in nanoseconds so that successive 
+        restorations get different keys.
+
+        Args:
+            snapshot: handle returned by `snapshot()`.
+            include_weights: restores the attributes of the projections.
+            seed: new key of the random streams (default: the key of the snapshot, -1: current time).
+        """
+
+        if self._interface is None:
+            self._logger.error("restore(): the network is not compiled yet.")
+            sys.exit(1)
+
+        if not self._interface.restore(snapshot, include_weights):
+            self._logger.error("restore(): the snapshot was taken by another network or before a change of the connectivity.")
+            sys.exit(1)
+
+        if seed is not None:
+            if seed < 0:
+                seed = time.time_ns()
+            t, steps, _ = self._interface.get_clock()
+            self._interface.set_clock(t, steps, seed & 0xFFFFFFFFFFFFFFFF)
 
     ###########################################################################
     # Internals
     ###########################################################################
+    def _check_state(self, state:dict):
+        "Exits if the checkpoint does not describe the same populations and projections as the network."
+
+        def mismatch(message:str):
+            self._logger.error("load_state(): " + message)
+            sys.exit(1)
+
+        if len(state['populations']) != len(self._populations) or len(state['projections']) != len(self._projections):
+            mismatch("the checkpoint has {} populations and {} projections, the network {} and {}.".format(
+                len(state['populations']), len(state['projections']), len(self._populations), len(self._projections)))
+
+        for pop, saved in zip(self._populations, state['populations']):
+            if (saved['name'], saved['neuron_class'], saved['size']) != (pop.name, pop.neuron_class, pop.size):
+                mismatch("the population " + pop.name + " does not match " + saved['name'] + " in the checkpoint.")
+            if saved['attributes'] != list(pop.attributes):
+                mismatch("the attributes of " + pop.name + " differ from the checkpoint.")
+
+        for proj, saved in zip(self._projections, state['projections']):
+            if (saved['name'], saved['synapse_class'], saved['pre'], saved['post'], saved['target']) != \
+                (proj.name, proj.synapse_class, proj.pre.name, proj.post.name, proj.target):
+                mismatch("the projection " + proj.name + " does not match " + saved['name'] + " in the checkpoint.")
+            if saved['attributes'] != list(proj.attributes):
+                mismatch("the attributes of " + proj.name + " differ from the checkpoint.")
+
+        if state['dt'] != self.dt:
+            self._logger.warning("load_state(): the checkpoint was simulated with dt=" + str(state['dt']) + ".")
+
+    def _restore_state(self, path:str, state:dict, mmap:bool):
+        "Copies the arrays of a checkpoint into the kernel."
+
+        def load(name:str) -> np.ndarray:
+            return np.load(os.path.join(path, name + ".npy"), mmap_mode='r' if mmap else None)
+
+        def value(array:np.ndarray):
+            # Shared attributes are stored as 0-d arrays
+            return array.item() if array.ndim == 0 else array
+
+        for proj in self._projections:
+            prefix = "projection_" + str(proj.id_proj) + "_"
+            row_ptr, col_idx = load(prefix + "row_ptr"), load(prefix + "col_idx")
+            current_row_ptr, current_col_idx = self._interface.projection_get_connectivity(proj.id_proj)
+            if not (np.array_equal(row_ptr, current_row_ptr) and np.array_equal(col_idx, current_col_idx)):
+                self._interface.projection_set_connectivity(proj.id_proj, row_ptr, col_idx)
+            for attr in proj.attributes:
+                self._interface.projection_set(proj.id_proj, attr, value(load(prefix + attr)))
+
+        for pop in self._populations:
+            prefix = "population_" + str(pop._id_pop) + "_"
+            for attr in pop.attributes:
+                self._interface.population_set(pop._id_pop, attr, value(load(prefix + attr)))
+            if pop._parser.is_spiking():
+                self._interface.population_set_spikes(pop._id_pop, load(prefix + "spikes"))
+
+        self._interface.set_clock(state['t'], state['steps'], state['rng_key'])
+
+    def _profiled_objects(self) -> dict:
+        """Returns the names of the objects in each container of the kernel, in the order of their creation.
+
+        Keys are the (kind, type) tuples of the call sites of the profiler.
+        """
+
+        containers = {}
+        for pop in self._populations:
+            containers.setdefault(('population', pop.neuron_class), []).append(pop.name)
+        for proj in self._projections:
+            containers.setdefault(('projection', 
+                proj.synapse_class + "_" + proj.pre.neuron_class + "_" + proj.post.neuron_class), []).append(proj.name)
+
+        return containers
+
     def _gather_generated_code(self):
         """Returns a dictionary containing all parsed information about the network."""
 
@@ -261,8 +886,8 @@ class Network(object):
         # All declared synapse types and their parser
         description['synapses'] = self._synapse_types
 
-        # All unique tuples (synpase, pre neuron, post neuron)
-        description['projection_types'] = list(set([
+        # All unique tuples (synpase, pre neuron, post neuron), in order of creation
+        description['projection_types'] = list(dict.fromkeys([
             (proj.synapse_class, proj.pre.neuron_class, proj.post.neuron_class) for proj in self._projections
         ]))
 
@@ -274,6 +899,14 @@ class Network(object):
         # Instantiate the kernel
         self._interface.instantiate()
 
+        # Number of threads
+        if self._num_threads is not None:
+            self._interface.set_num_threads(self._num_threads)
+
+        # Ring buffer of the trace recorder
+        if self._trace > 0:
+            self._interface.set_trace(self._trace)
+
         # Create C++ populations and initialize attributes
         for pop in self._populations:
             self._interface.add_population(pop)
@@ -281,15 +914,25 @@ class Network(object):
                 self._interface.population_set(pop._id_pop, attribute, pop._flatten(attribute))
 
 
-        # Create C++ projections and initialize attributes
+        # Create C++ projections, build their connectivity and initialize attributes.
+        # The connectivity of a pending checkpoint is restored instead of calling the connectors.
         for proj in self._projections:
             self._interface.add_projection(proj)
-            #for attribute in pop.attributes:
-            #    self._interface.population_set(pop._id_pop, attribute, pop._flatten(attribute))
-
-
+            if self._pending_state is None:
+                self._interface.projection_connect(proj.id_proj, proj._connectivity())
+            for attribute in proj.attributes:
+                self._interface.projection_set(proj.id_proj, attribute, 
+                    proj._to_numpy(attribute, proj._attributes[attribute].get_value()))
 
         # Tell all objects (pop or proj) that they should use the SimulationInterface from now on.
         for pop in self._populations:
             pop._instantiated = True
-            del pop._attributes
\ No newline at end of file
+            del pop._attributes
+        for proj in self._projections:
+            proj._instantiated = True
+            del proj._attributes
+
+        # Checkpoint loaded before compile()
+        if self._pending_state is not None:
+            self._restore_state(*self._pending_state)
+            self._pending_state = None
@@ -5,7 +5,8 @@ import textwrap
 import numpy as np
 
 import ANNarchy_future.api as api
-from ..parser.NeuronParser import NeuronParser
+import ANNarchy_future.generator as generator
+import ANNarchy_future.parser.ParserCache as ParserCache
 
 class Population(object):
 
@@ -38,6 +39,10 @@ class Population(object):
     print(pop.tau) # 20.
     print(pop.r) # [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
     ```
+
+    After `compile()`, arrays are NumPy views on the memory of the simulation kernel: reading `pop.r[0]` 
+    does not copy the array, and the view reflects the following simulation steps. 
+    Use `pop.r.copy()` to keep the current values.
     """
 
     def __init__(self, 
@@ -92,21 +97,56 @@ class Population(object):
 
     def _analyse(self):
 
-        # Create the population parser
-        self._logger.debug("Creating neuron parser.")
-        self._parser = NeuronParser(self._neuron_type)
+        # Retrieve the neuron parser, shared by all populations of the same neuron type
+        self._logger.debug("Retrieving the neuron parser.")
+        self._parser = ParserCache.neuron_parser(self._neuron_type)
         
         # Retrieve attributes
-        self._parser.extract_variables()
         self.attributes = self._parser.attributes
 
         # Instantiate the attributes
         for attr in self._parser.attributes:
             self._attributes[attr] = getattr(self._neuron_type, attr)._copy()
             self._attributes[attr]._instantiate(self.shape)
-        
-        # Analyse the equations
-        self._parser.analyse_equations()
+
+    def _memory_estimate(self, precision:str = 'float64', fused:bool = False) -> dict:
+        """Estimates the bytes allocated by the population in the kernel, before or after `compile()`.
+
+        Args:
+            precision: floating-point precision of the network.
+            fused: whether the neural phases are fused.
+
+        Returns:
+            a dictionary (name -> (kind, bytes)) with the same names as the measurements of the kernel. 
+            The kind is `'attribute'`, `'random'` (buffered random variable) or `'internal'`.
+        """
+
+        memory = {}
+
+        for attr in self._parser.attributes:
+            shared = attr in self._parser.shared
+            itemsize = generator.type_sizes[generator.attribute_type(self._parser.dtypes[attr], precision, shared)]
+            memory[attr] = ('attribute', itemsize if shared else self.size * itemsize)
+
+        # Only the random variables which are not drawn inside the loops are stored
+        real = generator.type_sizes[generator.attribute_type('float', precision)]
+        for name in self._parser.buffered_random_variables(fused):
+            memory[name] = ('random', self.size * real)
+
+        # At most one spike per neuron and step
+        if self._parser.is_spiking():
+            memory['spikes'] = ('internal', self.size * generator.type_sizes['int'])
+
+        # Propagators of the exact method, in double precision
+        for block in self._parser.update_equations:
+            propagator = getattr(block, 'propagator', None)
+            if propagator is None:
+                continue
+            n = len(propagator['variables'])
+            for matrix in ['A', 'P', 'Q']:
+                memory["__" + matrix + "__" + propagator['name']] = ('internal', n * n * generator.type_sizes['double'])
+
+        return memory
 
     ###########################################################################
     # Hacks for access to attributes
@@ -182,17 +222,18 @@ class Population(object):
             if not value.shape == self.shape and not value.size == self.size:
                 self._logger.error("Shapes do not match.")
                 sys.exit(1)
-            return value.flatten()
+            return value.ravel()
 
         elif isinstance(value, list):
             value = np.array(value)
             if not value.shape == self.shape and not value.size == self.size:
                 self._logger.error("Shapes do not match.")
                 sys.exit(1)
-            return value.flatten()
+            return value.ravel()
             
         elif isinstance(value, (float, int, bool)):
-            return np.full(self.size, value)
+            # Broadcast by the kernel
+            return value
 
             
 
@@ -201,6 +242,9 @@ class Population(object):
         s += "    Name: " + self.name + "\n"
         s += "    Size: " + str(self.size) + " ; Shape: " + str(self.shape) + "\n"
         s += "    Neuron type: " + self._parser.name + "\n"
+        if self._net is not None:
+            s += "    Memory: {:.3f} MB (estimated)\n".format(
+                sum(size for _, size in self._memory_estimate(self._net._precision, self._net._fused).values()) / 1024**2)
         s += textwrap.indent(str(self._parser), '    ') + "\n"
 
         return s
\ No newline at end of file
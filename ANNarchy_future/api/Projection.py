@@ -1,14 +1,36 @@
 import sys
 import logging
 
+import numpy as np
+
 import ANNarchy_future.api as api
+import ANNarchy_future.generator as generator
 
-from ..parser.SynapseParser import SynapseParser
+import ANNarchy_future.parser.ParserCache as ParserCache
 
 class Projection(object):
     """
     Projection between two populations.
 
+    Projections should not be created explicitly, but returned by `Network.connect()`. 
+    The connectivity is then defined by one of the connector methods before `compile()`:
+
+    ```python
+    proj = net.connect(pop1, pop2, 'ge', Hebb(eta=0.01))
+    proj.fixed_probability(0.1, w=1.0)
+    ```
+
+    Projections without connector are fully connected. The synapses are stored in the 
+    compressed sparse row (CSR) format: after `compile()`, non-shared attributes are 1D arrays 
+    of `nb_synapses` values, sorted by post-synaptic and then pre-synaptic rank. These arrays 
+    are NumPy views on the memory of the simulation kernel.
+
+    Attributes:
+        pre: pre-synaptic population.
+        post: post-synaptic population.
+        target: post-synaptic variable receiving the projection.
+        name: unique name of the projection.
+        synapse_class: name of the Synapse class.
     """
     def __init__(self, 
         pre : 'api.Population', 
@@ -29,10 +51,129 @@ class Projection(object):
         # Internal stuff
         self._net = None
         self._attributes = {}
+        self._instantiated = False
+        self._connector = None
+        self._expected_synapses = None
 
         self._logger = logging.getLogger(__name__)
         self._logger.info("Projection created between " + self.pre.name + " and " + self.post.name)
 
+    ###########################################################################
+    # Connectors
+    ###########################################################################
+    def dense(self, 
+        allow_self_connections:bool = False, 
+        **attributes):
+        """Connects all pre-synaptic neurons to all post-synaptic neurons.
+
+        Args:
+            allow_self_connections: allows a neuron to connect to itself when `pre` and `post` are the same population.
+            attributes: initial value of synaptic attributes (e.g. `w=1.0`).
+        """
+
+        def rows(rng):
+            pre_ranks = np.arange(self.pre.size)
+            for post_rank in range(self.post.size):
+                if self.pre is self.post and not allow_self_connections:
+                    yield np.delete(pre_ranks, post_rank).tolist()
+                else:
+                    yield pre_ranks.tolist()
+
+        self._set_connector(rows, attributes, self.pre.size * self.post.size - self._self_connections(allow_self_connections))
+
+    def fixed_probability(self, 
+        probability:float, 
+        allow_self_connections:bool = False, 
+        **attributes):
+        """Each pre-synaptic neuron is connected to a post-synaptic neuron with the given probability.
+
+        The random draws use the seed of the network.
+
+        Args:
+            probability: connection probability.
+            allow_self_connections: allows a neuron to connect to itself when `pre` and `post` are the same population.
+            attributes: initial value of synaptic attributes (e.g. `w=1.0`).
+        """
+
+        if probability < 0.0 or probability > 1.0:
+            self._logger.error("fixed_probability(): the probability must be between 0 and 1.")
+            sys.exit(1)
+
+        def rows(rng):
+            for post_rank in range(self.post.size):
+                pre_ranks = np.flatnonzero(rng.random(self.pre.size) < probability)
+                if self.pre is self.post and not allow_self_connections:
+                    pre_ranks = pre_ranks[pre_ranks != post_rank]
+                yield pre_ranks.tolist()
+
+        self._set_connector(rows, attributes, 
+            int(probability * (self.pre.size * self.post.size - self._self_connections(allow_self_connections))))
+
+    def _self_connections(self, allow_self_connections:bool) -> int:
+        "Number of excluded self-connections."
+
+        if self.pre is self.post and not allow_self_connections:
+            return self.post.size
+        return 0
+
+    def _set_connector(self, rows, attributes:dict, expected_synapses:int):
+        "Stores the row generator, the expected number of synapses and the initial values of the attributes."
+
+        if self._instantiated:
+            self._logger.error("The connectivity of a projection can not be changed after compile().")
+            sys.exit(1)
+
+        for attr, value in attributes.items():
+            if not attr in self.attributes:
+                self._logger.error("The synapse " + self.synapse_class + " has no attribute " + attr + ".")
+                sys.exit(1)
+            setattr(self, attr, value)
+
+        self._connector = rows
+        self._expected_synapses = expected_synapses
+
+    def _connectivity(self):
+        """Returns an iterator over the rows of the connectivity matrix.
+
+        Each row is the list of pre-synaptic ranks of a post-synaptic neuron, in increasing post-synaptic rank. 
+        Rows are generated lazily so that the whole matrix never has to be stored in Python.
+        """
+
+        if self._connector is None:
+            self.dense(allow_self_connections=True)
+
+        seed = None if self._net.seed == -1 else (self._net.seed, self.id_proj)
+
+        return self._connector(np.random.default_rng(seed))
+
+    def _memory_estimate(self, precision:str = 'float64') -> dict:
+        """Estimates the bytes allocated by the projection in the kernel from the expected number of synapses.
+
+        Args:
+            precision: floating-point precision of the network.
+
+        Returns:
+            a dictionary (name -> (kind, bytes)) with the same names as the measurements of the kernel. 
+            The kind is `'attribute'` or `'connectivity'`.
+        """
+
+        # Projections without connector are fully connected
+        nnz = self._expected_synapses if self._connector is not None else self.pre.size * self.post.size
+
+        # CSR: row_ptr (size_t) and col_idx (unsigned int), CSC for spike transmission: col_ptr, row_idx and inv_idx
+        connectivity = 8 * (self.post.size + 1) + 4 * nnz
+        if self.pre._parser.is_spiking():
+            connectivity += 8 * (self.pre.size + 1) + (4 + 8) * nnz
+
+        memory = {'connectivity': ('connectivity', connectivity)}
+
+        for attr in self._parser.attributes:
+            shared = attr in self._parser.shared
+            itemsize = generator.type_sizes[generator.attribute_type(self._parser.dtypes[attr], precision, shared)]
+            memory[attr] = ('attribute', itemsize if shared else nnz * itemsize)
+
+        return memory
+
     ###########################################################################
     # Internal methods
     ###########################################################################
@@ -50,25 +191,82 @@ class Projection(object):
 
 
     def _analyse(self):
-        """Creates a SynapseParser and calls:
+        """Retrieves the SynapseParser from the parser cache, which calls if needed:
 
         * `parser.extract_variables()`
         * `parser.analyse_equations()`
 
         """
 
-        # Create the projection parser
-        self._logger.debug("Creating synapse parser.")
-        self._parser = SynapseParser(self._synapse_type, self.pre._neuron_type, self.post._neuron_type)
+        # Retrieve the synapse parser, shared by all projections of the same synapse type
+        self._logger.debug("Retrieving the synapse parser.")
+        self._parser = ParserCache.synapse_parser(self._synapse_type, self.pre._neuron_type, self.post._neuron_type)
         
         # Retrieve attributes
-        self._parser.extract_variables()
         self.attributes = self._parser.attributes
 
-        # Instantiate the attributes
+        # Copy the attributes: their size is only known once the connectivity is built
         for attr in self._parser.attributes:
             self._attributes[attr] = getattr(self._synapse_type, attr)._copy()
-            self._attributes[attr]._instantiate((10,))
-        
-        # Analyse the equations
-        self._parser.analyse_equations()
+
+    ###########################################################################
+    # Hacks for access to attributes
+    ###########################################################################
+    def __getattribute__(self, name):
+        if name in ['attributes', '_instantiated']:
+            return object.__getattribute__(self, name)
+        else:
+            if hasattr(self, 'attributes') and name in self.attributes:
+                # After compile()
+                if self._instantiated:
+                    return self._net._interface.projection_get(self.id_proj, name)
+                # Before compile()
+                else:
+                    return self._attributes[name].get_value()
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name, value):
+
+        if hasattr(self, 'attributes') and name in self.attributes:
+            # After compile()
+            if self._instantiated:
+                self._net._interface.projection_set(self.id_proj, name, self._to_numpy(name, value))
+            # Before compile()
+            else:
+                if not isinstance(value, (float, int, bool)):
+                    self._logger.error(
+                        "Synaptic attributes can only be initialized with a single value before compile().")
+                    sys.exit(1)
+                self._attributes[name].set_value(value)
+        else:
+            object.__setattr__(self, name, value)
+
+    @property
+    def nb_synapses(self) -> int:
+        "Number of synapses (only available after `compile()`)."
+        if self._net is None or self._net._interface is None:
+            self._logger.error("nb_synapses: the network is not compiled yet.")
+            sys.exit(1)
+        return self._net._interface.projection_nb_synapses(self.id_proj)
+
+    def _to_numpy(self, name, value):
+        "Processes a new value of an attribute to make sure it is shared or has one value per synapse."
+
+        if name in self._parser.shared:
+            if not isinstance(value, (float, int, bool)):
+                self._logger.error("Shared attributes expect a single value.")
+                sys.exit(1)
+
+            return value
+
+        if isinstance(value, (float, int, bool)):
+            # Broadcast by the kernel
+            return value
+
+        value = np.asarray(value).ravel()
+        if not value.size == self.nb_synapses:
+            self._logger.error("The projection has " + str(self.nb_synapses) 
+                + " synapses, " + str(value.size) + " values were provided.")
+            sys.exit(1)
+
+        return value
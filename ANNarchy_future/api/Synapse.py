@@ -8,8 +8,25 @@ from ..parser.Equations import Equations
 class Synapse(object):
     """ Abstract class defining single synapses.
 
-    TODO
+    The synaptic equations are defined in `update(s)`. The contribution of each synapse to the 
+    post-synaptic target of the projection is defined in `transmit(s)`:
 
+    ```python
+    class Hebb(Synapse):
+
+        def __init__(self, eta):
+            self.eta = self.Parameter(eta)
+            self.w = self.Variable(init=0.0)
+
+        def update(self, s):
+            s.w += s.eta * s.pre.r * s.post.r
+
+        def transmit(self, s):
+            s.target += s.w * s.pre.r
+    ```
+
+    The contributions of all synapses are summed into the target, which is reset at each step.
+    Synapses without `transmit()` do not modify the post-synaptic population.
     """
 
     def Parameter(self, 
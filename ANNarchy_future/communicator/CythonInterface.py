@@ -45,7 +45,7 @@ class CythonInterface(communicator.SimulationInterface):
 
         """
         # Create population
-        getattr(self._instance, "_add_"+ pop.neuron_class)(pop.size)
+        getattr(self._instance, "_add_"+ pop.neuron_class)(pop.size, pop._id_pop)
         
 
     def add_projection(self, proj:'api.Projection'):
@@ -54,13 +54,15 @@ class CythonInterface(communicator.SimulationInterface):
         """
         # Create projection
         getattr(self._instance, "_add_"+ proj.synapse_class + 
-            "_" + proj.pre.neuron_class + "_" + proj.post.neuron_class)(proj.pre._id_pop, proj.post._id_pop)
+            "_" + proj.pre.neuron_class + "_" + proj.post.neuron_class)(proj.pre._id_pop, proj.post._id_pop, proj.target)
         
 
     def population_get(self, id_pop:int, attribute:str) -> np.ndarray:
 
         """Returns the value of the `attribute` for the population of ID `id_pop`.
 
+        Arrays are NumPy views on the C++ storage: no copy is made.
+
         Args:
 
             id_pop: ID of the population.
@@ -72,6 +74,8 @@ class CythonInterface(communicator.SimulationInterface):
     def population_set(self, id_pop:int, attribute:str, value:np.ndarray):
 
         """Sets the value of the `attribute` to `value` for the population `id_pop`.
+
+        Arrays are copied in place into the C++ storage, single values are broadcast.
         
         Args:
 
@@ -82,6 +86,209 @@ class CythonInterface(communicator.SimulationInterface):
 
         setattr(self._instance.population(id_pop), attribute, value)
 
+    def population_get_spikes(self, id_pop:int) -> np.ndarray:
+
+        """Returns the ranks of the neurons of the spiking population `id_pop` which emitted a spike at the last step.
+
+        Args:
+
+            id_pop: ID of the population.
+        """
+
+        return self._instance.population(id_pop).spikes
+
+    def population_set_spikes(self, id_pop:int, spikes:np.ndarray):
+
+        """Sets the ranks of the neurons of the spiking population `id_pop` which emitted a spike at the last step.
+
+        Args:
+
+            id_pop: ID of the population.
+            spikes: ranks of the neurons.
+        """
+
+        self._instance.population(id_pop).spikes = spikes
+
+    def population_memory(self, id_pop:int) -> dict:
+
+        """Returns the bytes allocated by the population `id_pop`.
+
+        Args:
+
+            id_pop: ID of the population.
+
+        Returns:
+
+            a dictionary (attribute, random variable or internal array -> bytes).
+        """
+
+        return self._instance.population(id_pop).memory()
+
+    def projection_connect(self, id_proj:int, rows):
+
+        """Builds the connectivity of the projection `id_proj`.
+
+        Args:
+
+            id_proj: ID of the projection.
+            rows: iterator over the pre-synaptic ranks of each post-synaptic neuron.
+        """
+
+        self._instance.projection(id_proj).connect(rows)
+
+    def projection_get_connectivity(self, id_proj:int) -> tuple:
+
+        """Returns the connectivity of the projection `id_proj` in the CSR format.
+
+        Arrays are NumPy views on the C++ storage: no copy is made.
+
+        Args:
+
+            id_proj: ID of the projection.
+
+        Returns:
+
+            `row_ptr` (index of the first synapse of each post-synaptic neuron, size_t) and 
+            `col_idx` (rank of the pre-synaptic neuron of each synapse, uint32).
+        """
+
+        proj = self._instance.projection(id_proj)
+
+        return proj.row_ptr, proj.col_idx
+
+    def projection_set_connectivity(self, id_proj:int, row_ptr:np.ndarray, col_idx:np.ndarray):
+
+        """Replaces the connectivity of the projection `id_proj` with CSR arrays.
+
+        The synaptic attributes are reallocated: previous views on them are invalidated.
+
+        Args:
+
+            id_proj: ID of the projection.
+            row_ptr: index of the first synapse of each post-synaptic neuron.
+            col_idx: rank of the pre-synaptic neuron of each synapse.
+        """
+
+        self._instance.projection(id_proj).set_connectivity(
+            np.ascontiguousarray(row_ptr, dtype=np.uintp), 
+            np.ascontiguousarray(col_idx, dtype=np.uint32)
+        )
+
+    def projection_nb_synapses(self, id_proj:int) -> int:
+
+        """Returns the number of synapses in the projection `id_proj`.
+
+        Args:
+
+            id_proj: ID of the projection.
+        """
+
+        return self._instance.projection(id_proj).nb_synapses
+
+    def projection_memory(self, id_proj:int) -> dict:
+
+        """Returns the bytes allocated by the projection `id_proj`.
+
+        Args:
+
+            id_proj: ID of the projection.
+
+        Returns:
+
+            a dictionary (attribute or `'connectivity'` -> bytes).
+        """
+
+        return self._instance.projection(id_proj).memory()
+
+    def projection_get(self, id_proj:int, attribute:str) -> np.ndarray:
+
+        """Returns the value of the `attribute` for the projection of ID `id_proj`.
+
+        Arrays are NumPy views on the C++ storage: no copy is made.
+
+        Args:
+
+            id_proj: ID of the projection.
+            attribute: unique name of the attribute.
+        """
+
+        return getattr(self._instance.projection(id_proj), attribute)
+
+    def projection_set(self, id_proj:int, attribute:str, value:np.ndarray):
+
+        """Sets the value of the `attribute` to `value` for the projection `id_proj`.
+
+        Arrays are copied in place into the C++ storage, single values are broadcast.
+        
+        Args:
+
+            id_proj: ID of the projection.
+            attribute: unique name of the attribute.
+            value: value to be set to the attribute.
+        """
+
+        setattr(self._instance.projection(id_proj), attribute, value)
+
+    def get_clock(self) -> tuple:
+
+        """Returns the current time, the number of simulated steps and the key of the random streams.
+        """
+
+        return self._instance.t, self._instance.steps, self._instance.rng_key
+
+    def set_clock(self, t:float, steps:int, rng_key:int):
+
+        """Sets the current time, the number of simulated steps and the key of the random streams.
+
+        Args:
+
+            t: time in ms.
+            steps: number of simulated steps, counter of the random streams.
+            rng_key: key of the random streams.
+        """
+
+        self._instance.t = t
+        self._instance.steps = steps
+        self._instance.rng_key = rng_key
+
+    def snapshot(self):
+
+        """Copies the state of the network in the kernel.
+
+        Returns:
+
+            a handle on the copy, freed when the handle is deleted.
+        """
+
+        return self._instance.snapshot()
+
+    def restore(self, snapshot, weights:bool) -> bool:
+
+        """Copies the state of a snapshot back into the kernel.
+
+        Args:
+
+            snapshot: handle returned by `snapshot()`.
+            weights: restores the attributes of the projections.
+
+        Returns:
+
+            False if the snapshot was taken by another kernel or if a number of synapses changed.
+        """
+
+        return self._instance.restore(snapshot, weights)
+
+    def set_num_threads(self, num_threads:int):
+
+        """Sets the number of threads used by the kernel.
+
+        Args:
+
+            num_threads: number of threads.
+        """
+
+        self._instance.set_num_threads(num_threads)
+
     def step(self):
 
         """Single simulation step.
@@ -102,22 +309,86 @@ class CythonInterface(communicator.SimulationInterface):
 
         self._instance.simulate(duration)
 
+    def get_profile(self) -> list:
+
+        """Returns the times accumulated by the profiler of the kernel.
+
+        Returns:
+
+            a list of (phase, kind, type, times, calls) tuples, one per call site. `times` and `calls`
+            contain one value per object of the type, in the order of creation.
+        """
+
+        return self._instance.get_profile()
+
+    def reset_profile(self):
+
+        """Sets the times accumulated by the profiler to zero.
+        """
+
+        self._instance.reset_profile()
+
+    def set_trace(self, capacity:int):
+
+        """Preallocates the ring buffer of the trace recorder.
+
+        Args:
+
+            capacity: maximal number of events kept (0 stops the recording).
+        """
+
+        self._instance.set_trace(capacity)
+
+    def get_trace(self) -> list:
+
+        """Returns the events recorded by the trace recorder.
+
+        Returns:
+
+            a list of (site, rank, start, duration) tuples, from the oldest to the newest. `site` is the 
+            index of the call site in `get_profile()`, times are in seconds.
+        """
+
+        return self._instance.get_trace()
+
+    def clear_trace(self):
+
+        """Removes the events recorded by the trace recorder.
+        """
+
+        self._instance.clear_trace()
+
     def monitor(self, variables: dict):
 
-        """Monitors the provided variables.
+        """Replaces the C++ monitors with new ones recording the provided variables.
 
-        TODO
+        Args:
 
+            variables: dictionary (population -> list of attributes).
         """
 
-        self._instance.monitor(variables)
+        self._instance.monitor([
+            (pop._id_pop, pop.neuron_class, attributes) for pop, attributes in variables.items()
+        ])
 
-    def get_monitored(self):
+    def get_monitored(self) -> list:
 
         """Returns the monitored variables.
 
-        TODO
+        Returns:
+
+            a list of dictionaries (attribute -> array), in the order of the monitored populations.
+        """
+
+        return self._instance.get_monitored()
+
+    def monitor_memory(self) -> list:
+
+        """Returns the bytes allocated by the monitors.
+
+        Returns:
 
+            a list of (recorded steps, dictionary (attribute -> bytes)) tuples, in the order of the monitored populations.
         """
 
-        return self._instance.get_monitored()
\ No newline at end of file
+        return self._instance.monitor_memory()
@@ -0,0 +1,233 @@
+import sys, os
+import logging
+import hashlib
+import platform
+import subprocess
+import shutil
+import tempfile
+import fcntl
+
+import numpy as np
+
+# Default location and size of the cache, can be overridden by environment variables
+default_cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "ANNarchy_future")
+default_cache_size = 2048 # MB
+
+
+class CompilationCache(object):
+
+    """Global on-disk cache of compiled libraries, shared by all networks and compilation folders.
+
+    Libraries are stored as `<key>.so`, where the key is a hash of all generated sources
+    (including the Makefile and therefore the compiler flags) and of the versions of Python, NumPy,
+    Cython and g++. When the total size of the cache exceeds its cap, the least recently used
+    libraries are removed.
+
+    The location and size of the cache are set by the environment variables `ANNARCHY_CACHE_DIR`
+    (default: `~/.cache/ANNarchy_future`) and `ANNARCHY_CACHE_SIZE` (in MB, default: 2048).
+
+    Attributes:
+
+        cache_dir: cache directory.
+        max_size: maximal size of the cache in bytes.
+    """
+
+    def __init__(self, cache_dir:str = None, max_size:int = None):
+
+        """
+        Args:
+
+            cache_dir: cache directory.
+            max_size: maximal size of the cache in MB.
+        """
+
+        if cache_dir is None:
+            cache_dir = os.environ.get("ANNARCHY_CACHE_DIR", default_cache_dir)
+        if max_size is None:
+            max_size = int(os.environ.get("ANNARCHY_CACHE_SIZE", default_cache_size))
+
+        self.cache_dir:str = cache_dir
+        self.max_size:int = max_size * 1024 * 1024
+
+        self._logger = logging.getLogger(__name__)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, sources:dict) -> str:
+
+        """Computes the key of a library.
+
+        Args:
+
+            sources: dictionary (filename -> content) of the generated files.
+
+        Returns:
+
+            a SHA-256 hexadecimal digest.
+        """
+
+        h = hashlib.sha256()
+
+        for filename in sorted(sources.keys()):
+            h.update(filename.encode('utf-8'))
+            h.update(b'\0')
+            h.update(sources[filename].encode('utf-8'))
+            h.update(b'\0')
+
+        for version in self._environment():
+            h.update(version.encode('utf-8'))
+            h.update(b'\0')
+
+        return h.hexdigest()
+
+    def _environment(self) -> list:
+        "Versions of the tools and the platform influencing the compiled library."
+
+        try:
+            import Cython
+            cython_version = Cython.__version__
+        except ImportError:
+            cython_version = ""
+
+        try:
+            gcc_version = subprocess.run(
+                ["g++", "-dumpfullversion", "-dumpversion"],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout.decode('utf-8')
+        except OSError:
+            gcc_version = ""
+
+        # -march=native: libraries can not be shared between different CPUs
+        cpu = platform.processor()
+        try:
+            with open("/proc/cpuinfo", 'r') as f:
+                for line in f:
+                    if line.startswith("model name"):
+                        cpu = line
+                        break
+        except OSError:
+            pass
+
+        return [sys.version, np.__version__, cython_version, gcc_version, platform.machine(), cpu]
+
+    def path(self, key:str) -> str:
+        "Path to the cached library."
+
+        return os.path.join(self.cache_dir, key + ".so")
+
+    def lock(self, key:str):
+
+        """Returns an exclusive lock on the key, to be used in a `with` statement.
+
+        Processes building the same library wait for the first one to store it in the cache
+        instead of all compiling it.
+        """
+
+        return _FileLock(os.path.join(self.cache_dir, key + ".lock"))
+
+    def fetch(self, key:str, library_path:str) -> bool:
+
+        """Copies the cached library to `library_path` if it exists.
+
+        Args:
+
+            key: key of the library.
+            library_path: destination.
+
+        Returns:
+
+            True if the library was found.
+        """
+
+        cached = self.path(key)
+
+        if not os.path.exists(cached):
+            return False
+
+        try:
+            _atomic_copy(cached, library_path)
+            # Access time for the LRU eviction
+            os.utime(cached)
+        except OSError:
+            # Evicted by another process in the meantime
+            return False
+
+        return True
+
+    def store(self, key:str, library_path:str):
+
+        """Adds a library to the cache and evicts the least recently used libraries if needed.
+
+        Args:
+
+            key: key of the library.
+            library_path: path to the compiled library.
+        """
+
+        try:
+            _atomic_copy(library_path, self.path(key))
+        except OSError:
+            self._logger.warning("Unable to store the library in the cache " + self.cache_dir)
+            return
+
+        self.evict()
+
+    def evict(self):
+
+        """Removes the least recently used libraries until the cache fits in its maximal size.
+
+        Lock files are never removed: another process may hold a lock on them, and a new lock file 
+        with the same name would let a third process build the same library concurrently. They are empty.
+        """
+
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".so"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, filename))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, filename))
+
+        total_size = sum([size for _, size, _ in entries])
+
+        for _, size, filename in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, filename))
+            except OSError:
+                pass
+            self._logger.info("Evicted " + filename + " from the cache.")
+            total_size -= size
+
+
+class _FileLock(object):
+    "Exclusive lock based on `fcntl.flock()`."
+
+    def __init__(self, filename:str):
+        self.filename = filename
+
+    def __enter__(self):
+        self._file = open(self.filename, 'a')
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+def _atomic_copy(src:str, dst:str):
+    "Copies a file through a temporary file and `os.replace()`, so that readers never see a partial file."
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(dst)), suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp)
+        os.chmod(tmp, 0o755)
+        os.replace(tmp, dst)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
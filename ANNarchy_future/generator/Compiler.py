@@ -1,4 +1,5 @@
 import sys, os
+import time
 import logging
 import subprocess
 import shutil
@@ -17,13 +18,27 @@ class Compiler(object):
 
     The code generators should call `Compiler.write_file(filename, content)` to write a file.
 
-    Compiler manages everything related to the compilation folder.
+    Compiler manages everything related to the compilation folder. Compiled libraries are 
+    stored in a global `CompilationCache`, so that identical networks are only compiled once, 
+    whatever their compilation folder.
+
+    Attributes:
+
+        timings: duration in seconds of the phases of `build()`: code generation (`'generate'`), 
+            writing of the files (`'write'`), compilation or retrieval from the cache (`'compile'`) 
+            and loading of the library (`'load'`).
+        compiled: whether the library was compiled, False if it was reused.
     """
 
     def __init__(self, 
         net: 'api.Network',
         backend:str,
         clean:bool = False,
+        fused:bool = False,
+        cache:bool = True,
+        precision:str = 'float64',
+        workers:int = 1,
+        profile:bool = False,
         ):
         
         """
@@ -33,6 +48,11 @@ class Compiler(object):
             net: Python Network instance.
             backend: 'single', 'openmp', 'cuda' or 'mpi'.
             clean: forces complete code generation.
+            fused: fuses the neural phases into a single loop per population.
+            cache: reuses a library from the compilation cache if available.
+            precision: floating-point precision of the attributes, 'float64' or 'float32'.
+            workers: number of processes generating the code of the neuron and synapse types.
+            profile: instruments the simulation step with timers.
         """
         self.net = net
         self.backend:str = backend
@@ -45,6 +65,16 @@ class Compiler(object):
 
         self._has_changed = clean
 
+        # Content of the generated files
+        self.sources = {}
+
+        # Duration of each phase of build()
+        self.timings = {'generate': 0.0, 'write': 0.0, 'compile': 0.0, 'load': 0.0}
+        self.compiled = False
+
+        # Global cache of compiled libraries
+        self.cache = generator.CompilationCache() if cache else None
+
         # Logging
         self._logger = logging.getLogger(__name__)
 
@@ -57,6 +87,21 @@ class Compiler(object):
                 description=self.net._description,
                 backend=self.backend,
                 library=self.library,
+                fused=fused,
+                precision=precision,
+                workers=workers,
+                profile=profile,
+            )
+        elif backend == "openmp":
+            self._generator = generator.OpenMP.OpenMPGenerator(
+                compiler=self,
+                description=self.net._description,
+                backend=self.backend,
+                library=self.library,
+                fused=fused,
+                precision=precision,
+                workers=workers,
+                profile=profile,
             )
         else:
             raise NotImplementedError
@@ -86,9 +131,12 @@ class Compiler(object):
         """
 
         # Call the generator generator() method
+        tstart = time.time()
         self._generator.generate()
+        self.timings['generate'] = time.time() - tstart
 
         # Create the compilation folder
+        tstart = time.time()
         self.compilation_folder()
 
         # Generate files
@@ -97,16 +145,30 @@ class Compiler(object):
 
         # Clean files from a previous compilation
         self.clean_generated_files()
-
-        # Compile the code
-        if self._has_changed:
-            self.compile()
+        self.timings['write'] = time.time() - tstart
+
+        # Compile the code, or retrieve it from the cache
+        tstart = time.time()
+        if self._has_changed or not os.path.exists(self.library_path):
+            if self.cache is None:
+                self.compile()
+            else:
+                key = self.cache.key(self.sources)
+                with self.cache.lock(key):
+                    if self.cache.fetch(key, self.library_path):
+                        self._logger.info("Reusing the library " + key + " from the cache.")
+                    else:
+                        self.compile()
+                        self.cache.store(key, self.library_path)
+        self.timings['compile'] = time.time() - tstart
 
         # Instantiate an interface (Cython or gRPC)
-        if self.backend == "single":
+        tstart = time.time()
+        if self.backend in ["single", "openmp"]:
             interface = communicator.CythonInterface(self.net, self.library, self.library_path)
         else:
             raise NotImplementedError
+        self.timings['load'] = time.time() - tstart
 
         return interface
 
@@ -137,6 +199,7 @@ class Compiler(object):
             content: content of the file.
         """
         self.generated_files.append(filename)
+        self.sources[filename] = content
 
         complete_path = self.build_dir + filename
 
@@ -168,9 +231,17 @@ class Compiler(object):
         current_files = os.listdir(self.build_dir)
         diff = list(set(current_files) - set(self.generated_files))
         for f in diff:
-            if f.endswith(".hpp"):
+            # The Cython output is not a generated file
+            if f == self.library + ".cpp":
+                continue
+            if f.endswith((".hpp", ".cpp")):
                 os.remove(self.build_dir + f)
                 self._has_changed = True
+            # Objects and dependencies of removed classes
+            elif f.endswith((".o", ".d")) and f != "ANNarchy.hpp.d":
+                source = f[:-2] + ".cpp"
+                if source != self.library + ".cpp" and not source in self.generated_files:
+                    os.remove(self.build_dir + f)
 
 
     def compile(self):
@@ -179,6 +250,7 @@ class Compiler(object):
         Calls `make -j4` in a subprocess.
         """
         self._logger.info("Compiling.")
+        self.compiled = True
 
         # Current directory
         cwd = os.getcwd()
@@ -229,4 +301,78 @@ def fetch_template(filename:str) -> Template:
     
     template = Template("".join(template))
 
-    return template
\ No newline at end of file
+    return template
+
+def fetch_module(filename:str) -> str:
+    """Retrieves the content of a C++ header from `modules/`.
+
+    Args: 
+
+        filename: name of the header (e.g. 'LIL.hpp').
+
+    Returns:
+
+        the content of the file.
+    """
+
+    import ANNarchy_future
+
+    file_path = str(ANNarchy_future.__path__[0]) + '/modules/' + filename
+
+    with open(file_path, 'r') as f:
+        content = f.read()
+
+    return content
+
+# Types of the attributes in C++, Cython and NumPy.
+# Arrays of booleans are stored as bytes, as std::vector<bool> is bit-packed and can not be shared with NumPy.
+cython_types = {
+    'double': 'double',
+    'float': 'float',
+    'int': 'int',
+    'bool': 'bint',
+    'char': 'char',
+}
+
+numpy_types = {
+    'double': 'np.NPY_DOUBLE',
+    'float': 'np.NPY_FLOAT',
+    'int': 'np.NPY_INT',
+    'char': 'np.NPY_BOOL',
+}
+
+# Size in bytes of the C++ types
+type_sizes = {
+    'double': 8,
+    'float': 4,
+    'int': 4,
+    'bool': 1,
+    'char': 1,
+}
+
+def attribute_type(dtype:str, precision:str = 'float64', shared:bool = False) -> str:
+    """Returns the C++ type of an attribute.
+
+    Floating-point attributes follow the precision of the network.
+
+    Args: 
+
+        dtype: numerical type of the attribute ('float', 'int' or 'bool').
+        precision: floating-point precision of the network ('float64' or 'float32').
+        shared: whether the attribute is a single value or an array.
+
+    Returns:
+
+        the C++ type of a single value (e.g. 'double').
+    """
+
+    if dtype == 'float':
+        return 'float' if precision == 'float32' else 'double'
+    elif dtype == 'int':
+        return 'int'
+    elif dtype == 'bool':
+        return 'bool' if shared else 'char'
+
+    logger = logging.getLogger(__name__)
+    logger.error("Unknown dtype " + str(dtype) + ", must be 'float', 'int' or 'bool'.")
+    sys.exit(1)
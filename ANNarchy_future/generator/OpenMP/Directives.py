@@ -0,0 +1,22 @@
+def parallel_for(shared:list, blocks:list) -> str:
+
+    """Directive placed in front of a loop over neurons or post-synaptic neurons.
+
+    Loops assigning shared attributes stay sequential to avoid race conditions.
+
+    Args:
+
+        shared: names of the shared attributes of the neuron or synapse.
+        blocks: blocks of equations computed inside the loop.
+
+    Returns:
+
+        `#pragma omp parallel for` if the loop can be parallelized.
+    """
+
+    for block in blocks:
+        for eq in block.equations:
+            if eq['type'] != 'tmp' and eq['name'] in shared:
+                return ""
+
+    return "        #pragma omp parallel for schedule(static)"
@@ -0,0 +1,36 @@
+from ..SingleThread.SingleThreadGenerator import SingleThreadGenerator
+from .PopulationGenerator import PopulationGenerator
+from .ProjectionGenerator import ProjectionGenerator
+
+
+class OpenMPGenerator(SingleThreadGenerator):
+
+    """Generates the C++ code for multi-threaded simulation using OpenMP.
+
+    The network structure is the same as for the single-threaded backend,
+    only the neuron and synapse classes differ.
+
+    """
+
+    population_generator = PopulationGenerator
+    projection_generator = ProjectionGenerator
+
+    def backend_includes(self) -> str:
+        """Additional headers required by the backend.
+
+        Returns:
+
+            the OpenMP header.
+        """
+
+        return "#include <omp.h>\n"
+
+    def set_num_threads(self) -> str:
+        """Body of the `Network::set_num_threads()` C++ method.
+
+        Returns:
+
+            the call to `omp_set_num_threads()`.
+        """
+
+        return "        omp_set_num_threads(num_threads);"
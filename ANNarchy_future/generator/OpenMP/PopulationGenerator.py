@@ -0,0 +1,149 @@
+import textwrap
+from string import Template
+
+import ANNarchy_future.parser as parser
+
+from .Directives import parallel_for
+from ..SingleThread.PopulationGenerator import PopulationGenerator as SingleThreadPopulationGenerator
+
+
+class PopulationGenerator(SingleThreadPopulationGenerator):
+
+    """Generates a C++ file corresponding to a Neuron description, using OpenMP.
+
+    The loops over neurons in `rng()`, `update()`, `spike()` and `reset()` are parallelized. 
+    Random numbers are counter-based, so the results do not depend on the number of threads.
+    
+    During `spike()`, each thread gathers its spikes in its own buffer. 
+    The buffers are merged in thread order afterwards, so that `spikes` stays sorted.
+
+    """
+
+    def spike_arrays(self) -> tuple:
+        """Declares and initializes the arrays needed by spiking neurons, including thread-local spike buffers.
+
+        Returns:
+            declared_spiking, initialize_spiking
+        """
+
+        declared_spiking = """
+    // Spiking neuron
+    std::vector<int> spikes;
+    std::vector< std::vector<int> > thread_spikes;"""
+
+        initialize_spiking = """
+        // Spiking neuron
+        this->spikes = std::vector<int>(0);
+        this->thread_spikes = std::vector< std::vector<int> >(omp_get_max_threads(), std::vector<int>(0));"""
+
+        return declared_spiking, initialize_spiking
+
+    def spike_memory(self) -> str:
+        """Returns the C++ expression of the bytes allocated by the spike arrays, thread-local buffers included.
+        """
+
+        return "memory_of(this->spikes) + memory_of(this->thread_spikes)"
+
+    def spike(self) -> str:
+
+        """Processes the Neuron.spike() field.
+        
+        Returns:
+
+            the content of the `spike()` C++ method.
+
+        """
+
+        tpl_spike = Template("""
+        // The number of threads may have changed since the last step
+        if(this->thread_spikes.size() != (size_t) omp_get_max_threads()){
+            this->thread_spikes.resize(omp_get_max_threads());
+        }
+        for(auto& local_spikes : this->thread_spikes){
+            local_spikes.clear();
+        }
+
+        // Each thread gathers its own spikes
+        #pragma omp parallel
+        {
+            std::vector<int>& local_spikes = this->thread_spikes[omp_get_thread_num()];
+
+            #pragma omp for schedule(static)
+            for(unsigned int i = 0; i< this->size; i++){
+                if ($condition){
+                    local_spikes.push_back(i);
+                }
+            }
+        }
+
+        // Merge the thread-local buffers in thread order
+        this->spikes.clear();
+        for(auto& local_spikes : this->thread_spikes){
+            this->spikes.insert(this->spikes.end(), local_spikes.begin(), local_spikes.end());
+        }
+        """)
+
+        cond = parser.code_generation(self.parser.spike_condition.equation['eq'], self.correspondences, self.precision)
+
+        return tpl_spike.substitute(condition=cond)
+
+    def fused_update(self) -> str:
+
+        """Processes rng(), update(), spike() and reset() in a single parallel loop over the neurons.
+        
+        Returns:
+
+            the content of the `fused_update()` C++ method.
+
+        """
+
+        # Sequential fallback
+        blocks = self.parser.update_equations + self.parser.reset_equations
+        if self.loop_directive(blocks) == "":
+            return super().fused_update()
+
+        # Rate-coded neurons do not need spike buffers
+        if not self.parser.is_spiking():
+            return super().fused_update()
+
+        tpl_fused = Template("""
+        // The number of threads may have changed since the last step
+        if(this->thread_spikes.size() != (size_t) omp_get_max_threads()){
+            this->thread_spikes.resize(omp_get_max_threads());
+        }
+        for(auto& local_spikes : this->thread_spikes){
+            local_spikes.clear();
+        }
+$invariants
+
+        #pragma omp parallel
+        {
+            std::vector<int>& local_spikes = this->thread_spikes[omp_get_thread_num()];
+
+            #pragma omp for schedule(static)
+            for(unsigned int i = 0; i< this->size; i++){
+$body
+            }
+        }
+
+        // Merge the thread-local buffers in thread order
+        this->spikes.clear();
+        for(auto& local_spikes : this->thread_spikes){
+            this->spikes.insert(this->spikes.end(), local_spikes.begin(), local_spikes.end());
+        }
+        """)
+
+        invariants, update_blocks, reset_blocks = self.fused_hoist()
+
+        return tpl_fused.substitute(
+            invariants=invariants,
+            body=textwrap.indent(
+                self.fused_body(spike_buffer="local_spikes", update_blocks=update_blocks, reset_blocks=reset_blocks), 
+                '    '),
+        )
+
+    def loop_directive(self, blocks:list) -> str:
+
+        """Directive placed in front of the loops over neurons (see `Directives.parallel_for()`)."""
+
+        return parallel_for(self.parser.shared, blocks)
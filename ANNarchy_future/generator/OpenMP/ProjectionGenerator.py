@@ -0,0 +1,18 @@
+from .Directives import parallel_for
+from ..SingleThread.ProjectionGenerator import ProjectionGenerator as SingleThreadProjectionGenerator
+
+
+class ProjectionGenerator(SingleThreadProjectionGenerator):
+
+    """Generates a C++ file corresponding to a Synapse description, using OpenMP.
+
+    The loops over post-synaptic neurons in `collect_inputs()` and `update()` are parallelized.
+    The event-driven transmission of spikes stays sequential, as several spikes can reach the same post-synaptic neuron.
+
+    """
+
+    def loop_directive(self, blocks:list) -> str:
+
+        """Directive placed in front of the loops over post-synaptic neurons (see `Directives.parallel_for()`)."""
+
+        return parallel_for(self.parser.shared, blocks)
@@ -0,0 +1,6 @@
+from .OpenMPGenerator import OpenMPGenerator
+
+from .PopulationGenerator import PopulationGenerator
+from .ProjectionGenerator import ProjectionGenerator
+
+__all__ = ["OpenMPGenerator"]
@@ -1,6 +1,8 @@
 import sys
+import copy
 import logging
 import importlib
+import textwrap
 from string import Template
 
 import sympy as sp
@@ -17,37 +19,61 @@ class PopulationGenerator(object):
 
         name: name of the class.
         parser: instance of NeuronParser.
+        fused: whether rng(), update(), spike() and reset() are fused into a single loop.
+        precision: floating-point precision of the network ('float64' or 'float32').
+        real: C++ floating-point type.
         correspondences: dictionary of pairs (symbol -> implementation).
+        buffered_variables: random variables stored in arrays by `rng()`.
 
     """
 
-    def __init__(self, name:str, parser:'parser.NeuronParser'):
+    def __init__(self, 
+        name:str, 
+        parser:'parser.NeuronParser', 
+        fused:bool = False, 
+        precision:str = 'float64'):
         
         """
         Args:
 
             name (str): name of the class.
             parser (parser.NeuronParser): parser for the neuron.
+            fused (bool): generates `fused_update()` instead of separate loops.
+            precision (str): floating-point precision, 'float64' or 'float32'.
         """
 
         self.name:str = name
         self.parser:'parser.NeuronParser' = parser
+        self.fused:bool = fused
+        self.precision:str = precision
+        self.real:str = generator.attribute_type('float', precision)
+
+        # Number of common sub-expressions, so that their names are unique in a method
+        self._nb_cse = 0
 
         # Build a correspondance dictionary
         self.correspondences = {
             't': 'this->net->t',
             'dt': 'this->net->dt',
         }
+        # The time step must not promote single precision computations to double
+        if self.precision == 'float32':
+            self.correspondences['dt'] = 'static_cast<float>(this->net->dt)'
         for attr in self.parser.attributes:
             if attr in self.parser.shared:
                 self.correspondences[attr] = "this->" + attr
             else:
                 self.correspondences[attr] = "this->" + attr + "[i]"
         
-        for name, _ in self.parser.random_variables.items():
-            self.correspondences[name] = "this->" + name + "[i]"
+        # Random variables are drawn inside the loop using them, or stored in arrays by rng()
+        self.buffered_variables = self.parser.buffered_random_variables(self.fused)
+        for name in self.parser.random_variables.keys():
+            if name in self.buffered_variables:
+                self.correspondences[name] = "this->" + name + "[i]"
+            else:
+                self.correspondences[name] = name
 
-    def generate(self) -> str:
+    def generate(self) -> tuple:
         
         """Generates the C++ code. 
 
@@ -57,14 +83,19 @@ class PopulationGenerator(object):
             `self.update()`
             `self.spike()`
             `self.reset()`
+            `self.fused_update()` if `fused` is True.
+            `self.memory()`
+            `self.snapshot()`
         
         Returns:
         
-            a multiline string for the .h header file.
+            a tuple of multiline strings for the .hpp header file (declaration) 
+            and the .cpp source file (method bodies).
         """
 
-        # Get the Population.hpp template
+        # Get the Population.hpp and Population.cpp templates
         template_h = generator.fetch_template('/generator/SingleThread/templates/Population.hpp')
+        template_cpp = generator.fetch_template('/generator/SingleThread/templates/Population.cpp')
 
         # Initialize arrays
         initialize_arrays = ""
@@ -72,20 +103,27 @@ class PopulationGenerator(object):
         # Attributes
         declared_attributes = ""
         for attr in self.parser.attributes:
+            ctype = self.attribute_type(attr)
             if attr in self.parser.shared:
                 declared_attributes += Template(
-                    "    double $attr;\n").substitute(attr=attr)
+                    "    $ctype $attr;\n").substitute(attr=attr, ctype=ctype)
             else:
                 declared_attributes += Template(
-                    "    std::vector<double> $attr;\n").substitute(attr=attr)
+                    "    std::vector<$ctype> $attr;\n").substitute(attr=attr, ctype=ctype)
                 initialize_arrays += Template(
-                    "        this->$attr = std::vector<double>(size, 0.0);\n").substitute(attr=attr)
+                    "        this->$attr = std::vector<$ctype>(size, 0);\n").substitute(attr=attr, ctype=ctype)
+
+        # Propagators of the exact method
+        declared_propagators, initialize_propagators = self.propagator_arrays()
+        declared_attributes += declared_propagators
+        initialize_arrays += initialize_propagators
 
         # RNG
         declared_rng, initialize_rng, rng_method = self.rng()
 
         # Inputs
         reset_inputs = self.reset_inputs()
+        input_accessor = self.input_accessor()
 
         # Update method
         update_method = self.update()
@@ -99,13 +137,7 @@ class PopulationGenerator(object):
         if self.parser.is_spiking():
 
             # Declare spike arrays
-            declared_spiking = """
-    // Spiking neuron
-    std::vector<int> spikes;"""
-
-            initialize_spiking = """
-        // Spiking neuron
-        this->spikes = std::vector<int>(0);"""
+            declared_spiking, initialize_spiking = self.spike_arrays()
 
             # Spike method
             spike_method = self.spike()
@@ -113,29 +145,194 @@ class PopulationGenerator(object):
             # Reset method
             reset_method = self.reset()
 
+        # Single pass over the neurons
+        fused_method = ""
+        if self.fused:
+            update_method = ""
+            spike_method = ""
+            reset_method = ""
+            fused_method = self.fused_update()
+
 
+        # Copies used by the snapshots
+        state_attributes, copy_to_method, copy_from_method = self.snapshot()
 
-        # Generate code
-        code = template_h.substitute(
+        # Generate the declaration
+        header = template_h.substitute(
             class_name = self.name,
+            real = self.real,
+            spiking = "true" if self.parser.is_spiking() else "false",
             declared_attributes = declared_attributes,
             declared_spiking = declared_spiking,
             declared_rng = declared_rng,
+            state_attributes = state_attributes,
+        )
+
+        # Generate the method bodies
+        source = template_cpp.substitute(
+            class_name = self.name,
+            real = self.real,
             initialize_arrays = initialize_arrays,
             initialize_spiking = initialize_spiking,
             initialize_rng = initialize_rng,
             reset_inputs = reset_inputs,
+            input_accessor = input_accessor,
             update_method = update_method,
             spike_method = spike_method,  
             reset_method = reset_method,  
             rng_method = rng_method, 
+            fused_method = fused_method,
+            memory_method = self.memory(),
+            copy_to_method = copy_to_method,
+            copy_from_method = copy_from_method,
         )
         
+        return header, source
+
+    def attribute_type(self, attr:str) -> str:
+        """Returns the C++ type of an attribute, depending on its dtype and on the precision.
+
+        Args:
+
+            attr: name of the attribute.
+        """
+
+        return generator.attribute_type(self.parser.dtypes[attr], self.precision, attr in self.parser.shared)
+
+    def buffer_type(self, attr:str) -> str:
+        """Returns the C++ type of the elements of an array attribute, also used by the recording buffers.
+
+        Args:
+
+            attr: name of the attribute.
+        """
+
+        return generator.attribute_type(self.parser.dtypes[attr], self.precision, False)
+
+    def propagator_arrays(self) -> tuple:
+        """Declares the matrices used by the ODE blocks integrated with the exact method.
+
+        For each block, `__A__v` stores the last value of `A*dt` and `__P__v`, `__Q__v` the corresponding 
+        propagators (see `parser.NumericalMethods.exact()`), where `v` is the first variable of the block. 
+        `__A__v` is initialized with NaN so that the propagators are computed at the first step.
+
+        Returns:
+            declared_propagators, initialize_propagators
+        """
+
+        declared = ""
+        initialized = ""
+
+        for block in self.parser.update_equations:
+            propagator = getattr(block, 'propagator', None)
+            if propagator is None:
+                continue
+
+            n = len(propagator['variables'])
+
+            declared += Template("""
+    // Propagators of ($variables)
+    std::vector<double> __A__$name;
+    std::vector<double> __P__$name;
+    std::vector<double> __Q__$name;
+""").substitute(name=propagator['name'], variables=", ".join(propagator['variables']))
+
+            initialized += Template("""
+        this->__A__$name = std::vector<double>($size, std::numeric_limits<double>::quiet_NaN());
+        this->__P__$name = std::vector<double>($size, 0.0);
+        this->__Q__$name = std::vector<double>($size, 0.0);
+""").substitute(name=propagator['name'], size=n*n)
+
+        return declared, initialized
+
+    def propagators(self, blocks:list) -> str:
+        """Updates the propagators of the exact method before the loop over the neurons.
+
+        The matrix exponential is only computed when `A*dt` has changed since the last step, 
+        i.e. in general once per simulation. The used elements of the propagators are then copied in 
+        `const` variables for the loop.
+
+        Args:
+
+            blocks: list of blocks of equations computed inside the loop.
+
+        Returns:
+
+            the code to put before the loop.
+        """
+
+        code = ""
+
+        for block in blocks:
+            propagator = getattr(block, 'propagator', None)
+            if propagator is None:
+                continue
+
+            name = propagator['name']
+            n = len(propagator['variables'])
+
+            # A*dt is always computed in double precision
+            elements = []
+            for row in propagator['A']:
+                for coeff in row:
+                    if coeff == 0:
+                        elements.append("0.0")
+                    else:
+                        elements.append(
+                            "(" + parser.code_generation(coeff, self.correspondences, 'float64') + ")*this->net->dt"
+                        )
+
+            code += Template("""
+        // Propagators of ($variables)
+        {
+            const double __Adt[$size] = {$elements};
+            if(!std::equal(__Adt, __Adt + $size, this->__A__$name.begin())){
+                std::copy(__Adt, __Adt + $size, this->__A__$name.begin());
+                exact_propagators($n, __Adt, this->net->dt, this->__P__$name.data(), this->__Q__$name.data());
+            }
+        }""").substitute(
+                name=name,
+                n=n,
+                size=n*n,
+                elements=", ".join(elements),
+                variables=", ".join(propagator['variables']),
+            )
+
+            for matrix in ['P', 'Q']:
+                for (i, j), symbol in propagator[matrix].items():
+                    code += Template("""
+        const $real $symbol = this->__${matrix}__$name[$idx];""").substitute(
+                        real=self.real, symbol=symbol, matrix=matrix, name=name, idx=i*n+j
+                    )
+
         return code
 
+    def spike_arrays(self) -> tuple:
+        """Declares and initializes the arrays needed by spiking neurons.
+
+        Returns:
+            declared_spiking, initialize_spiking
+        """
+
+        declared_spiking = """
+    // Spiking neuron
+    std::vector<int> spikes;"""
+
+        initialize_spiking = """
+        // Spiking neuron
+        this->spikes = std::vector<int>(0);"""
+
+        return declared_spiking, initialize_spiking
+
     def rng(self) -> tuple:
         """Gathers all random variables.
 
+        Random numbers are drawn with the counter-based generator of `modules/Philox.hpp`: 
+        each number only depends on the seed of the network, the rank of the population, 
+        the index of the random variable, the index of the neuron and the current step. 
+        The loop filling the arrays has no dependency between iterations and can be parallelized 
+        or vectorized without changing the results.
+
         Returns:
             declared_rng, initialize_rng, rng_method
         """
@@ -145,53 +342,88 @@ class PopulationGenerator(object):
         // Random Variables"""
         
         rng_tpl = Template("""
-$init
+$directive
         for(unsigned int i = 0; i < this->size; i++) {
 $draw
         }
         """)
-        rng_init = ""
         rng_update = ""
 
-        for name, var in self.parser.random_variables.items():
-
-            if isinstance(var, parser.RandomDistributions.Uniform):
-                dist = "uniform_real_distribution< double >"
-                # If the arguments are fixed throughout the simulation, no need to redraw 
-                fixed = isinstance(var.min, (float, int)) and isinstance(var.max, (float, int))
-                arg1 = parser.code_generation(var.min, self.correspondences)
-                arg2 = parser.code_generation(var.max, self.correspondences)
-
-            if isinstance(var, parser.RandomDistributions.Normal):
-                dist = "normal_distribution< double >"
-                # If the arguments are fixed throughout the simulation, no need to redraw 
-                fixed = isinstance(var.mu, (float, int)) and isinstance(var.sigma, (float, int))
-                arg1 = parser.code_generation(var.mu, self.correspondences)
-                arg2 = parser.code_generation(var.sigma, self.correspondences)
+        for name in self.buffered_variables:
 
             declared_rng += Template("""
-    std::vector<double> $name;
-    std::$dist dist$name;
-            """).substitute(name=name, dist=dist)
+    std::vector<$real> $name;""").substitute(name=name, real=self.real)
 
             initialize_rng += Template("""
-        this->$name = std::vector<double>(size, 0.0);
-        this->dist$name = std::$dist($arg1, $arg2);
-            """).substitute(name=name, dist=dist, arg1=arg1, arg2=arg2)
-
-            if not fixed:
-                rng_init += Template("""
-        this->dist$name = std::$dist($arg1, $arg2);
-            """).substitute(name=name, dist=dist, arg1=arg1, arg2=arg2)
+        this->$name = std::vector<$real>(size, 0.0);""").substitute(name=name, real=self.real)
 
             rng_update += Template("""
-            this->$name[i] = this->dist$name(this->net->rng);
-            """).substitute(name=name, dist=dist)
+            this->$name[i] = $draw;""").substitute(name=name, draw=self.draw(name))
 
-        rng_method = rng_tpl.substitute(init=rng_init, draw=rng_update)
+        rng_method = ""
+        if len(self.buffered_variables) > 0:
+            rng_method = rng_tpl.substitute(directive=self.loop_directive([]), draw=rng_update)
 
         return declared_rng, initialize_rng, rng_method
 
+    def draws(self, blocks:list = None) -> str:
+        """Draws the random variables used in the blocks which are not stored in arrays.
+
+        Args:
+
+            blocks: list of blocks of equations computed inside the loop, all random variables if None.
+
+        Returns:
+
+            the declarations to put at the beginning of the loop.
+        """
+
+        used = set(self.parser.random_variables.keys())
+        if blocks is not None:
+            used = set()
+            for block in blocks:
+                for eq in block.equations:
+                    if isinstance(eq['rhs'], sp.Basic):
+                        used.update([str(symbol) for symbol in eq['rhs'].free_symbols])
+
+        code = ""
+        for name in self.parser.random_variables.keys():
+            if name in self.buffered_variables or not name in used:
+                continue
+            code += Template("""
+            const $real $name = $draw;""").substitute(name=name, real=self.real, draw=self.draw(name))
+
+        return code
+
+    def draw(self, name:str) -> str:
+        """Draws a single value of a random variable for the neuron `i`.
+
+        Args:
+
+            name: name of the random variable (`__rand__N`).
+
+        Returns:
+
+            the C++ expression.
+        """
+
+        var = self.parser.random_variables[name]
+        index = list(self.parser.random_variables.keys()).index(name)
+
+        if isinstance(var, parser.RandomDistributions.Uniform):
+            function = "philox_uniform"
+            arg1 = parser.code_generation(var.min, self.correspondences, self.precision)
+            arg2 = parser.code_generation(var.max, self.correspondences, self.precision)
+
+        elif isinstance(var, parser.RandomDistributions.Normal):
+            function = "philox_normal"
+            arg1 = parser.code_generation(var.mu, self.correspondences, self.precision)
+            arg2 = parser.code_generation(var.sigma, self.correspondences, self.precision)
+
+        return Template(
+            "$function<$real>(this->net->rng_key, this->id, $index, i, this->net->steps, $arg1, $arg2)"
+        ).substitute(function=function, real=self.real, index=index, arg1=arg1, arg2=arg2)
+
     def reset_inputs(self) -> str:
 
         """ Sets the conductances to 0 at the beginning of a step if required.
@@ -214,6 +446,31 @@ $draw
 
         return code
 
+    def input_accessor(self) -> str:
+
+        """Returns a pointer to an input variable from its name.
+
+        Projections retrieve their target once at creation, so the same synapse class can feed different inputs.
+        Only non-shared floating-point inputs can receive projections.
+        
+        Returns:
+
+            the content of the `input()` C++ method.
+        """
+
+        code = ""
+
+        for var in self.parser.inputs:
+            if var in self.parser.shared or self.parser.dtypes[var] != 'float':
+                continue
+            code += Template("""
+        if(name == "$g") return &this->$g;""").substitute(g=var)
+
+        code += """
+        throw std::invalid_argument(name + " is not an input variable.");"""
+
+        return code
+
     def update(self) -> str:
 
         """Processes the Neuron.update() field.
@@ -226,39 +483,234 @@ $draw
 
         # Block template
         tlp_block = Template("""
+$invariants
+$directive
         for(unsigned int i = 0; i< this->size; i++){
 $update
         }
         """)
 
+        invariants, blocks = self.hoist(self.parser.update_equations)
+
+        return tlp_block.substitute(
+            invariants=invariants,
+            update=self.draws(self.parser.update_equations) + self.equations(blocks), 
+            directive=self.loop_directive(self.parser.update_equations)
+        )
+
+    def hoist(self, blocks:list) -> tuple:
+
+        """Extracts the sub-expressions which are the same for all neurons out of the loop.
+
+        A sub-expression is invariant when it only depends on numbers, `t`, `dt`, the propagators of the exact 
+        method and shared attributes which are not assigned inside the loop, e.g. the step size `1 - exp(-dt/tau)` 
+        of the exponential method. 
+        Invariant factors and terms of products and sums are grouped (`dt/tau` in `dt*(A - v)/tau`). 
+        Each invariant sub-expression is computed once per step in a `const` variable declared before the loop. 
+        Invariants depending on `t` are computed and stored in double precision, like `t` itself.
+
+        Args:
+
+            blocks: list of blocks of equations computed inside the loop.
+
+        Returns:
+
+            the declarations to put before the loop, and copies of the blocks using them.
+        """
+
+        # Shared attributes assigned in the loop change from one neuron to the next
+        assigned = set()
+        for block in blocks:
+            for eq in block.equations:
+                if eq['type'] != 'tmp':
+                    assigned.add(eq['name'])
+
+        invariant_symbols = set(['t', 'dt'])
+        for attr in self.parser.shared:
+            if not attr in assigned:
+                invariant_symbols.add(attr)
+
+        # Propagators of the exact method
+        for block in blocks:
+            propagator = getattr(block, 'propagator', None)
+            if propagator is not None:
+                for matrix in ['P', 'Q']:
+                    invariant_symbols.update([str(symbol) for symbol in propagator[matrix].values()])
+
+        def is_invariant(expr) -> bool:
+            for symbol in expr.free_symbols:
+                if str(symbol) in invariant_symbols:
+                    continue
+                try:
+                    # Numbers protected by cast()
+                    float(str(symbol))
+                except ValueError:
+                    return False
+            return True
+
+        hoisted = {}
+
+        def invariant(expr) -> sp.Symbol:
+            if not expr in hoisted.keys():
+                hoisted[expr] = sp.Symbol("__inv__" + str(len(hoisted)))
+            return hoisted[expr]
+
+        def extract(expr):
+            if expr.is_Atom:
+                return expr
+            if isinstance(expr, sp.Expr) and is_invariant(expr):
+                return invariant(expr)
+            # Group the invariant terms of a sum or factors of a product
+            if isinstance(expr, (sp.Add, sp.Mul)):
+                constant = [arg for arg in expr.args if is_invariant(arg)]
+                variable = [extract(arg) for arg in expr.args if not is_invariant(arg)]
+                if len(constant) > 1 or (len(constant) == 1 and not constant[0].is_Atom):
+                    constant = [invariant(expr.func(*constant))]
+                return expr.func(*(constant + variable))
+            return expr.func(*[extract(arg) for arg in expr.args])
+
+        new_blocks = []
+        for block in blocks:
+            new_block = copy.copy(block)
+            new_block.equations = []
+            for eq in block.equations:
+                eq = dict(eq)
+                if isinstance(eq['rhs'], sp.Basic):
+                    eq['rhs'] = extract(eq['rhs'])
+                new_block.equations.append(eq)
+            new_blocks.append(new_block)
+
+        # Declarations
+        code = self.propagators(blocks)
+        for expr, symbol in hoisted.items():
+            time_dependent = sp.Symbol('t') in expr.free_symbols
+            code += Template("""
+        const $real $name = $rhs;""").substitute(
+                real='double' if time_dependent else self.real, 
+                name=symbol, 
+                rhs=parser.code_generation(expr, self.correspondences, 'float64' if time_dependent else self.precision)
+            )
+
+        return code, new_blocks
+
+    def equations(self, blocks:list) -> str:
+
+        """Generates the code for blocks of equations inside a loop over neurons.
+
+        The sub-expressions used several times in a segment of a block (see `segments()`) are computed 
+        once in `const` temporaries placed before the segment, using `sympy.cse()`.
+
+        Args:
+
+            blocks: list of blocks of equations.
+
+        Returns:
+
+            the body of the loop.
+        """
+
         # Equation template
         tpl_eq = Template("""
             // $hr
             $lhs $op $rhs;
         """)
 
+        # Common sub-expression template
+        tpl_cse = Template("""
+            const $ctype $name = $rhs;""")
+
         # Iterate over all blocks of equations
         code = ""
-        for block in self.parser.update_equations:
-            for eq in block.equations:
-
-                # Temporary variables
-                if eq['type'] == 'tmp':
-                    code += tpl_eq.substitute(
-                        lhs = "double " + eq['name'],
-                        op = eq['op'],
-                        rhs = parser.code_generation(eq['rhs'], self.correspondences),
-                        hr = eq['human-readable']
-                    )
-                else:
-                    code += tpl_eq.substitute(
-                        lhs = "this->"+eq['name'] if eq['name'] in self.parser.shared else "this->"+eq['name'] + "[i]",
-                        op = eq['op'],
-                        rhs = parser.code_generation(eq['rhs'], self.correspondences),
-                        hr = eq['human-readable']
+        for block in blocks:
+            for segment in self.segments(block.equations):
+
+                # Common sub-expressions
+                exprs = [eq['rhs'] for eq in segment if isinstance(eq['rhs'], sp.Basic)]
+                replacements, reduced = sp.cse(
+                    exprs, 
+                    symbols=sp.numbered_symbols("__cse__", start=self._nb_cse)
+                )
+                self._nb_cse += len(replacements)
+
+                # Negations are free, they are not worth a temporary
+                trivial = {}
+                for symbol, expr in replacements:
+                    if (-expr).is_Atom:
+                        trivial[symbol] = expr.xreplace(trivial)
+                replacements = [(symbol, expr.xreplace(trivial)) for symbol, expr in replacements if not symbol in trivial]
+                reduced = [expr.xreplace(trivial) for expr in reduced]
+
+                for symbol, expr in replacements:
+                    code += tpl_cse.substitute(
+                        ctype = "bool" if isinstance(expr, sp.logic.boolalg.Boolean) else self.real,
+                        name = symbol,
+                        rhs = parser.code_generation(expr, self.correspondences, self.precision),
                     )
 
-        return tlp_block.substitute(update=code)
+                for eq in segment:
+
+                    rhs = reduced.pop(0) if isinstance(eq['rhs'], sp.Basic) else eq['rhs']
+
+                    # Temporary variables
+                    if eq['type'] == 'tmp':
+                        code += tpl_eq.substitute(
+                            lhs = self.real + " " + eq['name'],
+                            op = eq['op'],
+                            rhs = parser.code_generation(rhs, self.correspondences, self.precision),
+                            hr = eq['human-readable']
+                        )
+                    else:
+                        code += tpl_eq.substitute(
+                            lhs = "this->"+eq['name'] if eq['name'] in self.parser.shared else "this->"+eq['name'] + "[i]",
+                            op = eq['op'],
+                            rhs = parser.code_generation(rhs, self.correspondences, self.precision),
+                            hr = eq['human-readable']
+                        )
+
+        return code
+
+    def segments(self, equations:list) -> list:
+
+        """Splits a list of equations into segments sharing common sub-expressions.
+
+        Equations are evaluated in order, so a new segment starts when an equation reads a variable 
+        assigned earlier in the current segment: the temporaries computed before the segment must 
+        not depend on the values modified inside it.
+
+        Args:
+
+            equations: list of equations of a block.
+
+        Returns:
+
+            a list of lists of equations.
+        """
+
+        segments = []
+        current = []
+        assigned = set()
+
+        for eq in equations:
+            if isinstance(eq['rhs'], sp.Basic):
+                used = set([str(symbol) for symbol in eq['rhs'].free_symbols])
+            else:
+                used = set()
+            # Increments also read the variable
+            if eq['op'] != "=":
+                used.add(eq['name'])
+
+            if len(used & assigned) > 0:
+                segments.append(current)
+                current = []
+                assigned = set()
+
+            current.append(eq)
+            assigned.add(eq['name'])
+
+        if len(current) > 0:
+            segments.append(current)
+
+        return segments
 
     def spike(self) -> str:
 
@@ -279,7 +731,7 @@ $update
         }
         """)
 
-        cond = parser.code_generation(self.parser.spike_condition.equation['eq'], self.correspondences)
+        cond = parser.code_generation(self.parser.spike_condition.equation['eq'], self.correspondences, self.precision)
 
         return tpl_spike.substitute(condition=cond)
 
@@ -294,31 +746,211 @@ $update
         """
 
         tpl_reset = Template("""
+$invariants
+$directive
         for(unsigned int idx = 0; idx< this->spikes.size(); idx++){
                 int i = this->spikes[idx];
 $reset
         }
         """)
 
-        # Equation template
-        tpl_eq = Template("""
-            // $hr
-            $lhs $op $rhs;
+        invariants, blocks = self.hoist(self.parser.reset_equations)
+
+        return tpl_reset.substitute(
+            invariants=invariants,
+            reset=self.equations(blocks),
+            directive=self.loop_directive(self.parser.reset_equations)
+        )
+
+    def fused_update(self) -> str:
+
+        """Processes rng(), update(), spike() and reset() in a single loop over the neurons.
+
+        Each attribute is streamed through the cache only once per step, 
+        and random numbers are drawn when needed instead of being stored in arrays.
+        
+        Returns:
+
+            the content of the `fused_update()` C++ method.
+
+        """
+
+        tpl_fused = Template("""
+$clear
+$invariants
+$directive
+        for(unsigned int i = 0; i< this->size; i++){
+$body
+        }
         """)
 
-        # Iterate over all blocks of equations
+        clear = "        this->spikes.clear();" if self.parser.is_spiking() else ""
+
+        invariants, update_blocks, reset_blocks = self.fused_hoist()
+
+        return tpl_fused.substitute(
+            clear=clear,
+            invariants=invariants,
+            body=self.fused_body(update_blocks=update_blocks, reset_blocks=reset_blocks),
+            directive=self.loop_directive(self.parser.update_equations + self.parser.reset_equations)
+        )
+
+    def fused_hoist(self) -> tuple:
+
+        """Extracts the invariant sub-expressions of the update and reset equations out of the fused loop.
+
+        Returns:
+
+            the declarations to put before the loop, the update blocks and the reset blocks.
+        """
+
+        nb_update = len(self.parser.update_equations)
+
+        invariants, blocks = self.hoist(self.parser.update_equations + self.parser.reset_equations)
+
+        return invariants, blocks[:nb_update], blocks[nb_update:]
+
+    def fused_body(self, 
+        spike_buffer:str = "this->spikes", 
+        update_blocks:list = None, 
+        reset_blocks:list = None) -> str:
+
+        """Body of the fused loop.
+
+        Args:
+
+            spike_buffer: vector receiving the index of the spiking neurons.
+            update_blocks: update equations, `parser.update_equations` by default.
+            reset_blocks: reset equations, `parser.reset_equations` by default.
+
+        Returns:
+
+            the code for a single neuron.
+        """
+
+        if update_blocks is None:
+            update_blocks = self.parser.update_equations
+        if reset_blocks is None:
+            reset_blocks = self.parser.reset_equations
+
+        # Random variables
+        code = self.draws() + self.equations(update_blocks)
+
+        # Spike emission and reset
+        if self.parser.is_spiking():
+
+            tpl_spike = Template("""
+            if ($condition){
+                $buffer.push_back(i);
+$reset
+            }""")
+
+            code += tpl_spike.substitute(
+                condition=parser.code_generation(self.parser.spike_condition.equation['eq'], self.correspondences, self.precision),
+                buffer=spike_buffer,
+                reset=textwrap.indent(self.equations(reset_blocks), '    '),
+            )
+
+        return code
+
+    def loop_directive(self, blocks:list) -> str:
+
+        """Directive placed in front of the loops over neurons.
+
+        The single-threaded backend does not need any.
+
+        Args:
+
+            blocks: blocks of equations computed inside the loop.
+
+        Returns:
+
+            an empty string.
+        """
+
+        return ""
+
+
+    def memory(self) -> str:
+        """Generates the body of the `memory()` method, measuring the bytes allocated by the population.
+
+        Arrays are measured by their capacity. The keys are the names of the attributes and 
+        of the buffered random variables, `'spikes'` and the names of the propagator arrays.
+
+        Returns:
+
+            the code filling the `memory` map.
+        """
+
+        tpl = Template("""
+    memory["$name"] = $bytes;""")
+
         code = ""
-        for block in self.parser.reset_equations:
-            for eq in block.equations:
-                code += tpl_eq.substitute(
-                    lhs = "this->"+eq['name'] if eq['name'] in self.parser.shared else "this->"+eq['name'] + "[i]",
-                    op = eq['op'],
-                    rhs = parser.code_generation(eq['rhs'], self.correspondences),
-                    hr = eq['human-readable']
-                )
+        for attr in self.parser.attributes:
+            if attr in self.parser.shared:
+                code += tpl.substitute(name=attr, bytes="sizeof(this->" + attr + ")")
+            else:
+                code += tpl.substitute(name=attr, bytes="memory_of(this->" + attr + ")")
+
+        for name in self.buffered_variables:
+            code += tpl.substitute(name=name, bytes="memory_of(this->" + name + ")")
+
+        if self.parser.is_spiking():
+            code += tpl.substitute(name="spikes", bytes=self.spike_memory())
+
+        for block in self.parser.update_equations:
+            propagator = getattr(block, 'propagator', None)
+            if propagator is None:
+                continue
+            for matrix in ['A', 'P', 'Q']:
+                name = "__" + matrix + "__" + propagator['name']
+                code += tpl.substitute(name=name, bytes="memory_of(this->" + name + ")")
+
+        return code
+
+    def snapshot(self) -> tuple:
+        """Generates the `State` structure of the population and the methods copying the attributes into it and back.
+
+        The state contains the attributes and, for spiking populations, the last spikes. Random variables 
+        are drawn again at each step and the propagators only depend on the parameters: they are not copied.
+
+        Returns:
+
+            a tuple of multiline strings: declaration of the members of `State`, 
+            bodies of `copy_to()` and of `copy_from()`.
+        """
+
+        state_attributes = ""
+        copy_to = ""
+        copy_from = ""
+
+        names = list(self.parser.attributes)
+        for attr in self.parser.attributes:
+            ctype = self.attribute_type(attr)
+            if attr in self.parser.shared:
+                state_attributes += Template(
+                    "        $ctype $attr;\n").substitute(attr=attr, ctype=ctype)
+            else:
+                state_attributes += Template(
+                    "        std::vector<$ctype> $attr;\n").substitute(attr=attr, ctype=ctype)
 
-        return tpl_reset.substitute(reset=code)
+        if self.parser.is_spiking():
+            state_attributes += "        std::vector<int> spikes;\n"
+            names.append("spikes")
+
+        for name in names:
+            copy_to += Template("""
+    state.$name = this->$name;""").substitute(name=name)
+            copy_from += Template("""
+    this->$name = state.$name;""").substitute(name=name)
+
+        return state_attributes, copy_to, copy_from
+
+    def spike_memory(self) -> str:
+        """Returns the C++ expression of the bytes allocated by the spike arrays.
+        """
 
+        return "memory_of(this->spikes)"
 
     def cython_export(self):
         """Generates declaration of the C++ class for Cython.
@@ -328,20 +960,24 @@ $reset
         # Parameters
         attributes = ""
         for attr in self.parser.attributes:
+            ctype = generator.cython_types[self.attribute_type(attr)]
             if attr in self.parser.shared:
                 attributes += Template(
-                    "        double $attr\n").substitute(attr=attr)
+                    "        $ctype $attr\n").substitute(attr=attr, ctype=ctype)
             else:
                 attributes += Template(
-                    "        vector[double] $attr\n").substitute(attr=attr)
+                    "        vector[$ctype] $attr\n").substitute(attr=attr, ctype=ctype)
 
+        # Neurons which emitted a spike at the last step
+        if self.parser.is_spiking():
+            attributes += "        vector[int] spikes\n"
 
         code = Template("""
     # $name
     cdef cppclass cppNeuron_$name :
         
         # Constructor
-        cppNeuron_$name(Network*, int) except +
+        cppNeuron_$name(Network*, int, int) except +
         
         # Number of neurons
         int size
@@ -352,6 +988,9 @@ $reset
         void spike()
         void reset()
         void rng()
+
+        # Memory
+        map[string, size_t] memory()
         
         # Attributes
 $attributes
@@ -364,37 +1003,49 @@ $attributes
 
     def cython_wrapper(self):
 
+        # Arrays are exposed as NumPy views on the C++ storage, which is never reallocated
         tpl = Template("""
     property $attr:
         def __get__(self):
-            return self.instance.$attr
-        def __set__(self, vector[double] value): 
-            self.instance.$attr = value
+            return _view(self, self.instance.$attr.data(), self.instance.$attr.size(), $typenum)
+        def __set__(self, value): 
+            _view(self, self.instance.$attr.data(), self.instance.$attr.size(), $typenum)[:] = value
 """)
        
         tpl_shared = Template("""
     property $attr:
         def __get__(self):
             return self.instance.$attr
-        def __set__(self, double value): 
+        def __set__(self, $ctype value): 
             self.instance.$attr = value
 """)
         
         # Attributes
         attributes = ""
         for attr in self.parser.attributes:
+            ctype = self.attribute_type(attr)
             if attr in self.parser.shared:
-                attributes += tpl_shared.substitute(attr=attr)
+                attributes += tpl_shared.substitute(attr=attr, ctype=generator.cython_types[ctype])
             else:
-                attributes += tpl.substitute(attr=attr)
+                attributes += tpl.substitute(attr=attr, typenum=generator.numpy_types[ctype])
+
+        # Ranks of the neurons which emitted a spike at the last step (copies, the list changes size)
+        if self.parser.is_spiking():
+            attributes += """
+    property spikes:
+        def __get__(self):
+            return np.array(self.instance.spikes, dtype=np.int32)
+        def __set__(self, value):
+            self.instance.spikes = [int(rank) for rank in value]
+"""
 
         code = Template("""
 cdef class pyNeuron_$name(object):
 
     cdef cppNeuron_$name* instance
 
-    def __cinit__(self, pyNetwork net, int size):
-        self.instance = new cppNeuron_$name(net.instance, size)
+    def __cinit__(self, pyNetwork net, int size, int id):
+        self.instance = new cppNeuron_$name(net.instance, size, id)
     
     def __dealloc__(self):
         del self.instance
@@ -416,6 +1067,11 @@ cdef class pyNeuron_$name(object):
         self.instance.spike()
     def rng(self):
         self.instance.rng()
+
+    def memory(self):
+        "Returns the bytes allocated by each array of the population."
+        cdef dict memory = self.instance.memory()
+        return {name.decode('utf-8'): size for name, size in memory.items()}
             
     # Attributes
 $attributes
@@ -424,4 +1080,148 @@ $attributes
         return code.substitute(
             name=self.name,
             attributes=attributes,
-        )
\ No newline at end of file
+        )
+
+    def monitor(self) -> str:
+        """Generates the C++ monitor class recording the attributes of the neuron type.
+
+        Each attribute has a flag telling whether it is recorded and a contiguous buffer, 
+        preallocated by `Network::simulate()` for the planned number of steps.
+
+        Returns:
+
+            the content of the cppMonitor_*.hpp file.
+        """
+
+        template_h = generator.fetch_template('/generator/SingleThread/templates/Monitor.hpp')
+
+        declared_buffers = ""
+        reserve_buffers = ""
+        record_buffers = ""
+        clear_buffers = ""
+        memory_buffers = ""
+
+        for attr in self.parser.attributes:
+
+            # Buffers have the type of the array elements, so booleans are stored as bytes
+            declared_buffers += Template("""
+    bool record_$attr = false;
+    std::vector<$ctype> $attr;""").substitute(attr=attr, ctype=self.buffer_type(attr))
+
+            clear_buffers += Template("""
+        this->$attr.clear();""").substitute(attr=attr)
+
+            memory_buffers += Template("""
+        if(this->record_$attr) memory["$attr"] = memory_of(this->$attr);""").substitute(attr=attr)
+
+            if attr in self.parser.shared:
+                reserve_buffers += Template("""
+        if(this->record_$attr) reserve_buffer(this->$attr, this->nb_steps + n_steps);""").substitute(attr=attr)
+                record_buffers += Template("""
+        if(this->record_$attr) this->$attr.push_back(this->pop->$attr);""").substitute(attr=attr)
+            else:
+                reserve_buffers += Template("""
+        if(this->record_$attr) reserve_buffer(this->$attr, (this->nb_steps + n_steps) * this->pop->size);""").substitute(attr=attr)
+                record_buffers += Template("""
+        if(this->record_$attr) this->$attr.insert(this->$attr.end(), this->pop->$attr.begin(), this->pop->$attr.end());""").substitute(attr=attr)
+
+        return template_h.substitute(
+            class_name = self.name,
+            declared_buffers = declared_buffers,
+            reserve_buffers = reserve_buffers,
+            record_buffers = record_buffers,
+            clear_buffers = clear_buffers,
+            memory_buffers = memory_buffers,
+        )
+
+    def monitor_export(self) -> str:
+        """Generates declaration of the C++ monitor class for Cython.
+
+        """
+
+        attributes = ""
+        for attr in self.parser.attributes:
+            attributes += Template("""
+        bint record_$attr
+        vector[$ctype] $attr""").substitute(attr=attr, ctype=generator.cython_types[self.buffer_type(attr)])
+
+        code = Template("""
+    # Monitor for $name
+    cdef cppclass cppMonitor_$name(cMonitor) :
+
+        # Constructor
+        cppMonitor_$name(cppNeuron_$name*) except +
+
+        # Number of recorded steps
+        size_t nb_steps
+
+        # Methods
+        void clear()
+        map[string, size_t] memory()
+
+        # Buffers
+$attributes
+""").substitute(
+        name=self.name,
+        attributes=attributes,
+        )
+
+        return code
+
+    def monitor_wrapper(self) -> str:
+        """Generates the Cython wrapper of the C++ monitor class.
+
+        """
+
+        tpl_start = Template("""
+        if '$attr' in attributes:
+            self.instance.record_$attr = True""")
+
+        tpl_get = Template("""
+        if name == '$attr':
+            return _buffer_to_array(self.instance.$attr.data(), self.instance.$attr.size(), $typenum, 
+                self.instance.nb_steps, $shared)""")
+
+        start = ""
+        get = ""
+        for attr in self.parser.attributes:
+            start += tpl_start.substitute(attr=attr)
+            get += tpl_get.substitute(attr=attr, shared=attr in self.parser.shared, 
+                typenum=generator.numpy_types[self.buffer_type(attr)])
+
+        code = Template("""
+cdef class pyMonitor_$name(object):
+
+    cdef cppMonitor_$name* instance
+    cdef list attributes
+
+    def __cinit__(self, pyNeuron_$name pop, list attributes):
+        self.instance = new cppMonitor_$name(pop.instance)
+        self.attributes = attributes
+$start
+
+    def __dealloc__(self):
+        del self.instance
+
+    def get(self, str name):
+        "Returns the recorded values of an attribute as a (time, neurons) array."
+$get
+
+    def get_all(self):
+        "Returns the recorded values of all monitored attributes."
+        return {name: self.get(name) for name in self.attributes}
+
+    def clear(self):
+        self.instance.clear()
+
+    def memory(self):
+        "Returns the number of recorded steps and the bytes allocated by the buffers of the recorded attributes."
+        cdef dict memory = self.instance.memory()
+        return self.instance.nb_steps, {name.decode('utf-8'): size for name, size in memory.items()}
+""")
+
+        return code.substitute(
+            name=self.name,
+            start=start,
+            get=get,
+        )
@@ -12,10 +12,17 @@ class ProjectionGenerator(object):
 
     """Generates a C++ file corresponding to a Synapse description.
 
+    The connectivity is stored in the CSR format (`modules/CSR.hpp`): the synapses of the post-synaptic 
+    neuron `i` are stored between `row_ptr[i]` and `row_ptr[i+1]`, the non-shared attributes being 
+    contiguous arrays of `nnz` values in the same order.
+
     Attributes:
 
         name: name of the class.
         parser: instance of SynapseParser.
+        instances: pairs of (pre, post) neuron classes connected by the synapse.
+        precision: floating-point precision of the network ('float64' or 'float32').
+        real: C++ floating-point type.
         correspondences: dictionary of pairs (symbol -> implementation).
 
     """
@@ -23,17 +30,24 @@ class ProjectionGenerator(object):
 
     def __init__(self, 
         name : str, 
-        parser : 'parser.SynapseParser'):
+        parser : 'parser.SynapseParser',
+        instances : list = None,
+        precision : str = 'float64'):
 
         """
         Args:
 
             name (str): name of the class.
             parser (parser.SynapseParser): parser for the synapse.
+            instances (list): pairs of (pre, post) neuron classes connected by the synapse.
+            precision (str): floating-point precision, 'float64' or 'float32'.
         """
         
         self.name:str = name
         self.parser:'parser.SynapseParser' = parser
+        self.instances:list = instances if instances is not None else []
+        self.precision:str = precision
+        self.real:str = generator.attribute_type('float', precision)
 
         self.correspondences = self.get_correspondences()
 
@@ -41,32 +55,35 @@ class ProjectionGenerator(object):
 
         # Build a correspondance dictionary
         correspondences = {
-            't': 'this->t',
-            'dt': 'this->dt',
+            't': 'this->net->t',
+            'dt': 'this->net->dt',
         }
+        # The time step must not promote single precision computations to double
+        if self.precision == 'float32':
+            correspondences['dt'] = 'static_cast<float>(this->net->dt)'
 
         for attr in self.parser.attributes:
             if attr in self.parser.shared:
                 correspondences[attr] = "this->" + attr
             else:
-                correspondences[attr] = "this->" + attr + "[i][j]"
+                correspondences[attr] = "this->" + attr + "[idx]"
 
         for attr in self.parser.synapse.pre_attributes:
             if attr in self.parser.pre._parser.shared:
                 correspondences["pre."+attr] = "this->pre->" + attr
             else:
-                correspondences["pre."+attr] = "this->pre->" + attr + "[i]"
+                correspondences["pre."+attr] = "this->pre->" + attr + "[j]"
 
         for attr in self.parser.synapse.post_attributes:
             if attr in self.parser.post._parser.shared:
                 correspondences["post."+attr] = "this->post->" + attr
             else:
-                correspondences["post."+attr] = "this->post->" + attr + "[j]"
+                correspondences["post."+attr] = "this->post->" + attr + "[i]"
 
         return correspondences
 
 
-    def generate(self) -> str:
+    def generate(self) -> tuple:
 
         """Generates the C++ code. 
 
@@ -76,11 +93,13 @@ class ProjectionGenerator(object):
         
         Returns:
         
-            a multiline string for the .h header file and .cpp body file.
+            a tuple of multiline strings for the .hpp header file (declaration) 
+            and the .cpp source file (method bodies and explicit instantiations).
         """
 
-        # Get the Projection.hpp template
+        # Get the Projection.hpp and Projection.cpp templates
         template_h = generator.fetch_template('/generator/SingleThread/templates/Projection.hpp')
+        template_cpp = generator.fetch_template('/generator/SingleThread/templates/Projection.cpp')
 
         # Initialize arrays
         initialize_arrays = ""
@@ -88,15 +107,15 @@ class ProjectionGenerator(object):
         # Attributes
         declared_attributes = ""
         for attr in self.parser.attributes:
+            ctype = self.attribute_type(attr)
             if attr in self.parser.shared:
                 declared_attributes += Template(
-                    "    double $attr;\n").substitute(attr=attr)
+                    "    $ctype $attr;\n").substitute(attr=attr, ctype=ctype)
             else:
                 declared_attributes += Template(
-                    "    std::vector< std::vector<double> > $attr;\n").substitute(attr=attr)
-                initialize_arrays += Template("""
-        this->$attr = std::vector< std::vector<double> >(this->post->size, std::vector<double>(this->pre->size, 0.0));
-                """).substitute(attr=attr) # TODO
+                    "    std::vector<$ctype> $attr;\n").substitute(attr=attr, ctype=ctype)
+                initialize_arrays += Template(
+                    "        this->$attr = std::vector<$ctype>(this->connectivity.nnz, 0);\n").substitute(attr=attr, ctype=ctype)
 
         # Update method
         update_method = self.update()
@@ -104,17 +123,68 @@ class ProjectionGenerator(object):
         # Weighted sum or spike transmission
         collect_inputs_method = self.collect_inputs()
 
+        # Memory accounting
+        memory_method = ""
+        for attr in self.parser.attributes:
+            memory_method += Template("""
+    memory["$attr"] = $bytes;""").substitute(attr=attr, 
+                bytes="sizeof(this->" + attr + ")" if attr in self.parser.shared else "memory_of(this->" + attr + ")")
+
 
-        # Generate code
-        code = template_h.substitute(
+        # Copies used by the snapshots
+        state_attributes = ""
+        copy_to_method = ""
+        copy_from_method = ""
+        for attr in self.parser.attributes:
+            ctype = self.attribute_type(attr)
+            state_attributes += Template("        $ctype $attr;\n").substitute(attr=attr, 
+                ctype=ctype if attr in self.parser.shared else "std::vector<" + ctype + ">")
+            copy_to_method += Template("""
+    state.$attr = this->$attr;""").substitute(attr=attr)
+            copy_from_method += Template("""
+    this->$attr = state.$attr;""").substitute(attr=attr)
+
+        # The template is only compiled for the pairs of populations actually connected
+        instantiations = ""
+        for pre, post in self.instances:
+            instantiations += Template(
+                "template class cppSynapse_$name<cppNeuron_$pre, cppNeuron_$post>;\n").substitute(
+                    name=self.name, pre=pre, post=post)
+
+        # Generate the declaration
+        header = template_h.substitute(
             class_name = self.name,
+            real = self.real,
             declared_attributes = declared_attributes,
+            state_attributes = state_attributes,
+        )
+
+        # Generate the method bodies
+        source = template_cpp.substitute(
+            class_name = self.name,
             initialize_arrays = initialize_arrays,
             update_method = update_method,
             collect_inputs_method = collect_inputs_method,
+            memory_method = memory_method,
+            copy_to_method = copy_to_method,
+            copy_from_method = copy_from_method,
+            instantiations = instantiations,
         )
         
-        return code
+        return header, source
+
+    def attribute_type(self, attr:str, neuron_parser:'parser.NeuronParser' = None) -> str:
+        """Returns the C++ type of an attribute, depending on its dtype and on the precision.
+
+        Args:
+
+            attr: name of the attribute.
+            neuron_parser: parser of the pre- or post-synaptic neuron if the attribute belongs to it.
+        """
+
+        owner = self.parser if neuron_parser is None else neuron_parser
+
+        return generator.attribute_type(owner.dtypes[attr], self.precision, attr in owner.shared)
 
     def update(self) -> str:
 
@@ -127,8 +197,10 @@ class ProjectionGenerator(object):
         """
         # Block template
         tlp_block = Template("""
+$directive
         for(unsigned int i = 0; i< this->post->size; i++){
-            for(unsigned int j = 0; i< this->pre->size; i++){
+            for(size_t idx = this->connectivity.row_ptr[i]; idx < this->connectivity.row_ptr[i+1]; idx++){
+                const unsigned int j = this->connectivity.col_idx[idx];
 $update
             }
         }""")
@@ -142,40 +214,156 @@ $update
         # Iterate over all blocks of equations
         code = ""
         for block in self.parser.update_equations:
+
+            # The propagators of the exact method are only computed by the populations
+            if getattr(block, 'propagator', None) is not None:
+                logger = logging.getLogger(__name__)
+                logger.error("The exact method is only available for neurons (synapse " + self.name + ").")
+                sys.exit(1)
+
             for eq in block.equations:
 
                 # Temporary variables
                 if eq['type'] == 'tmp':
                     code += tpl_eq.substitute(
-                        lhs = "double " + eq['name'],
+                        lhs = self.real + " " + eq['name'],
                         op = eq['op'],
-                        rhs = parser.code_generation(eq['rhs'], self.correspondences),
+                        rhs = parser.code_generation(eq['rhs'], self.correspondences, self.precision),
                         hr = eq['human-readable']
                     )
                 else:
                     code += tpl_eq.substitute(
                         lhs = "this->"+eq['name'] if eq['name'] in self.parser.shared 
-                                else "this->"+eq['name'] + "[i][j]",
+                                else "this->"+eq['name'] + "[idx]",
                         op = eq['op'],
-                        rhs = parser.code_generation(eq['rhs'], self.correspondences),
+                        rhs = parser.code_generation(eq['rhs'], self.correspondences, self.precision),
                         hr = eq['human-readable']
                     )
 
-        return tlp_block.substitute(update=code)
+        return tlp_block.substitute(
+            update=code,
+            directive=self.loop_directive(self.parser.update_equations)
+        )
 
     def collect_inputs(self) -> str:
 
-        code = """
-        std::vector<double> res = std::vector<double>(this->post->size, 0.0);
+        """Processes the Synapse.transmit() field.
+
+        The increments of all synapses of a post-synaptic neuron are summed and added to the target, 
+        so that several projections can share the same target (reset by the post-synaptic population).
+        The arrays used by the increment are accessed through local pointers declared before the loops.
+
+        When the pre-synaptic population is spiking, only the synapses of the neurons which emitted 
+        a spike are visited, using the pre-indexed (CSC) view of the connectivity.
+
+        Returns:
+
+            the content of the `collect_inputs()` C++ method.
+        """
 
-        for(unsigned int i=0; i<this->post->size; i++){
-            res[i] = this->pre->r[i];
+        if self.parser.transmit_equation is None:
+            return "        // No transmission"
+
+        eq = self.parser.transmit_equation
+
+        # Local pointers to the arrays used in the increment
+        tpl_array = Template("""
+        const $ctype* $local = $attr.data();""")
+        tpl_value = Template("""
+        const $ctype $local = $attr;""")
+
+        correspondences = {
+            't': self.correspondences['t'],
+            'dt': self.correspondences['dt'],
         }
+        declarations = ""
+
+        for symbol in sorted([str(s) for s in eq['rhs'].free_symbols]):
+            if symbol in self.parser.attributes:
+                attr = "this->" + symbol
+                shared = symbol in self.parser.shared
+                ctype = self.attribute_type(symbol)
+                index = "[idx]"
+            elif symbol.startswith("pre."):
+                attr = "this->pre->" + symbol[4:]
+                shared = symbol[4:] in self.parser.pre._parser.shared
+                ctype = self.attribute_type(symbol[4:], self.parser.pre._parser)
+                index = "[j]"
+            elif symbol.startswith("post."):
+                attr = "this->post->" + symbol[5:]
+                shared = symbol[5:] in self.parser.post._parser.shared
+                ctype = self.attribute_type(symbol[5:], self.parser.post._parser)
+                index = "[i]"
+            else:
+                continue
+
+            local = "__" + symbol.replace(".", "_")
+            if shared:
+                declarations += tpl_value.substitute(local=local, attr=attr, ctype=ctype)
+                correspondences[symbol] = local
+            else:
+                declarations += tpl_array.substitute(local=local, attr=attr, ctype=ctype)
+                correspondences[symbol] = local + index
 
-        this->post->ge = res; 
+        code = Template("""
+        $real* target = this->target->data();
+$declarations
+
+        if constexpr (PrePopulation::spiking) {
+            // Event-driven: iterates over the synapses of the neurons which spiked
+            const size_t* col_ptr = this->connectivity.col_ptr.data();
+            const unsigned int* row_idx = this->connectivity.row_idx.data();
+            const size_t* inv_idx = this->connectivity.inv_idx.data();
+
+            for(const int j : this->pre->spikes){
+                for(size_t k = col_ptr[j]; k < col_ptr[j+1]; k++){
+                    const unsigned int i = row_idx[k];
+                    const size_t idx = inv_idx[k];
+                    // $hr
+                    target[i] += $psp;
+                }
+            }
+        }
+        else {
+            // Weighted sum over the rows
+            const size_t* row_ptr = this->connectivity.row_ptr.data();
+            const unsigned int* col_idx = this->connectivity.col_idx.data();
+$directive
+            for(unsigned int i = 0; i< this->post->size; i++){
+                $real sum = 0.0;
+                for(size_t idx = row_ptr[i]; idx < row_ptr[i+1]; idx++){
+                    const unsigned int j = col_idx[idx];
+                    // $hr
+                    sum += $psp;
+                }
+                target[i] += sum;
+            }
+        }""")
+
+        return code.substitute(
+            real=self.real,
+            declarations=declarations,
+            directive=self.loop_directive([]),
+            hr=eq['human-readable'],
+            psp=parser.code_generation(eq['rhs'], correspondences, self.precision),
+        )
+
+    def loop_directive(self, blocks:list) -> str:
+
+        """Directive placed in front of the loops over post-synaptic neurons.
+
+        The single-threaded backend does not need any.
+
+        Args:
+
+            blocks: blocks of equations computed inside the loop.
+
+        Returns:
+
+            an empty string.
         """
 
-        return code
+        return ""
 
     def cython_export(self):
         """Generates declaration of the C++ class for Cython.
@@ -185,24 +373,35 @@ $update
         # Parameters
         attributes = ""
         for attr in self.parser.attributes:
+            ctype = generator.cython_types[self.attribute_type(attr)]
             if attr in self.parser.shared:
                 attributes += Template(
-                    "        double $attr\n").substitute(attr=attr)
+                    "        $ctype $attr\n").substitute(attr=attr, ctype=ctype)
             else:
                 attributes += Template(
-                    "        vector[vector[double]] $attr\n").substitute(attr=attr)
+                    "        vector[$ctype] $attr\n").substitute(attr=attr, ctype=ctype)
 
 
         code = Template("""
     # $name synapse
     cdef cppclass cppSynapse_$name[PrePopulation, PostPopulation] :
         # Constructor
-        cppSynapse_$name(Network*, PrePopulation*, PostPopulation*) except +
+        cppSynapse_$name(Network*, PrePopulation*, PostPopulation*, string) except +
+
+        # Connectivity
+        cCSR[unsigned int] connectivity
+        void add_rows(cLIL[unsigned int, double]*)
+        void allocate()
+        void set_connectivity(size_t, const size_t*, const unsigned int*)
+        size_t nb_synapses()
 
         # Methods
         void collect_inputs()
         void update()
 
+        # Memory
+        map[string, size_t] memory()
+
         # Attributes
 $attributes
 """).substitute(
@@ -214,29 +413,31 @@ $attributes
 
     def cython_wrapper(self):
 
+        # Arrays are exposed as NumPy views on the C++ storage, which is never reallocated
         tpl = Template("""
     property $attr:
         def __get__(self):
-            return self.instance.$attr
-        def __set__(self, vector[vector[double]] value): 
-            self.instance.$attr = value
+            return _view(self, self.instance.$attr.data(), self.instance.$attr.size(), $typenum)
+        def __set__(self, value): 
+            _view(self, self.instance.$attr.data(), self.instance.$attr.size(), $typenum)[:] = value
 """)
        
         tpl_shared = Template("""
     property $attr:
         def __get__(self):
             return self.instance.$attr
-        def __set__(self, double value): 
+        def __set__(self, $ctype value): 
             self.instance.$attr = value
 """)
         
         # Attributes
         attributes = ""
         for attr in self.parser.attributes:
+            ctype = self.attribute_type(attr)
             if attr in self.parser.shared:
-                attributes += tpl_shared.substitute(attr=attr)
+                attributes += tpl_shared.substitute(attr=attr, ctype=generator.cython_types[ctype])
             else:
-                attributes += tpl.substitute(attr=attr)
+                attributes += tpl.substitute(attr=attr, typenum=generator.numpy_types[ctype])
 
         code = Template("""
 
@@ -244,14 +445,52 @@ $attributes
 cdef class pySynapse_${name}_${pre}_${post}(object):
 
     cdef cppSynapse_${name}[cppNeuron_${pre}, cppNeuron_${post}] *instance
+    cdef unsigned int nb_pre, nb_post
 
-    def __cinit__(self, pyNetwork net, pyNeuron_$pre pre, pyNeuron_$post post):
+    def __cinit__(self, pyNetwork net, pyNeuron_$pre pre, pyNeuron_$post post, str target):
         
-        self.instance = new cppSynapse_$name[cppNeuron_${pre}, cppNeuron_${post}](net.instance, pre.instance, post.instance)
+        self.instance = new cppSynapse_$name[cppNeuron_${pre}, cppNeuron_${post}](net.instance, pre.instance, post.instance, target.encode('UTF-8'))
+        self.nb_pre = pre.instance.size
+        self.nb_post = post.instance.size
 
     def __dealloc__(self):
         del self.instance  
 
+    # Connectivity
+    def connect(self, rows, unsigned int block_size=1024):
+        "Builds the CSR connectivity from an iterator over the pre-synaptic ranks of each post-synaptic neuron."
+        cdef cLIL[unsigned int, double]* lil
+        cdef unsigned int first, last, rk_post
+        for first in range(0, self.nb_post, block_size):
+            last = min(first + block_size, self.nb_post)
+            lil = new cLIL[unsigned int, double](last - first, self.nb_pre)
+            for rk_post in range(last - first):
+                lil.add_row_single(rk_post, next(rows), 1.0)
+            self.instance.add_rows(lil)
+            del lil
+        self.instance.allocate()
+
+    property nb_synapses:
+        def __get__(self):
+            return self.instance.nb_synapses()
+
+    property row_ptr:
+        "Index of the first synapse of each post-synaptic neuron (view on the CSR array)."
+        def __get__(self):
+            return _view(self, self.instance.connectivity.row_ptr.data(), self.instance.connectivity.row_ptr.size(), np.NPY_UINT64 if sizeof(size_t) == 8 else np.NPY_UINT32)
+
+    property col_idx:
+        "Rank of the pre-synaptic neuron of each synapse (view on the CSR array)."
+        def __get__(self):
+            return _view(self, self.instance.connectivity.col_idx.data(), self.instance.connectivity.col_idx.size(), np.NPY_UINT)
+
+    def set_connectivity(self, const size_t[::1] row_ptr, const unsigned int[::1] col_idx):
+        "Replaces the connectivity with CSR arrays and reallocates the synaptic attributes."
+        if row_ptr.shape[0] != self.nb_post + 1:
+            raise ValueError("row_ptr must have nb_post + 1 elements.")
+        cdef const unsigned int* cols = &col_idx[0] if col_idx.shape[0] > 0 else NULL
+        self.instance.set_connectivity(col_idx.shape[0], &row_ptr[0], cols)
+
     # Methods
     def update(self):
         self.instance.update()
@@ -259,6 +498,11 @@ cdef class pySynapse_${name}_${pre}_${post}(object):
     def collect_inputs(self):
         self.instance.collect_inputs()
 
+    def memory(self):
+        "Returns the bytes allocated by each array of the projection and by the connectivity."
+        cdef dict memory = self.instance.memory()
+        return {name.decode('utf-8'): size for name, size in memory.items()}
+
     # Attributes      
 $attributes
 
@@ -1,19 +1,51 @@
 import sys
 import logging
+import multiprocessing
 from string import Template
 
 import numpy as np
 
 import ANNarchy_future.generator as generator
 
+from .PopulationGenerator import PopulationGenerator
+from .ProjectionGenerator import ProjectionGenerator
+
+# Generator used by the worker processes, inherited through fork()
+_forked_generator = None
+
+def _forked_call(args:tuple):
+    "Calls a method of the generator in a worker process. Returns None if the generation failed (already logged)."
+    method, name = args
+    try:
+        return getattr(_forked_generator, method)(name)
+    except SystemExit:
+        # Exiting a worker would block the pool
+        return None
+
 
 class SingleThreadGenerator(object):
 
     """Generates the C++ code for single-threaded simulation.
 
+    Attributes:
+
+        population_generator: class generating the neuron types.
+        projection_generator: class generating the synapse types.
+
     """
 
-    def __init__(self, compiler:'generator.Compiler', description:dict, backend:str, library:str):
+    population_generator = PopulationGenerator
+    projection_generator = ProjectionGenerator
+
+    def __init__(self, 
+        compiler:'generator.Compiler', 
+        description:dict, 
+        backend:str, 
+        library:str,
+        fused:bool = False,
+        precision:str = 'float64',
+        workers:int = 1,
+        profile:bool = False):
 
         """
         Args:
@@ -22,18 +54,35 @@ class SingleThreadGenerator(object):
             description: dictionary passed by `Network`.
             backend: 'single', 'openmp', 'cuda' or 'mpi'.
             library: name of .so library.
+            fused: fuses the neural phases into a single loop per population.
+            precision: floating-point precision of the attributes, 'float64' or 'float32'.
+            workers: number of processes generating the neuron and synapse classes.
+            profile: instruments `Network::step()` with timers (see `Profiler.hpp`).
         """
         
         self.compiler = compiler
         self.description:dict = description
         self.backend = backend
         self.library = library
+        self.fused = fused
+        self.precision = precision
+        self.workers = workers
+        self.profile = profile
+
+        self._logger = logging.getLogger(__name__)
 
         self.neuron_classes:dict = {}
+        self.neuron_sources:dict = {}
         self.neuron_exports:dict = {}
         self.neuron_wrappers:dict = {}
+        self.neuron_rng:dict = {}
+
+        self.monitor_classes:dict = {}
+        self.monitor_exports:dict = {}
+        self.monitor_wrappers:dict = {}
 
         self.synapse_classes:dict = {}
+        self.synapse_sources:dict = {}
         self.synapse_exports:dict = {}
         self.synapse_wrappers:dict = {}
 
@@ -83,6 +132,12 @@ class SingleThreadGenerator(object):
         # Network.h
         self.compiler.write_file("Network.hpp", self.network_h)
 
+        # Network.cpp
+        self.compiler.write_file("Network.cpp", self.network_cpp)
+
+        # Snapshot.hpp
+        self.compiler.write_file("Snapshot.hpp", self.snapshot_h)
+
         # ANNarchyBindings.pxd
         self.compiler.write_file("ANNarchyBindings.pxd", self.cython_bindings)
 
@@ -92,66 +147,179 @@ class SingleThreadGenerator(object):
         # Neuron classes
         for name, code in  self.neuron_classes.items():
             self.compiler.write_file("cppNeuron_"+name+".hpp", code)
+            self.compiler.write_file("cppNeuron_"+name+".cpp", self.neuron_sources[name])
+
+        # Monitor classes
+        for name, code in  self.monitor_classes.items():
+            self.compiler.write_file("cppMonitor_"+name+".hpp", code)
 
         # Synapse classes
         for name, code in  self.synapse_classes.items():
             self.compiler.write_file("cppSynapse_"+name+".hpp", code)
+            self.compiler.write_file("cppSynapse_"+name+".cpp", self.synapse_sources[name])
+
+        # Connectivity structures
+        for filename in ["LIL.hpp", "CSR.hpp", "Monitor.hpp", "Expm.hpp", "Philox.hpp", "Profiler.hpp", "Memory.hpp"]:
+            self.compiler.write_file(filename, generator.fetch_module(filename))
+
+    def map(self, method:str, names:list) -> list:
+        """Calls a generation method for each type, possibly in parallel.
+
+        With more than one worker, the types are distributed over a pool of processes created with `fork()`, 
+        so that the parsers (sympy expressions, user-defined classes) do not need to be pickled: 
+        only the generated code is sent back. The results are returned in the order of `names`, 
+        so the generated files do not depend on the scheduling.
+
+        Args:
+
+            method: name of the method, taking the name of the type as argument.
+            names: names of the neuron or synapse types.
+
+        Returns:
+
+            the list of results.
+        """
+
+        global _forked_generator
+
+        workers = min(self.workers, len(names))
+
+        if workers > 1 and not 'fork' in multiprocessing.get_all_start_methods():
+            self._logger.warning("Parallel code generation requires fork(), using a single process.")
+            workers = 1
+
+        if workers <= 1:
+            return [getattr(self, method)(name) for name in names]
+
+        _forked_generator = self
+        try:
+            with multiprocessing.get_context('fork').Pool(workers) as pool:
+                results = pool.map(_forked_call, [(method, name) for name in names], chunksize=1)
+        finally:
+            _forked_generator = None
+
+        if None in results:
+            sys.exit(1)
+
+        return results
 
     def generate_neurons(self):
-        """Generates one C++ class per neuron definition by calling `SingleThread.PopulationGenerator`.
+        """Generates one C++ class per neuron definition by calling `generate_neuron()`.
+
+        Each class is compiled in its own translation unit: the header only declares the class, 
+        the methods are defined in `cppNeuron_X.cpp`.
                 
         Sets:
         
             self.neuron_classes (dict)
+            self.neuron_sources (dict)
             self.neuron_exports (dict)
             self.neuron_wrappers (dict)
+            self.neuron_rng (dict)
+            self.monitor_classes (dict)
+            self.monitor_exports (dict)
+            self.monitor_wrappers (dict)
         """
 
-        # Generate Neuron classes        
-        neurons = self.description['neurons']
+        names = list(self.description['neurons'].keys())
 
-        for name, parser in neurons.items():
+        for name, code in zip(names, self.map('generate_neuron', names)):
+            self.neuron_classes[name] = code['header']
+            self.neuron_sources[name] = code['source']
+            self.neuron_exports[name] = code['export']
+            self.neuron_wrappers[name] = code['wrapper']
+            self.neuron_rng[name] = code['rng']
+            self.monitor_classes[name] = code['monitor']
+            self.monitor_exports[name] = code['monitor_export']
+            self.monitor_wrappers[name] = code['monitor_wrapper']
 
-            parser = generator.SingleThread.PopulationGenerator(name, parser)
+    def generate_neuron(self, name:str) -> dict:
+        """Generates the code of a neuron type by calling `SingleThread.PopulationGenerator`.
 
-            # C++ class
-            code = parser.generate()
-            self.neuron_classes[name] = code
+        Args:
+
+            name: name of the neuron type.
+
+        Returns:
+
+            a dictionary of generated code.
+        """
 
-            # Cython export
-            code = parser.cython_export()
-            self.neuron_exports[name] = code
+        parser = self.population_generator(
+            name, self.description['neurons'][name], fused=self.fused, precision=self.precision
+        )
 
-            # Cython wrapper
-            code = parser.cython_wrapper()
-            self.neuron_wrappers[name] = code
+        # C++ class
+        header, source = parser.generate()
+
+        return {
+            'header': header,
+            'source': source,
+            # Cython export and wrapper
+            'export': parser.cython_export(),
+            'wrapper': parser.cython_wrapper(),
+            # Whether rng() has to be called
+            'rng': len(parser.buffered_variables) > 0,
+            # Monitor
+            'monitor': parser.monitor(),
+            'monitor_export': parser.monitor_export(),
+            'monitor_wrapper': parser.monitor_wrapper(),
+        }
 
     def generate_synapses(self):
-        """Generates one C++ class per synapse definition by calling `SingleThread.ProjectionGenerator`.
+        """Generates one C++ class per synapse definition by calling `generate_synapse()`.
+
+        The methods of the class template are defined in `cppSynapse_X.cpp`, which explicitly 
+        instantiates the template for each pair of connected populations.
         
         Sets:
         
             self.synapse_classes (dict)
+            self.synapse_sources (dict)
+            self.synapse_exports (dict)
+            self.synapse_wrappers (dict)
         """
 
-        # Generate Synapse classes        
-        synapses = self.description['synapses']
+        names = list(self.description['synapses'].keys())
 
-        for name, parser in synapses.items():
+        for name, code in zip(names, self.map('generate_synapse', names)):
+            self.synapse_classes[name] = code['header']
+            self.synapse_sources[name] = code['source']
+            self.synapse_exports[name] = code['export']
+            self.synapse_wrappers[name] = code['wrapper']
 
-            parser = generator.SingleThread.ProjectionGenerator(name, parser)
-            
-            # C++ code
-            code = parser.generate()
-            self.synapse_classes[name] = code
+    def generate_synapse(self, name:str) -> dict:
+        """Generates the code of a synapse type by calling `SingleThread.ProjectionGenerator`.
+
+        Args:
 
-            # Cython export
-            code = parser.cython_export()
-            self.synapse_exports[name] = code
+            name: name of the synapse type.
 
-            # Cython wrapper
-            code = parser.cython_wrapper()
-            self.synapse_wrappers[name] = code
+        Returns:
+
+            a dictionary of generated code.
+        """
+
+        # Pairs of neuron classes connected by this synapse
+        instances = [
+            (pre, post) for synapse, pre, post in self.description['projection_types'] 
+            if synapse == name
+        ]
+
+        parser = self.projection_generator(
+            name, self.description['synapses'][name], instances, precision=self.precision
+        )
+        
+        # C++ code
+        header, source = parser.generate()
+
+        return {
+            'header': header,
+            'source': source,
+            # Cython export and wrapper
+            'export': parser.cython_export(),
+            'wrapper': parser.cython_wrapper(),
+        }
 
     def generate_header(self):
         """Generates ANNarchy.hpp
@@ -166,6 +334,10 @@ class SingleThreadGenerator(object):
         for name in self.neuron_classes.keys():
             neuron_includes += Template('#include "cppNeuron_$name.hpp"\n').substitute(name=name)
 
+        monitor_includes = ""
+        for name in self.monitor_classes.keys():
+            monitor_includes += Template('#include "cppMonitor_$name.hpp"\n').substitute(name=name)
+
         synapse_includes = ""
         for name in self.synapse_classes.keys():
             synapse_includes += Template('#include "cppSynapse_$name.hpp"\n').substitute(name=name)
@@ -188,6 +360,27 @@ class SingleThreadGenerator(object):
 #include <string.h>
 #include <cmath>
 #include <random>
+#include <stdexcept>
+#include <limits>
+$backend_includes
+// Memory accounting
+#include "Memory.hpp"
+
+// Connectivity
+#include "LIL.hpp"
+#include "CSR.hpp"
+
+// Recording
+#include "Monitor.hpp"
+
+// Exact integration of linear ODEs
+#include "Expm.hpp"
+
+// Random number generation
+#include "Philox.hpp"
+
+// Profiling
+#include "Profiler.hpp"
 
 // Network
 #include "Network.hpp"
@@ -195,53 +388,439 @@ class SingleThreadGenerator(object):
 // Neuron definitions
 $neuron_includes
 
+// Monitor definitions
+$monitor_includes
 // Synapse definitions
 $synapse_includes
+// Snapshots of the network
+#include "Snapshot.hpp"
 """).substitute(
+            backend_includes = self.backend_includes(),
             neuron_includes = neuron_includes,
+            monitor_includes = monitor_includes,
             synapse_includes = synapse_includes,
         )
 
-    def generate_network(self):
+    def backend_includes(self) -> str:
+        """Additional headers required by the backend.
+
+        Returns:
+
+            an empty string for the single-threaded backend.
         """
-        Generates the C++ Network class.
+
+        return ""
+
+    def generate_network(self):
+        """Generates the C++ Network class.
+
+        The network owns typed pointers to all populations and projections, 
+        so that `Network::simulate()` can run the whole simulation loop natively.
+
+        When profiling, each call of `Network::step()` and the preallocation of the recording 
+        buffers are surrounded by a monotonic timer accumulating their duration in the `cProfiler` 
+        of the network, which can also record them in a trace. Without profiling, no timer is generated.
+
+        The `cSnapshot` class copies the state of all populations and projections and restores it 
+        in place, one array copy per attribute.
+
+        Sets:
+
+            self.network_h
+            self.network_cpp
+            self.snapshot_h
+
         """
 
-        self.network_h = """#pragma once
+        # Forward declarations, containers and creators for each neuron type
+        neuron_declarations = ""
+        neuron_containers = ""
+        neuron_creators = ""
+        for name in self.neuron_classes.keys():
+            neuron_declarations += Template("class cppNeuron_$name;\n").substitute(name=name)
+            neuron_containers += Template("""
+    std::vector<cppNeuron_$name*> populations_$name;""").substitute(name=name)
+            neuron_creators += Template("""
+    void add_population(cppNeuron_$name* pop){
+        this->populations_$name.push_back(pop);
+    };
+""").substitute(name=name)
+
+        # Forward declarations of the synapse templates
+        synapse_declarations = ""
+        for name in self.synapse_classes.keys():
+            synapse_declarations += Template(
+                "template<typename PrePopulation, typename PostPopulation> class cppSynapse_$name;\n"
+            ).substitute(name=name)
+
+        # Containers and creators for each projection type
+        projection_containers = ""
+        projection_creators = ""
+        for name, pre, post in self.description['projection_types']:
+            projection_containers += Template("""
+    std::vector<cppSynapse_$name<cppNeuron_$pre, cppNeuron_$post>*> projections_${name}_${pre}_${post};""").substitute(
+                name=name, pre=pre, post=post)
+            projection_creators += Template("""
+    void add_projection(cppSynapse_$name<cppNeuron_$pre, cppNeuron_$post>* proj){
+        this->projections_${name}_${pre}_${post}.push_back(proj);
+    };
+""").substitute(name=name, pre=pre, post=post)
+
+        # Phases over populations and projections
+        tpl_pop = Template("""
+    for(auto pop : this->populations_$name) pop->$method();""")
+        tpl_proj = Template("""
+    for(auto proj : this->projections_${name}_${pre}_${post}) proj->$method();""")
+
+        # Profiled phases: each call is timed for the rank of the object in its container
+        tpl_pop_profiled = Template("""
+    for(size_t rank = 0; rank < this->populations_$name.size(); rank++){
+        auto tstart = cProfiler::clock::now();
+        this->populations_$name[rank]->$method();
+        this->profiler.add($site, rank, tstart);
+    }""")
+        tpl_proj_profiled = Template("""
+    for(size_t rank = 0; rank < this->projections_${name}_${pre}_${post}.size(); rank++){
+        auto tstart = cProfiler::clock::now();
+        this->projections_${name}_${pre}_${post}[rank]->$method();
+        this->profiler.add($site, rank, tstart);
+    }""")
+
+        # Call sites of the profiler: (phase, kind, type)
+        sites = []
+
+        def site(phase, kind, type_name):
+            sites.append((phase, kind, type_name))
+            return len(sites) - 1
+
+        def populations(method, spiking_only=False, rng_only=False):
+            code = ""
+            for name, parser in self.description['neurons'].items():
+                if spiking_only and not parser.is_spiking():
+                    continue
+                if rng_only and not self.neuron_rng[name]:
+                    continue
+                if self.profile:
+                    code += tpl_pop_profiled.substitute(name=name, method=method,
+                        site=site(method, 'population', name))
+                else:
+                    code += tpl_pop.substitute(name=name, method=method)
+            return code
+
+        def projections(method, phase):
+            code = ""
+            for name, pre, post in self.description['projection_types']:
+                if self.profile:
+                    code += tpl_proj_profiled.substitute(name=name, pre=pre, post=post, method=method,
+                        site=site(phase, 'projection', name + "_" + pre + "_" + post))
+                else:
+                    code += tpl_proj.substitute(name=name, pre=pre, post=post, method=method)
+            return code
+
+        # The fused update replaces rng(), update(), spike() and reset()
+        rng = populations('rng', rng_only=True) if not self.fused else ""
+        reset_inputs = populations('reset_inputs')
+        collect_inputs = projections('collect_inputs', 'collect_inputs')
+        if self.fused:
+            update = populations('fused_update')
+            spike = ""
+            reset = ""
+        else:
+            update = populations('update')
+            spike = populations('spike', spiking_only=True)
+            reset = populations('reset', spiking_only=True)
+        synaptic_update = projections('update', 'synaptic_update')
+
+        # Recording and whole step
+        if self.profile:
+            step_start = """    auto tstep = cProfiler::clock::now();
+"""
+            record = Template("""    auto trecord = cProfiler::clock::now();
+    for(auto monitor : this->monitors) monitor->record();
+    this->profiler.add($site, 0, trecord);
+""").substitute(site=site('record', 'network', 'monitors'))
+            step_end = Template("""
+    this->profiler.add($site, 0, tstep);""").substitute(site=site('step', 'network', 'network'))
+            reserve = Template("""    auto treserve = cProfiler::clock::now();
+    for(auto monitor : this->monitors) monitor->reserve(n_steps);
+    this->profiler.add($site, 0, treserve);
+""").substitute(site=site('reserve', 'network', 'monitors'))
+        else:
+            step_start = ""
+            record = """    for(auto monitor : this->monitors) monitor->record();
+"""
+            step_end = ""
+            reserve = """    for(auto monitor : this->monitors) monitor->reserve(n_steps);
+"""
+
+        # Snapshots: one State per object, in the order of the containers
+        snapshot_containers = ""
+        snapshot_copy = ""
+        snapshot_check = ""
+        snapshot_restore_populations = ""
+        snapshot_restore_projections = ""
+        for name in self.neuron_classes.keys():
+            snapshot_containers += Template("""
+    std::vector<cppNeuron_$name::State> populations_$name;""").substitute(name=name)
+            snapshot_copy += Template("""
+    this->populations_$name.resize(net->populations_$name.size());
+    for(size_t rank = 0; rank < net->populations_$name.size(); rank++){
+        net->populations_$name[rank]->copy_to(this->populations_$name[rank]);
+    }""").substitute(name=name)
+            snapshot_restore_populations += Template("""
+    for(size_t rank = 0; rank < net->populations_$name.size(); rank++){
+        net->populations_$name[rank]->copy_from(this->populations_$name[rank]);
+    }""").substitute(name=name)
+        for name, pre, post in self.description['projection_types']:
+            container = "projections_" + name + "_" + pre + "_" + post
+            snapshot_containers += Template("""
+    std::vector<cppSynapse_$name<cppNeuron_$pre, cppNeuron_$post>::State> $container;""").substitute(
+                name=name, pre=pre, post=post, container=container)
+            snapshot_copy += Template("""
+    this->$container.resize(net->$container.size());
+    for(size_t rank = 0; rank < net->$container.size(); rank++){
+        net->$container[rank]->copy_to(this->$container[rank]);
+    }""").substitute(container=container)
+            snapshot_check += Template("""
+        for(size_t rank = 0; rank < net->$container.size(); rank++){
+            if(net->$container[rank]->nb_synapses() != this->$container[rank].nb_synapses) return false;
+        }""").substitute(container=container)
+            snapshot_restore_projections += Template("""
+        for(size_t rank = 0; rank < net->$container.size(); rank++){
+            net->$container[rank]->copy_from(this->$container[rank]);
+        }""").substitute(container=container)
+
+        profiler_sites = ""
+        for phase, kind, type_name in sites:
+            profiler_sites += Template("""
+        this->profiler.add_site("$phase", "$kind", "$type");""").substitute(
+                phase=phase, kind=kind, type=type_name)
+
+        self.network_h = Template("""#pragma once
 
 #include "ANNarchy.hpp"
 
+// Neuron types
+$neuron_declarations
+// Synapse types
+$synapse_declarations
 class Network {
     public:
 
     Network(double dt, long int seed){
         this->dt = dt;
         this->t = 0.0;
+        this->steps = 0;
         this->seed = seed;
 
-        this->setSeed(this->seed);
+        this->setSeed(this->seed);$profiler_sites
     };
 
-    // Sets the seed for the rng
+    // Sets the key of the counter-based rng
     void setSeed(long int seed){
         if(seed==-1){
-            this->rng = std::mt19937(time(NULL));
+            this->rng_key = (uint64_t) time(NULL);
         }
         else{
-            this->rng = std::mt19937(seed);
+            this->rng_key = (uint64_t) seed;
         }
     };
 
+    // Sets the number of threads
+    void set_num_threads(int num_threads){
+$set_num_threads
+    };
+
     // Attributes
     double t;
     double dt;
+    uint64_t steps;
     long int seed;
-    std::mt19937 rng;
+    uint64_t rng_key;
+
+    // Profiling (only used when compiled with profile=True)
+    cProfiler profiler;
+
+    // Populations
+$neuron_containers
+
+    // Projections
+$projection_containers
+
+    // Monitors
+    std::vector<cMonitor*> monitors;
+
+    // Object management
+$neuron_creators
+$projection_creators
+    void add_monitor(cMonitor* monitor){
+        this->monitors.push_back(monitor);
+    };
+
+    void clear_monitors(){
+        this->monitors.clear();
+    };
+
+    // Single simulation step
+    void step();
+
+    // Simulates for n_steps steps
+    void simulate(int n_steps);
 };
-"""
+""").substitute(
+            set_num_threads = self.set_num_threads(),
+            neuron_declarations = neuron_declarations,
+            synapse_declarations = synapse_declarations,
+            neuron_containers = neuron_containers,
+            projection_containers = projection_containers,
+            neuron_creators = neuron_creators,
+            projection_creators = projection_creators,
+            profiler_sites = profiler_sites,
+        )
+
+        self.network_cpp = Template("""#include "ANNarchy.hpp"
+
+void Network::step(){
+$step_start
+    // RNG
+$rng
+
+    // Reset conductances
+$reset_inputs
+
+    // Update conductances
+$collect_inputs
+
+    // Neural updates
+$update
+
+    // Spike emission
+$spike
+
+    // Reset
+$reset
+
+    // Synaptic updates
+$synaptic_update
+
+    // Recording
+$record
+    // Time
+    this->t += this->dt;
+    this->steps++;$step_end
+};
+
+void Network::simulate(int n_steps){
+
+    // Preallocate the recording buffers
+$reserve
+    for(int step = 0; step < n_steps; step++){
+        this->step();
+    }
+};
+
+cSnapshot::cSnapshot(Network* net){
+
+    this->net = net;
+
+    // Time and random streams
+    this->t = net->t;
+    this->steps = net->steps;
+    this->rng_key = net->rng_key;
+
+    // Populations and projections
+$snapshot_copy
+};
+
+bool cSnapshot::restore(Network* net, bool weights){
+
+    if(net != this->net) return false;
+
+    // The connectivity must not have changed
+    if(weights){$snapshot_check
+    }
+
+    // Time and random streams
+    net->t = this->t;
+    net->steps = this->steps;
+    net->rng_key = this->rng_key;
+
+    // Populations
+$snapshot_restore_populations
+
+    // Projections
+    if(weights){$snapshot_restore_projections
+    }
+
+    return true;
+};
+""").substitute(
+            snapshot_copy = snapshot_copy,
+            snapshot_check = snapshot_check,
+            snapshot_restore_populations = snapshot_restore_populations,
+            snapshot_restore_projections = snapshot_restore_projections,
+            step_start = step_start,
+            rng = rng,
+            reset_inputs = reset_inputs,
+            collect_inputs = collect_inputs,
+            update = update,
+            spike = spike,
+            reset = reset,
+            synaptic_update = synaptic_update,
+            record = record,
+            step_end = step_end,
+            reserve = reserve,
+        )
+
+        self.snapshot_h = Template("""#pragma once
+
+#include "ANNarchy.hpp"
+
+// Copy of the state of a network: time, random streams and attributes of all populations and projections.
+//
+// restore() copies each array back in place. The sizes do not change, so that nothing is allocated.
+class cSnapshot {
+    public:
+
+    // Copies the current state of the network
+    cSnapshot(Network* net);
+
+    // Restores the state in the network which created the snapshot. The synaptic attributes are only 
+    // restored with `weights`. Returns false, without any change, if the network or a number of synapses differs.
+    bool restore(Network* net, bool weights);
+
+    // Network
+    Network* net;
+
+    // Time and random streams
+    double t;
+    uint64_t steps;
+    uint64_t rng_key;
+
+    // Populations and projections, in the order of the containers of the network
+$snapshot_containers
+};
+""").substitute(
+            snapshot_containers = snapshot_containers,
+        )
+
+    def set_num_threads(self) -> str:
+        """Body of the `Network::set_num_threads()` C++ method.
+
+        Returns:
+
+            a comment, as the single-threaded backend ignores the number of threads.
+        """
+
+        return "        // Single-threaded backend: nothing to do."
 
     def generate_makefile(self):
         """Generates a Makefile.
+
+        Each neuron and synapse class, the network and the Cython wrapper are compiled into 
+        separate objects, so that `make` only recompiles the classes whose code has changed 
+        (unchanged files are not rewritten by `Compiler.write_file()`). `ANNarchy.hpp` is 
+        precompiled once and shared by all translation units.
         """
 
         # Python version
@@ -251,23 +830,53 @@ class Network {
         # Include path to Numpy is not standard on all distributions
         numpy_include = np.get_include()
 
+        # One object per class
+        objects = ""
+        for name in self.neuron_classes.keys():
+            objects += Template(" cppNeuron_$name.o").substitute(name=name)
+        for name in self.synapse_classes.keys():
+            objects += Template(" cppSynapse_$name.o").substitute(name=name)
+
         makefile = Template("""# Makefile generated by ANNarchy
-all:
-\tcython3 -3 --cplus *.pyx 
-\tg++ -march=native -O3 -shared -fPIC -fpermissive -fopenmp -std=c++17 \\
-\t\t`/usr/bin/python3-config --includes` \\
-\t\t-I$numpy_include \\
-\t\t*.cpp -o ANNarchyCore.so \\
+CXX = g++
+CXXFLAGS = -march=native -O3 -fPIC -fpermissive -fopenmp -std=c++17
+INCLUDES = `/usr/bin/python3-config --includes` -I$numpy_include
+
+OBJECTS = Network.o$objects $library.o
+
+all: $library.so
+
+$library.so: $$(OBJECTS)
+\t$$(CXX) -shared -fopenmp $$(OBJECTS) -o $library.so \\
 \t\t-lpython$python_version \\
 \t\t-L/usr/lib 
 
+# Cython wrapper
+$library.cpp: $library.pyx ANNarchyBindings.pxd
+\tcython3 -3 --cplus $library.pyx
+
+# Precompiled header, used by all translation units including it first
+ANNarchy.hpp.gch: ANNarchy.hpp
+\t$$(CXX) $$(CXXFLAGS) $$(INCLUDES) -MMD -MP -MF ANNarchy.hpp.d -x c++-header ANNarchy.hpp -o ANNarchy.hpp.gch
+
+$library.o: $library.cpp
+\t$$(CXX) $$(CXXFLAGS) $$(INCLUDES) -MMD -MP -c $library.cpp -o $library.o
+
+%.o: %.cpp ANNarchy.hpp.gch
+\t$$(CXX) $$(CXXFLAGS) $$(INCLUDES) -MMD -MP -c $$< -o $$@
+
+# Dependencies on the headers, generated by -MMD
+-include $$(OBJECTS:.o=.d) ANNarchy.hpp.d
+
 clean:
-\trm -rf *.o
+\trm -rf *.o *.d *.gch
 \trm -rf *.so
 """)
         self.makefile = makefile.substitute(
             numpy_include = numpy_include,
             python_version = python_version,
+            library = self.library,
+            objects = objects,
         )
 
     def generate_cython_bindings(self):
@@ -281,16 +890,80 @@ clean:
         for _, code in self.neuron_exports.items():
             neuron_export += code
 
+        # Export from C++ : Monitor
+        monitor_export = ""
+        for _, code in self.monitor_exports.items():
+            monitor_export += code
+
         # Export from C++ : Synapse
         synapse_export = ""
         for _, code in self.synapse_exports.items():
             synapse_export += code
 
+        # Network: object management
+        network_export = ""
+        for name in self.neuron_classes.keys():
+            network_export += Template("""
+        void add_population(cppNeuron_$name*)""").substitute(name=name)
+        for name, pre, post in self.description['projection_types']:
+            network_export += Template("""
+        void add_projection(cppSynapse_$name[cppNeuron_$pre, cppNeuron_$post]*)""").substitute(
+                name=name, pre=pre, post=post)
+
         self.cython_bindings = Template("""# distutils: language = c++
 from libcpp.vector cimport vector
+from libcpp.string cimport string
+from libcpp.map cimport map
+from libc.stdint cimport uint64_t
 
 cdef extern from "ANNarchy.hpp":
 
+    # Network (forward declaration)
+    cdef cppclass Network
+
+    # Monitor base class
+    cdef cppclass cMonitor :
+        pass
+
+    # Profiler
+    cdef cppclass cTraceEvent :
+        int site
+        unsigned int rank
+        double start
+        double duration
+
+    cdef cppclass cProfiler :
+        vector[string] phases
+        vector[string] kinds
+        vector[string] types
+        vector[vector[double]] times
+        vector[vector[unsigned long]] calls
+        void reset()
+        vector[cTraceEvent] trace
+        size_t trace_count
+        void set_trace(size_t)
+        void clear_trace()
+        size_t trace_index(size_t)
+
+    # CSR connectivity
+    cdef cppclass cCSR[INT_t] :
+        vector[size_t] row_ptr
+        vector[INT_t] col_idx
+
+    # Snapshots of the network
+    cdef cppclass cSnapshot :
+        cSnapshot(Network*) except +
+        bint restore(Network*, bint) nogil
+
+    # LIL connectivity builder
+    cdef cppclass cLIL[INT_t, FLOAT_t] :
+        cLIL(unsigned int, unsigned int) except +
+        void add_row_single(unsigned int, vector[unsigned int], FLOAT_t)
+
+$neuron_export
+$monitor_export
+$synapse_export
+
     # Network
     cdef cppclass Network :
         # Constructor
@@ -299,13 +972,28 @@ cdef extern from "ANNarchy.hpp":
         double t
         # dt
         double dt
+        # Number of steps and key of the rng
+        uint64_t steps
+        uint64_t rng_key
 
-$neuron_export
-$synapse_export
+        # Simulation
+        void step() nogil
+        void simulate(int) nogil
+        void set_num_threads(int)
+
+        # Profiling
+        cProfiler profiler
+
+        # Object management
+$network_export
+        void add_monitor(cMonitor*)
+        void clear_monitors()
 
 """).substitute(
             neuron_export=neuron_export,
+            monitor_export=monitor_export,
             synapse_export=synapse_export,
+            network_export=network_export,
         )
 
     def generate_cython_wrapper(self):
@@ -326,9 +1014,10 @@ $synapse_export
             
             # Population creator
             population_creator += Template("""
-    def _add_$name(self, int size):
+    def _add_$name(self, int size, int id):
 
-        pop = pyNeuron_$name(self, size)
+        cdef pyNeuron_$name pop = pyNeuron_$name(self, size, id)
+        self.instance.add_population(pop.instance)
         self.populations.append(pop)
         self.nb_populations += 1
         
@@ -337,7 +1026,28 @@ $synapse_export
         )
             # Imports
             neuron_imports += Template("""
-from ANNarchyBindings cimport cppNeuron_$name""").substitute(name=name)
+from ANNarchyBindings cimport cppNeuron_$name, cppMonitor_$name""").substitute(name=name)
+
+        #######################
+        # Monitors
+        #######################
+        monitor_wrapper = ""
+        monitor_creator = ""
+
+        for name, code in self.monitor_wrappers.items():
+            # Wrapper
+            monitor_wrapper += code
+
+            # Monitor creator
+            monitor_creator += Template("""
+    def _monitor_$name(self, int id_pop, list attributes):
+
+        cdef pyMonitor_$name monitor = pyMonitor_$name(self.populations[id_pop], attributes)
+        self.instance.add_monitor(monitor.instance)
+        self.monitors.append(monitor)
+        """).substitute(
+            name=name,
+        )
 
         #######################
         # Synapses
@@ -358,16 +1068,17 @@ from ANNarchyBindings cimport cppSynapse_$name""").substitute(name=name)
         projection_creator = ""
         for name, pre, post in self.description['projection_types']:
             # Wrapper
-            projection_wrapper += Template(code).substitute(
+            projection_wrapper += Template(self.synapse_wrappers[name]).substitute(
                 pre = pre,
                 post = post,
             )
             
             # Projection creator
             projection_creator += Template("""
-    def _add_${name}_${pre}_${post}(self, id_pre, id_post):
+    def _add_${name}_${pre}_${post}(self, id_pre, id_post, target):
 
-        proj = pySynapse_${name}_${pre}_${post}(self, self.populations[id_pre], self.populations[id_post])
+        cdef pySynapse_${name}_${pre}_${post} proj = pySynapse_${name}_${pre}_${post}(self, self.populations[id_pre], self.populations[id_post], target)
+        self.instance.add_projection(proj.instance)
 
         self.projections.append(proj)
         self.nb_projections += 1
@@ -389,6 +1100,8 @@ from ANNarchyBindings cimport cppSynapse_$name""").substitute(name=name)
     neuron_wrapper = neuron_wrapper,
     population_creator = population_creator,
     neuron_imports = neuron_imports,
+    monitor_wrapper = monitor_wrapper,
+    monitor_creator = monitor_creator,
     synapse_imports = synapse_imports,
     projection_wrapper = projection_wrapper,
     projection_creator = projection_creator,
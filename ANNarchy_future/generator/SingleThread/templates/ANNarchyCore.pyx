@@ -1,16 +1,29 @@
 # distutils: language = c++
 cimport cython
 from libcpp.vector cimport vector
+from cpython.ref cimport Py_INCREF
 cimport numpy as np
 import numpy as np
 
+np.import_array()
+
 ###########################################
 # Imports
 ###########################################
-from ANNarchyBindings cimport Network
+from ANNarchyBindings cimport Network, cLIL, cMonitor, cTraceEvent, cSnapshot
 $neuron_imports
 $synapse_imports
 
+###########################################
+# Access to the C++ arrays
+###########################################
+cdef np.ndarray _view(object owner, void* data, np.npy_intp size, int typenum):
+    "Returns a 1D NumPy array of type typenum aliasing C++ storage. The owner is kept alive as long as the array."
+    cdef np.ndarray array = np.PyArray_SimpleNewFromData(1, &size, typenum, data)
+    Py_INCREF(owner)
+    np.PyArray_SetBaseObject(array, owner)
+    return array
+
 ###########################################
 # Population wrappers
 ###########################################
@@ -24,7 +37,27 @@ $projection_wrapper
 ###########################################
 # Monitors
 ###########################################
-# TODO
+cdef _buffer_to_array(void* data, np.npy_intp n, int typenum, size_t nb_steps, bint shared):
+    "Copies a recording buffer into a (time, neurons) array, or a (time,) array for shared attributes."
+    if n == 0:
+        dtype = np.PyArray_DescrFromType(typenum)
+        return np.zeros((nb_steps,), dtype=dtype) if shared else np.zeros((nb_steps, 0), dtype=dtype)
+    array = np.PyArray_SimpleNewFromData(1, &n, typenum, data).copy()
+    return array if shared else array.reshape((nb_steps, -1))
+
+$monitor_wrapper
+
+###########################################
+# Snapshots
+###########################################
+cdef class pySnapshot(object):
+    "Handle on a copy of the state of the network in the kernel, freed with the handle."
+
+    cdef cSnapshot* instance
+    cdef object network
+
+    def __dealloc__(self):
+        del self.instance
 
 ###########################################
 # Main Python network
@@ -37,7 +70,6 @@ cdef class pyNetwork(object):
     cdef list projections
     
     cdef list monitors
-    cdef list recorded
 
 
     cdef Network* instance
@@ -52,7 +84,6 @@ cdef class pyNetwork(object):
         self.nb_projections = 0
 
         self.monitors = []
-        self.recorded = []
 
     def __dealloc__(self):
         # TODO
@@ -78,6 +109,24 @@ cdef class pyNetwork(object):
         def __set__(self, double value):
             self.instance.dt = value
 
+    property steps:
+        "Number of simulated steps, counter of the random streams."
+        def __get__(self):
+            return self.instance.steps
+        def __set__(self, unsigned long long value):
+            self.instance.steps = value
+
+    property rng_key:
+        "Key of the random streams."
+        def __get__(self):
+            return self.instance.rng_key
+        def __set__(self, unsigned long long value):
+            self.instance.rng_key = value
+
+    def set_num_threads(self, int num_threads):
+        "Sets the number of threads used by the kernel."
+        self.instance.set_num_threads(num_threads)
+
     def population(self, int idx):
         return self.populations[idx]
 
@@ -88,90 +137,113 @@ cdef class pyNetwork(object):
     # Simulation
     #########################################
 
-    @cython.boundscheck(False) # turn off bounds-checking for entire function
-    @cython.wraparound(False)  # turn off negative index wrapping for entire function
     def step(self):
-        # RNG
-        for pop in self.populations:
-            pop.rng()
-
-        # Reset conductances
-        for pop in self.populations:
-            pop.reset_inputs()
+        "Single simulation step."
+        self.simulate(1)
 
+    def simulate(self, int duration):
+        "Simulates for `duration` steps inside the C++ kernel, monitors included."
 
-        # Update conductances
-        for proj in self.projections:
-            proj.collect_inputs()
+        with nogil:
+            self.instance.simulate(duration)
 
-        # Neural updates
-        for pop in self.populations:
-            pop.update()
+    #########################################
+    # Profiling
+    #########################################
 
-        # Spike emission
-        for pop in self.populations:
-            pop.spike()
+    def get_profile(self):
+        "Returns a list of (phase, kind, type, times, calls) tuples, one per call site of the profiler."
 
-        # Reset
-        for pop in self.populations:
-            pop.reset()
+        cdef size_t site
+        profile = []
+        for site in range(self.instance.profiler.phases.size()):
+            profile.append((
+                self.instance.profiler.phases[site].decode('utf-8'),
+                self.instance.profiler.kinds[site].decode('utf-8'),
+                self.instance.profiler.types[site].decode('utf-8'),
+                list(self.instance.profiler.times[site]),
+                list(self.instance.profiler.calls[site]),
+            ))
+        return profile
 
-        # Synaptic updates
-        for proj in self.projections:
-            proj.update()
+    def reset_profile(self):
+        "Sets the accumulated times and counts to zero."
+        self.instance.profiler.reset()
 
-        # Monitor
-        self.record()
+    def set_trace(self, size_t capacity):
+        "Preallocates a ring buffer of `capacity` trace events."
+        self.instance.profiler.set_trace(capacity)
 
-
-    @cython.boundscheck(False) # turn off bounds-checking for entire function
-    @cython.wraparound(False)  # turn off negative index wrapping for entire function
-    def simulate(self, int duration):
+    def get_trace(self):
+        "Returns the recorded (site, rank, start, duration) events, from the oldest to the newest."
 
         cdef size_t i
+        cdef cTraceEvent event
+        events = []
+        for i in range(self.instance.profiler.trace_count):
+            event = self.instance.profiler.trace[self.instance.profiler.trace_index(i)]
+            events.append((event.site, event.rank, event.start, event.duration))
+        return events
 
-        for i in range(duration):
-            self.step()
+    def clear_trace(self):
+        "Removes the recorded trace events."
+        self.instance.profiler.clear_trace()
 
     #########################################
-    # Monitoring
+    # Snapshots
     #########################################
 
-    def monitor(self, monitors):
+    def snapshot(self):
+        "Returns a handle on a copy of the state of the network."
+
+        cdef pySnapshot snapshot = pySnapshot()
+        snapshot.instance = new cSnapshot(self.instance)
+        snapshot.network = self
+        return snapshot
 
-        self.monitors = monitors
+    def restore(self, pySnapshot snapshot, bint weights):
+        "Copies the state of the snapshot back into the network. Returns False if the snapshot does not match."
 
-        self.recorded = []
+        cdef bint restored
+        if snapshot.network is not self:
+            return False
+        with nogil:
+            restored = snapshot.instance.restore(self.instance, weights)
+        return restored
 
-        self.clear_monitored()
+    #########################################
+    # Monitoring
+    #########################################
 
-    @cython.boundscheck(False) # turn off bounds-checking for entire function
-    @cython.wraparound(False)  # turn off negative index wrapping for entire function
-    cdef record(self):
+    def monitor(self, list monitors):
+        "Replaces the monitors with a list of (id_pop, neuron_class, attributes) tuples."
 
-        cdef size_t nb = len(self.monitors)
-        cdef size_t i = 0
+        self.instance.clear_monitors()
+        self.monitors = []
 
-        for i in range(nb):
-            self.recorded[i].append(self.populations[i].r)
+        for id_pop, neuron_class, attributes in monitors:
+            getattr(self, "_monitor_" + neuron_class)(id_pop, attributes)
 
     def get_monitored(self):
+        "Returns a list of dictionaries (attribute -> recorded array), one per monitor."
 
-        return self.recorded
+        return [monitor.get_all() for monitor in self.monitors]
 
     def clear_monitored(self):
+        "Empties the recording buffers."
 
-        self.recorded
+        for monitor in self.monitors:
+            monitor.clear()
 
-        cdef size_t i = 0
-        cdef size_t nb = len(self.monitors)
+    def monitor_memory(self):
+        "Returns a list of (recorded steps, bytes per attribute) tuples, one per monitor."
 
-        for i in range(nb):
-            self.recorded.append([])
+        return [monitor.memory() for monitor in self.monitors]
 
     #########################################
     # Object management
     #########################################
 
 $population_creator
-$projection_creator
\ No newline at end of file
+$projection_creator
+$monitor_creator
\ No newline at end of file
@@ -0,0 +1,48 @@
+#pragma once
+
+#include "ANNarchy.hpp"
+
+class cppMonitor_$class_name : public cMonitor {
+    public:
+
+    cppMonitor_$class_name(cppNeuron_$class_name* pop){
+
+        this->pop = pop;
+
+        this->nb_steps = 0;
+    };
+
+    // Monitored population
+    cppNeuron_$class_name* pop;
+
+    // Number of recorded steps
+    size_t nb_steps;
+
+    // Buffers
+$declared_buffers
+
+    // Preallocates the buffers for n_steps additional steps
+    void reserve(int n_steps){
+$reserve_buffers
+    };
+
+    // Records the current value of the monitored attributes
+    void record(){
+$record_buffers
+        this->nb_steps++;
+    };
+
+    // Empties the buffers
+    void clear(){
+$clear_buffers
+        this->nb_steps = 0;
+    };
+
+    // Bytes allocated by the buffers of the recorded attributes
+    std::map<std::string, size_t> memory(){
+        std::map<std::string, size_t> memory;
+$memory_buffers
+        return memory;
+    };
+
+};
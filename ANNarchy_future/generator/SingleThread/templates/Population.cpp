@@ -0,0 +1,57 @@
+#include "ANNarchy.hpp"
+
+cppNeuron_$class_name::cppNeuron_$class_name(Network* net, int size, int id){
+
+    this->net = net;
+
+    this->size = size;
+
+    this->id = id;
+
+    // Initialize arrays
+$initialize_arrays
+$initialize_spiking
+$initialize_rng
+};
+
+void cppNeuron_$class_name::rng(){
+$rng_method
+};
+
+void cppNeuron_$class_name::reset_inputs(){
+$reset_inputs
+};
+
+std::vector<$real>* cppNeuron_$class_name::input(const std::string& name){
+$input_accessor
+};
+
+void cppNeuron_$class_name::update(){
+$update_method
+};
+
+void cppNeuron_$class_name::spike(){
+$spike_method
+};
+
+void cppNeuron_$class_name::reset(){
+$reset_method
+};
+
+void cppNeuron_$class_name::fused_update(){
+$fused_method
+};
+
+std::map<std::string, size_t> cppNeuron_$class_name::memory(){
+    std::map<std::string, size_t> memory;
+$memory_method
+    return memory;
+};
+
+void cppNeuron_$class_name::copy_to(State& state){
+$copy_to_method
+};
+
+void cppNeuron_$class_name::copy_from(const State& state){
+$copy_from_method
+};
@@ -7,17 +7,10 @@ class Network;
 class cppNeuron_$class_name {
     public:
 
-    cppNeuron_$class_name(Network* net, int size){
+    // Spiking neurons provide the list of neurons which emitted a spike
+    static constexpr bool spiking = $spiking;
 
-        this->net = net;
-
-        this->size = size;
-
-        // Initialize arrays
-$initialize_arrays
-$initialize_spiking
-$initialize_rng
-    };
+    cppNeuron_$class_name(Network* net, int size, int id);
 
     // Network
     Network* net;
@@ -25,34 +18,45 @@ $initialize_rng
     // Size of the population
     int size;
 
+    // Rank of the population in the network, used as a stream of the rng
+    int id;
+
     // Attributes
 $declared_attributes
 $declared_spiking
 $declared_rng
 
     // Update RNG method
-    void rng(){
-$rng_method
-    };
+    void rng();
 
     // Reset inputs method
-    void reset_inputs(){
-$reset_inputs
-    };
+    void reset_inputs();
+
+    // Access to the input variables
+    std::vector<$real>* input(const std::string& name);
 
     // Update method
-    void update(){
-$update_method
-    };
+    void update();
 
     // Spike emission
-    void spike(){
-$spike_method
-    };
+    void spike();
 
     // Reset after spike
-    void reset(){
-$reset_method
+    void reset();
+
+    // Fused rng(), update(), spike() and reset()
+    void fused_update();
+
+    // Bytes allocated by each attribute, random variable and internal array
+    std::map<std::string, size_t> memory();
+
+    // Copy of the attributes and of the last spikes, used by the snapshots of the network
+    struct State {
+$state_attributes
     };
 
-};
\ No newline at end of file
+    // Copies the attributes into a State and back (same sizes: nothing is reallocated)
+    void copy_to(State& state);
+    void copy_from(const State& state);
+
+};
@@ -0,0 +1,71 @@
+#include "ANNarchy.hpp"
+
+template<typename PrePopulation, typename PostPopulation>
+cppSynapse_$class_name<PrePopulation, PostPopulation>::cppSynapse_$class_name(Network* net, PrePopulation* pre, PostPopulation* post, const std::string& target){
+
+    this->net = net;
+
+    this->post = post;
+    this->pre = pre;
+
+    this->target = post->input(target);
+};
+
+template<typename PrePopulation, typename PostPopulation>
+void cppSynapse_$class_name<PrePopulation, PostPopulation>::add_rows(cLIL<unsigned int, double>* lil){
+    this->connectivity.append_lil(lil);
+};
+
+template<typename PrePopulation, typename PostPopulation>
+void cppSynapse_$class_name<PrePopulation, PostPopulation>::allocate(){
+
+    // Spikes are propagated over the pre-indexed connectivity
+    if constexpr (PrePopulation::spiking) {
+        this->connectivity.build_csc();
+    }
+
+$initialize_arrays
+};
+
+template<typename PrePopulation, typename PostPopulation>
+void cppSynapse_$class_name<PrePopulation, PostPopulation>::set_connectivity(size_t nnz, const size_t* row_ptr, const unsigned int* col_idx){
+    this->connectivity.from_csr(this->post->size, this->pre->size, nnz, row_ptr, col_idx);
+    this->allocate();
+};
+
+template<typename PrePopulation, typename PostPopulation>
+size_t cppSynapse_$class_name<PrePopulation, PostPopulation>::nb_synapses(){
+    return this->connectivity.nnz;
+};
+
+template<typename PrePopulation, typename PostPopulation>
+void cppSynapse_$class_name<PrePopulation, PostPopulation>::collect_inputs(){
+$collect_inputs_method
+};
+
+template<typename PrePopulation, typename PostPopulation>
+void cppSynapse_$class_name<PrePopulation, PostPopulation>::update(){
+$update_method
+};
+
+template<typename PrePopulation, typename PostPopulation>
+std::map<std::string, size_t> cppSynapse_$class_name<PrePopulation, PostPopulation>::memory(){
+    std::map<std::string, size_t> memory;
+    memory["connectivity"] = this->connectivity.memory();
+$memory_method
+    return memory;
+};
+
+template<typename PrePopulation, typename PostPopulation>
+void cppSynapse_$class_name<PrePopulation, PostPopulation>::copy_to(State& state){
+    state.nb_synapses = this->connectivity.nnz;
+$copy_to_method
+};
+
+template<typename PrePopulation, typename PostPopulation>
+void cppSynapse_$class_name<PrePopulation, PostPopulation>::copy_from(const State& state){
+$copy_from_method
+};
+
+// Explicit instantiations for the populations connected by this synapse
+$instantiations
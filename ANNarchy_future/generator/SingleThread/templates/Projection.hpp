@@ -8,16 +8,7 @@ template<typename PrePopulation, typename PostPopulation>
 class cppSynapse_$class_name {
     public:
 
-    cppSynapse_$class_name(Network* net, PrePopulation* pre, PostPopulation* post){
-
-        this->net = net;
-
-        this->post = post;
-        this->pre = pre;
-
-        // Initialize arrays
-$initialize_arrays
-    };
+    cppSynapse_$class_name(Network* net, PrePopulation* pre, PostPopulation* post, const std::string& target);
 
     // Network
     Network* net;
@@ -26,17 +17,44 @@ $initialize_arrays
     PrePopulation* pre;
     PostPopulation* post;
 
+    // Post-synaptic variable receiving the projection
+    std::vector<$real>* target;
+
+    // Connectivity
+    cCSR<unsigned int> connectivity;
+
     // Attributes
 $declared_attributes
 
+    // Appends a block of post-synaptic neurons to the connectivity
+    void add_rows(cLIL<unsigned int, double>* lil);
+
+    // Allocates the synaptic attributes once the connectivity is complete
+    void allocate();
+
+    // Replaces the connectivity with CSR arrays and reallocates the synaptic attributes
+    void set_connectivity(size_t nnz, const size_t* row_ptr, const unsigned int* col_idx);
+
+    // Number of synapses
+    size_t nb_synapses();
+
     // Collect inputs (weighted sum or spike transmission)
-    void collect_inputs(){
-$collect_inputs_method
-    };
+    void collect_inputs();
 
     // Update method
-    void update(){
-$update_method
+    void update();
+
+    // Bytes allocated by each attribute and by the connectivity
+    std::map<std::string, size_t> memory();
+
+    // Copy of the attributes, used by the snapshots of the network
+    struct State {
+        size_t nb_synapses;
+$state_attributes
     };
 
-};
\ No newline at end of file
+    // Copies the attributes into a State and back (same sizes: nothing is reallocated)
+    void copy_to(State& state);
+    void copy_from(const State& state);
+
+};
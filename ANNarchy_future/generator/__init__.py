@@ -1,4 +1,6 @@
 from .Compiler import Compiler
+from .Cache import CompilationCache
 
 from ANNarchy_future.generator import SingleThread
-from ANNarchy_future.generator.Compiler import fetch_template
+from ANNarchy_future.generator import OpenMP
+from ANNarchy_future.generator.Compiler import fetch_template, fetch_module, attribute_type, cython_types, numpy_types, type_sizes
@@ -0,0 +1,124 @@
+#pragma once
+
+#include <vector>
+
+#include "LIL.hpp"
+#include "Memory.hpp"
+
+template<typename INT_t>
+class cCSR {
+    public:
+
+    cCSR() : nb_post(0), nb_pre(0), nnz(0) {
+
+        this->row_ptr = std::vector<size_t>(1, 0);
+
+    };
+
+    // Attributes
+    INT_t nb_post;
+    INT_t nb_pre;
+
+    size_t nnz;
+
+    // Synapses of the post-synaptic neuron i are stored between row_ptr[i] and row_ptr[i+1]
+    std::vector<size_t> row_ptr;
+
+    // Rank of the pre-synaptic neuron for each synapse
+    std::vector<INT_t> col_idx;
+
+    // Transposed (CSC) index, only built for event-driven transmission.
+    // The synapses of the pre-synaptic neuron j are stored between col_ptr[j] and col_ptr[j+1],
+    // row_idx gives their post-synaptic rank and inv_idx their position in the CSR arrays.
+    std::vector<size_t> col_ptr;
+    std::vector<INT_t> row_idx;
+    std::vector<size_t> inv_idx;
+
+    // Builds the structure from a LIL matrix (the values are ignored)
+    template<typename FLOAT_t>
+    void from_lil(cLIL<INT_t, FLOAT_t>* lil){
+
+        this->nb_post = 0;
+        this->nb_pre = lil->nb_pre;
+        this->nnz = 0;
+
+        this->row_ptr = std::vector<size_t>(1, 0);
+        this->col_idx = std::vector<INT_t>();
+
+        this->append_lil(lil);
+    };
+
+    // Appends the rows of a LIL matrix after the existing ones (the values are ignored).
+    // Large matrices can be built block by block, so that the LIL never holds all synapses.
+    template<typename FLOAT_t>
+    void append_lil(cLIL<INT_t, FLOAT_t>* lil){
+
+        this->nb_pre = lil->nb_pre;
+
+        // The LIL counts insertions, not unique elements
+        size_t nnz = 0;
+        for(size_t rk_post=0; rk_post < lil->nb_post; rk_post++){
+            nnz += lil->values[rk_post].size();
+        }
+        this->col_idx.reserve(this->nnz + nnz);
+
+        // std::map keeps the pre-synaptic ranks sorted
+        for(size_t rk_post=0; rk_post < lil->nb_post; rk_post++){
+            for (const auto& [rk_pre, value] : lil->values[rk_post]) {
+                this->col_idx.push_back(rk_pre);
+            }
+            this->row_ptr.push_back(this->col_idx.size());
+        }
+
+        this->nb_post += lil->nb_post;
+        this->nnz = this->col_idx.size();
+    };
+
+    // Builds the structure from existing CSR arrays (e.g. a saved state)
+    void from_csr(INT_t nb_post, INT_t nb_pre, size_t nnz, const size_t* row_ptr, const INT_t* col_idx){
+
+        this->nb_post = nb_post;
+        this->nb_pre = nb_pre;
+        this->nnz = nnz;
+
+        this->row_ptr = std::vector<size_t>(row_ptr, row_ptr + nb_post + 1);
+        this->col_idx = std::vector<INT_t>(col_idx, col_idx + nnz);
+
+        this->col_ptr.clear();
+        this->row_idx.clear();
+        this->inv_idx.clear();
+    };
+
+    // Bytes allocated by the index arrays
+    size_t memory(){
+        return memory_of(this->row_ptr) + memory_of(this->col_idx)
+            + memory_of(this->col_ptr) + memory_of(this->row_idx) + memory_of(this->inv_idx);
+    };
+
+    // Builds the pre-indexed (CSC) view of the connectivity by counting sort
+    void build_csc(){
+
+        this->col_ptr = std::vector<size_t>(this->nb_pre + 1, 0);
+        this->row_idx = std::vector<INT_t>(this->nnz);
+        this->inv_idx = std::vector<size_t>(this->nnz);
+
+        // Number of synapses per pre-synaptic neuron
+        for(size_t idx=0; idx < this->nnz; idx++){
+            this->col_ptr[this->col_idx[idx] + 1]++;
+        }
+        for(size_t rk_pre=0; rk_pre < this->nb_pre; rk_pre++){
+            this->col_ptr[rk_pre + 1] += this->col_ptr[rk_pre];
+        }
+
+        // Scatter the synapses, post-synaptic ranks stay sorted in each column
+        std::vector<size_t> position(this->col_ptr.begin(), this->col_ptr.end() - 1);
+        for(size_t rk_post=0; rk_post < this->nb_post; rk_post++){
+            for(size_t idx = this->row_ptr[rk_post]; idx < this->row_ptr[rk_post+1]; idx++){
+                size_t k = position[this->col_idx[idx]]++;
+                this->row_idx[k] = rk_post;
+                this->inv_idx[k] = idx;
+            }
+        }
+    };
+
+};
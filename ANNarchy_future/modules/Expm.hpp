@@ -0,0 +1,129 @@
+#pragma once
+
+#include <vector>
+#include <cmath>
+#include <algorithm>
+
+// Matrix exponential and propagators of linear ODE systems, used by the exact numerical method.
+// Matrices are small (one row per variable of an ODE block), dense and stored row-major.
+
+// C = A * B
+inline void expm_multiply(int n, const double* A, const double* B, double* C){
+    for(int i = 0; i < n; i++){
+        for(int j = 0; j < n; j++){
+            double sum = 0.0;
+            for(int k = 0; k < n; k++){
+                sum += A[i*n + k] * B[k*n + j];
+            }
+            C[i*n + j] = sum;
+        }
+    }
+};
+
+// Solves D * X = N in place (X is stored in N) by Gaussian elimination with partial pivoting
+inline void expm_solve(int n, double* D, double* N){
+    for(int k = 0; k < n; k++){
+        // Pivot
+        int pivot = k;
+        for(int i = k+1; i < n; i++){
+            if(std::abs(D[i*n + k]) > std::abs(D[pivot*n + k])) pivot = i;
+        }
+        if(pivot != k){
+            for(int j = 0; j < n; j++){
+                std::swap(D[k*n + j], D[pivot*n + j]);
+                std::swap(N[k*n + j], N[pivot*n + j]);
+            }
+        }
+        // Elimination
+        for(int i = k+1; i < n; i++){
+            double factor = D[i*n + k] / D[k*n + k];
+            if(factor == 0.0) continue;
+            for(int j = k; j < n; j++) D[i*n + j] -= factor * D[k*n + j];
+            for(int j = 0; j < n; j++) N[i*n + j] -= factor * N[k*n + j];
+        }
+    }
+    // Back substitution
+    for(int k = n-1; k >= 0; k--){
+        for(int j = 0; j < n; j++){
+            double sum = N[k*n + j];
+            for(int i = k+1; i < n; i++) sum -= D[k*n + i] * N[i*n + j];
+            N[k*n + j] = sum / D[k*n + k];
+        }
+    }
+};
+
+// E = exp(A), computed by scaling and squaring with a [6/6] Pade approximant
+inline void expm(int n, const double* A, double* E){
+
+    // Infinity norm
+    double norm = 0.0;
+    for(int i = 0; i < n; i++){
+        double row = 0.0;
+        for(int j = 0; j < n; j++) row += std::abs(A[i*n + j]);
+        norm = std::max(norm, row);
+    }
+
+    // Scaling: ||A / 2^s|| <= 0.5
+    int s = 0;
+    if(norm > 0.5) s = std::max(0, (int)std::ceil(std::log2(norm / 0.5)));
+    double scale = std::ldexp(1.0, -s);
+
+    std::vector<double> X(n*n), term(n*n), tmp(n*n), N(n*n), D(n*n);
+    for(int k = 0; k < n*n; k++) X[k] = A[k] * scale;
+
+    // Pade coefficients
+    const double c[7] = {1.0, 0.5, 5.0/44.0, 1.0/66.0, 1.0/792.0, 1.0/15840.0, 1.0/665280.0};
+
+    // N = sum c_k X^k, D = sum (-1)^k c_k X^k
+    std::fill(term.begin(), term.end(), 0.0);
+    for(int i = 0; i < n; i++) term[i*n + i] = 1.0;
+    for(int k = 0; k < n*n; k++){
+        N[k] = c[0] * term[k];
+        D[k] = c[0] * term[k];
+    }
+    for(int p = 1; p < 7; p++){
+        expm_multiply(n, term.data(), X.data(), tmp.data());
+        std::swap(term, tmp);
+        double sign = (p % 2 == 0) ? 1.0 : -1.0;
+        for(int k = 0; k < n*n; k++){
+            N[k] += c[p] * term[k];
+            D[k] += sign * c[p] * term[k];
+        }
+    }
+
+    // exp(X) = D^-1 * N
+    expm_solve(n, D.data(), N.data());
+
+    // Squaring
+    for(int p = 0; p < s; p++){
+        expm_multiply(n, N.data(), N.data(), tmp.data());
+        std::swap(N, tmp);
+    }
+
+    std::copy(N.begin(), N.end(), E);
+};
+
+// Propagators of x' = A*x + b over a step dt, with b constant during the step:
+//   x(t + dt) = P * x(t) + Q * b
+// with P = exp(A*dt) and Q = int_0^dt exp(A*s) ds.
+// Both are obtained from the exponential of the augmented matrix [[A*dt, dt*I], [0, 0]].
+inline void exact_propagators(int n, const double* Adt, double dt, double* P, double* Q){
+
+    int m = 2*n;
+    std::vector<double> M(m*m, 0.0), E(m*m);
+    for(int i = 0; i < n; i++){
+        for(int j = 0; j < n; j++){
+            M[i*m + j] = Adt[i*n + j];
+        }
+        M[i*m + n + i] = dt;
+    }
+
+    expm(m, M.data(), E.data());
+
+    for(int i = 0; i < n; i++){
+        for(int j = 0; j < n; j++){
+            P[i*n + j] = E[i*m + j];
+            Q[i*n + j] = E[i*m + n + j];
+        }
+    }
+};
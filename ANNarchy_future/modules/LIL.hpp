@@ -26,11 +26,17 @@ class cLIL {
 
     std::vector<std::map<INT_t, FLOAT_t>> values;
 
+    // Returns the transposed matrix (pre-synaptic neurons as rows)
     cLIL transpose(){
 
-        cLIL res = new cLIL(this->nb_pre, this->nb_post);
+        cLIL res = cLIL(this->nb_pre, this->nb_post);
 
-        // TODO: tranpose
+        for(size_t rk_post=0; rk_post < this->nb_post; rk_post++){
+            for (const auto& [rk_pre, value] : this->values[rk_post]) {
+                res.values[rk_pre][rk_post] = value;
+                res.nnz++;
+            }
+        }
 
         return res;
     }
@@ -32,6 +32,9 @@ cdef extern from "LIL.hpp":
         void add_block_single(vector[unsigned int] rk_post, vector[unsigned int] rk_pre, FLOAT_t val)
         void add_block_multiple(vector[unsigned int] rk_post, vector[unsigned int] rk_pre, vector[vector[FLOAT_t]] val)
 
+        # Transformations
+        cLIL[INT_t, FLOAT_t] transpose()
+
         # Export
         string print()
         vector[vector[FLOAT_t]] to_array()
@@ -133,6 +136,12 @@ cdef class LIL(object):
                 print("The provided values of size", val.shape, "do not match the shape of the slice", (nb_post, nb_pre))
             
 
+    def transpose(self):
+        "Returns the transposed matrix."
+        cdef LIL res = LIL((self.instance.nb_pre, self.instance.nb_post))
+        res.instance[0] = self.instance.transpose()
+        return res
+
     def to_array(self):
         return np.array(self.instance.to_array())
 
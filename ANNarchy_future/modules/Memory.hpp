@@ -0,0 +1,20 @@
+#pragma once
+
+#include <cstddef>
+#include <vector>
+
+// Bytes allocated by a vector (its capacity, not its size)
+template<typename T>
+inline size_t memory_of(const std::vector<T>& v){
+    return v.capacity() * sizeof(T);
+};
+
+// Bytes allocated by a vector of vectors
+template<typename T>
+inline size_t memory_of(const std::vector<std::vector<T>>& v){
+    size_t bytes = v.capacity() * sizeof(std::vector<T>);
+    for(const auto& inner : v){
+        bytes += memory_of(inner);
+    }
+    return bytes;
+};
@@ -0,0 +1,29 @@
+#pragma once
+
+#include <vector>
+#include <algorithm>
+
+// Base class for the monitors, allowing the network to store them in a single container
+class cMonitor {
+    public:
+
+    virtual ~cMonitor(){};
+
+    // Preallocates the buffers for n_steps additional steps
+    virtual void reserve(int n_steps) = 0;
+
+    // Records the current value of the monitored attributes
+    virtual void record() = 0;
+
+    // Empties the buffers
+    virtual void clear() = 0;
+
+    // Grows the capacity of a buffer to at least size elements.
+    // The capacity is at least doubled, so that single steps do not reallocate the buffer each time.
+    template<typename T>
+    static void reserve_buffer(std::vector<T>& buffer, size_t size){
+        if(size > buffer.capacity()){
+            buffer.reserve(std::max(size, 2 * buffer.capacity()));
+        }
+    };
+};
@@ -0,0 +1,72 @@
+#pragma once
+
+#include <cstdint>
+#include <cmath>
+#include <type_traits>
+
+// Counter-based random number generation (Philox4x32-10, Salmon et al., 2011).
+//
+// A random number is a pure function of a key (the seed of the network) and of a counter
+// (population, random variable, neuron, step). Numbers can therefore be drawn in any order
+// and by any number of threads, the results being bit-identical.
+
+struct philox4x32 {
+    uint32_t v[4];
+};
+
+// One round of Philox4x32
+inline void philox_round(uint32_t* ctr, const uint32_t* key){
+    const uint64_t p0 = (uint64_t)0xD2511F53 * ctr[0];
+    const uint64_t p1 = (uint64_t)0xCD9E8D57 * ctr[2];
+    const uint32_t hi0 = (uint32_t)(p0 >> 32), lo0 = (uint32_t)p0;
+    const uint32_t hi1 = (uint32_t)(p1 >> 32), lo1 = (uint32_t)p1;
+    ctr[0] = hi1 ^ ctr[1] ^ key[0];
+    ctr[1] = lo1;
+    ctr[2] = hi0 ^ ctr[3] ^ key[1];
+    ctr[3] = lo0;
+};
+
+// Philox4x32-10: 4 random 32-bit words for a 128-bit counter and a 64-bit key
+inline philox4x32 philox(uint32_t c0, uint32_t c1, uint32_t c2, uint32_t c3, uint64_t seed){
+    uint32_t ctr[4] = {c0, c1, c2, c3};
+    uint32_t key[2] = {(uint32_t)seed, (uint32_t)(seed >> 32)};
+    for(int r = 0; r < 10; r++){
+        philox_round(ctr, key);
+        key[0] += 0x9E3779B9;
+        key[1] += 0xBB67AE85;
+    }
+    philox4x32 out;
+    for(int k = 0; k < 4; k++) out.v[k] = ctr[k];
+    return out;
+};
+
+// Uniform number in (0, 1) from two 32-bit words (53 random bits)
+inline double philox_to_double(uint32_t a, uint32_t b){
+    const uint64_t x = ((uint64_t)a << 21) ^ (uint64_t)(b >> 11);
+    return ((double)(x & ((1ULL << 53) - 1)) + 0.5) * (1.0 / 9007199254740992.0);
+};
+
+// Counter of a draw: the step occupies two words, the population and the random variable share the last one.
+// Up to 65536 populations and random variables per neuron type.
+#define PHILOX_COUNTER(pop, var, idx, step) \
+    (uint32_t)(idx), (uint32_t)(step), (uint32_t)((uint64_t)(step) >> 32), ((uint32_t)(pop) << 16) | ((uint32_t)(var) & 0xFFFF)
+
+// Uniform number in [min, max)
+template<typename T>
+inline T philox_uniform(uint64_t seed, int pop, int var, unsigned int idx, uint64_t step, T min, T max){
+    const philox4x32 r = philox(PHILOX_COUNTER(pop, var, idx, step), seed);
+    // In single precision, a double close to 1 would be rounded to 1.0f: use 24 random bits instead
+    const T u = std::is_same<T, float>::value ? (T)((r.v[0] >> 8) * 0x1p-24f) : (T)philox_to_double(r.v[0], r.v[1]);
+    // The affine transform can still be rounded up to max
+    const T x = min + (max - min) * u;
+    return x < max ? x : std::nextafter(max, min);
+};
+
+// Normal number (Box-Muller transform)
+template<typename T>
+inline T philox_normal(uint64_t seed, int pop, int var, unsigned int idx, uint64_t step, T mu, T sigma){
+    const philox4x32 r = philox(PHILOX_COUNTER(pop, var, idx, step), seed);
+    const double u1 = philox_to_double(r.v[0], r.v[1]);
+    const double u2 = philox_to_double(r.v[2], r.v[3]);
+    return mu + sigma * (T)(std::sqrt(-2.0 * std::log(u1)) * std::cos(6.283185307179586 * u2));
+};
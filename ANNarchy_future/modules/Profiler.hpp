@@ -0,0 +1,104 @@
+#pragma once
+
+#include <algorithm>
+#include <chrono>
+#include <string>
+#include <vector>
+
+// Accumulates the wall time and the number of calls of the phases of the simulation.
+//
+// Only the instrumented kernels (compile(profile=True)) use it. Each call site of Network::step()
+// is declared once in the constructor of the network, e.g. ("update", "population", "LIF"), and
+// accumulates the duration of each call for the rank of the object in its container.
+//
+// When a trace is recorded (set_trace()), each call is also stored as an event in a preallocated
+// ring buffer: only the last events are kept, so that the memory is bounded for long simulations.
+
+// Call of a site: start and duration in seconds since the creation of the profiler
+struct cTraceEvent {
+    int site;
+    unsigned int rank;
+    double start;
+    double duration;
+};
+
+class cProfiler {
+    public:
+
+    // Monotonic clock
+    typedef std::chrono::steady_clock clock;
+
+    // Description of the call sites
+    std::vector<std::string> phases;
+    std::vector<std::string> kinds;
+    std::vector<std::string> types;
+
+    // Accumulated time in seconds and number of calls, per call site and per object
+    std::vector<std::vector<double>> times;
+    std::vector<std::vector<unsigned long>> calls;
+
+    // Ring buffer of events: position of the next event and number of stored events
+    std::vector<cTraceEvent> trace;
+    size_t trace_next = 0;
+    size_t trace_count = 0;
+
+    // Origin of the event times
+    clock::time_point origin = clock::now();
+
+    // Declares a call site and returns its index
+    int add_site(std::string phase, std::string kind, std::string type){
+        this->phases.push_back(phase);
+        this->kinds.push_back(kind);
+        this->types.push_back(type);
+        this->times.push_back(std::vector<double>());
+        this->calls.push_back(std::vector<unsigned long>());
+        return (int)this->phases.size() - 1;
+    };
+
+    // Adds the time elapsed since start to the object of rank `rank` of the site
+    inline void add(int site, size_t rank, clock::time_point start){
+        const clock::time_point stop = clock::now();
+        const double elapsed = std::chrono::duration<double>(stop - start).count();
+        if(rank >= this->times[site].size()){
+            this->times[site].resize(rank + 1, 0.0);
+            this->calls[site].resize(rank + 1, 0);
+        }
+        this->times[site][rank] += elapsed;
+        this->calls[site][rank]++;
+
+        if(!this->trace.empty()){
+            cTraceEvent& event = this->trace[this->trace_next];
+            event.site = site;
+            event.rank = (unsigned int)rank;
+            event.start = std::chrono::duration<double>(start - this->origin).count();
+            event.duration = elapsed;
+            this->trace_next = (this->trace_next + 1) % this->trace.size();
+            this->trace_count = std::min(this->trace_count + 1, this->trace.size());
+        }
+    };
+
+    // Preallocates a ring buffer of `capacity` events (0 stops the recording)
+    void set_trace(size_t capacity){
+        this->trace.assign(capacity, cTraceEvent());
+        this->clear_trace();
+    };
+
+    // Removes the recorded events
+    void clear_trace(){
+        this->trace_next = 0;
+        this->trace_count = 0;
+    };
+
+    // Index in the ring buffer of the i-th oldest recorded event
+    size_t trace_index(size_t i){
+        return (this->trace_next + this->trace.size() - this->trace_count + i) % this->trace.size();
+    };
+
+    // Sets all times and counts to zero
+    void reset(){
+        for(size_t site = 0; site < this->times.size(); site++){
+            std::fill(this->times[site].begin(), this->times[site].end(), 0.0);
+            std::fill(this->calls[site].begin(), this->calls[site].end(), 0);
+        }
+    };
+};
@@ -7,16 +7,21 @@ import sympy as sp
 from sympy.codegen.rewriting import optims_c99, optimize, ReplaceOptim
 from sympy.core.mul import Mul
 from sympy.core.expr import UnevaluatedExpr
+from sympy.codegen.ast import real, float32
 
-def ccode(eq) -> str:
+def ccode(eq, precision:str = 'float64') -> str:
     """Transforms a sympy expression into C99 code.
 
     Applies C99 optimizations (`sympy.codegen.rewriting.optims_c99`).
 
     Expands `pow(x; 2)` into `x*x` and `pow(x, 3)` into `x*x*x` for performance.
 
+    In single precision, literals and mathematical functions use the float versions (`0.5F`, `expf()`), 
+    so that the computations are not promoted to double.
+
     Args:
         eq (sympy expression): expression to convert.
+        precision (str): floating-point precision, 'float64' or 'float32'.
 
     Returns:
         a string representing the C code.
@@ -51,15 +56,21 @@ def ccode(eq) -> str:
     eq = pow3(eq)
     
     # Get the equivalent C code
-    eq = sp.ccode(
-        eq, 
-    )
+    if precision == 'float32':
+        eq = sp.ccode(
+            eq, 
+            type_aliases={real: float32},
+        )
+    else:
+        eq = sp.ccode(
+            eq, 
+        )
     
     # Remove the extralines of Piecewise
     return " ".join(eq.replace('\n', ' ').split())
 
 
-def code_generation(eq, correspondance:dict = {}) -> str:
+def code_generation(eq, correspondance:dict = {}, precision:str = 'float64') -> str:
     """Gets a dictionary of correspondances and changes all symbols in the sympy expression.
 
     Calls `eq.subs()` and `ccode`.
@@ -68,6 +79,7 @@ def code_generation(eq, correspondance:dict = {}) -> str:
 
         eq (sympy expression): expression.
         correspondance (dict): dictionary of correspondances.
+        precision (str): floating-point precision, 'float64' or 'float32'.
 
     Returns:
 
@@ -92,7 +104,17 @@ def code_generation(eq, correspondance:dict = {}) -> str:
     for pre, post in correspondance.items():
         replacements[sp.Symbol(pre)] = sp.Symbol(post)
 
+    # Floating-point numbers protected by cast() are single precision literals, integers are left untouched
+    if precision == 'float32':
+        for symbol in eq.free_symbols:
+            try:
+                float(str(symbol))
+            except ValueError:
+                continue
+            if any(c in str(symbol) for c in ".eE"):
+                replacements[symbol] = sp.Symbol(str(symbol) + "F")
+
     # Replace the symbols
     new_eq = eq.subs(replacements)
 
-    return ccode(new_eq)
+    return ccode(new_eq, precision)
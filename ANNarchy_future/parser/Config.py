@@ -12,6 +12,7 @@ reserved_attributes = [
     't',
     'dt',
     'spike',
+    'target',
     'ite',
     'cast',
     'clip',
@@ -24,5 +25,10 @@ numerical_methods = [
     'euler',
     'midpoint',
     'exponential',
-    'rk4'
+    'rk4',
+    'exact',
+    'implicit',
 ]
+
+# Number of Newton iterations of the implicit method for non-linear systems
+newton_iterations = 3
@@ -48,6 +48,13 @@ def get_blocks(parser, equations:list) -> list:
         if _current_ODE_block is not None:
             blocks.append(_current_ODE_block)
 
+    # Attributes assigned anywhere in the method change during the step
+    assigned = set()
+    for block in blocks:
+        assigned.update(block._modified_variables)
+    for block in blocks:
+        block.assigned = assigned
+
     return blocks
 
 class Condition(object):
@@ -124,6 +131,9 @@ class Block(object):
         self._dependencies = []
         self._equations = []
 
+        # Attributes assigned by all the blocks of the method (set by get_blocks())
+        self.assigned = set()
+
         # Processed equations accessible from outside
         self.equations = []
 
@@ -211,6 +221,9 @@ class ODEBlock(Block):
 
         self.method = method
 
+        # Propagator of the linear system, only for the exact method
+        self.propagator = None
+
         super(ODEBlock, self).__init__(parser)
 
     def parse(self):
@@ -233,6 +246,27 @@ class ODEBlock(Block):
 
             self.equations = parser.NM.rk4(self._equations)
 
+        elif self.method == 'exact':
+
+            # The propagator is computed once per step: only the shared attributes 
+            # which are not assigned by the equations are constant coefficients
+            constants = [attr for attr in self.parser.shared if not attr in self.assigned]
+
+            self.equations, self.propagator = parser.NM.exact(self._equations, constants)
+
+            if self.equations is None:
+                self.parser._logger.error("The exact method can not be applied: " + self.propagator)
+                sys.exit(1)
+
+        elif self.method == 'implicit':
+
+            self.equations = parser.NM.implicit(self._equations)
+
+            if self.equations is None:
+                self.parser._logger.error("The implicit method can not be applied: the Jacobian of "
+                    + ", ".join([name for name, _ in self._equations]) + " can not be computed.")
+                sys.exit(1)
+
         else:
             self.parser.logger.error(self.method + " is not implemented yet.")
             sys.exit(1)
@@ -67,7 +67,7 @@ class Equations(object):
 
         Args:
             symbols: list of attributes when in standalone mode.
-            method: numerical method (euler, midpoint, exponential, rk4, event-driven)
+            method: numerical method (euler, midpoint, exponential, rk4, exact, implicit, event-driven)
             neuron: Neuron instance (passed by the population).
             synapse: Synapse instance (passed by the projection).
 
@@ -147,6 +147,11 @@ class Equations(object):
                     self.symbols['d'+attr+'_dt'] = symbol
                     setattr(self, 'd'+attr+'_dt', symbol)
             
+            # Post-synaptic variable receiving the projection
+            symbol = sp.Symbol("target")
+            self.symbols['target'] = symbol
+            setattr(self, 'target', symbol)
+
             self.pre = PreNeuron()
             self.post = PostNeuron()
 
@@ -18,6 +18,7 @@ class NeuronParser(object):
         attributes (list): list of attributes (parameters and variables).
         parameters (list): list of parameters.
         variables (list): list of variables.
+        dtypes (dict): numerical type of each attribute ('float', 'int' or 'bool').
         inputs (list): list of input variables (conductances).
         outputs (list): list of output variables (firing rate).
         update_equations (list): update equations.
@@ -48,6 +49,7 @@ class NeuronParser(object):
         self.parameters = []
         self.variables = []
         self.shared = []
+        self.dtypes = {}
         self.inputs = []
         self.outputs = []
 
@@ -75,6 +77,7 @@ class NeuronParser(object):
         * `self.parameters`
         * `self.variables`
         * `self.shared`
+        * `self.dtypes`
         * `self.inputs`
         * `self.outputs`
 
@@ -98,10 +101,11 @@ class NeuronParser(object):
                 if var in self.neuron._outputs:
                     self.outputs.append(attr)
 
-        # Shared variables
+        # Shared variables and numerical types
         for attr in self.attributes:
             if getattr(self.neuron, attr)._shared:
                 self.shared.append(attr)
+            self.dtypes[attr] = getattr(self.neuron, attr)._dtype_string
 
         # Get lists of parameters and variables
         self._logger.info("Attributes: " + str(self.attributes))
@@ -226,6 +230,31 @@ class NeuronParser(object):
 
         return blocks, dependencies
 
+    def buffered_random_variables(self, fused:bool = False) -> list:
+        """Returns the random variables which have to be drawn before the update and stored in arrays.
+
+        Random variables only used in the update equations (or all of them with the fused loop) are 
+        drawn directly inside the loop, which saves writing and reading an array per step. As the numbers 
+        are counter-based, the values are the same in both cases.
+
+        Args:
+            fused: whether the neural phases are fused into a single loop.
+
+        Returns:
+            the list of names of the buffered random variables.
+        """
+
+        if fused:
+            return []
+
+        used = set()
+        for block in self.update_equations:
+            for eq in block.equations:
+                if isinstance(eq['rhs'], sp.Basic):
+                    used.update([str(symbol) for symbol in eq['rhs'].free_symbols])
+
+        return [name for name in self.random_variables.keys() if not name in used]
+
     def __str__(self):
 
         code = ""
@@ -411,4 +411,239 @@ def rk4(equations):
         processed_equations.append(update)
 
 
-    return processed_equations
\ No newline at end of file
+    return processed_equations
+
+def exact(equations, constants:list) -> tuple:
+    """Exact integration of a linear system of ODEs with constant coefficients.
+
+    The system `x' = A*x + b` is integrated over a step with:
+
+    x(t + dt) = P*x(t) + Q*b
+
+    where `P = exp(A*dt)` and `Q` is the integral of `exp(A*s)` between 0 and dt. `A` must only depend 
+    on the constants (shared attributes which are not assigned during the step), `b` may depend on any attribute except the variables of 
+    the system and is considered constant during the step.
+
+    The elements of `P` and `Q` are represented by the symbols `__P__v_i_j` and `__Q__v_i_j`, 
+    where `v` is the first variable of the system. The code generator computes them numerically 
+    (`modules/Expm.hpp`) whenever `A*dt` changes. Elements which are structurally zero (the variable j 
+    does not influence the variable i) are omitted.
+
+    Args:
+        equations: list of (name, gradient) pairs.
+        constants: names of the attributes which are constant over the population and during the step.
+
+    Returns:
+        the list of processed equations and a dictionary describing the propagator 
+        (`name`, `variables`, `A`, `P`, `Q`), or (None, message) if the system is not linear 
+        with constant coefficients.
+    """
+
+    variables = [name for name, _ in equations]
+    symbols = [sp.Symbol(name) for name in variables]
+    n = len(variables)
+
+    def is_constant(expr) -> bool:
+        for symbol in expr.free_symbols:
+            if str(symbol) in constants:
+                continue
+            try:
+                # Numbers protected by cast()
+                float(str(symbol))
+            except ValueError:
+                return False
+        return True
+
+    # Decompose the gradients into A*x + b
+    A = [[0 for _ in range(n)] for _ in range(n)]
+    b = []
+    for i, (name, eq) in enumerate(equations):
+
+        eq = sp.expand(eq)
+        for j, var in enumerate(symbols):
+            coeff = sp.diff(eq, var)
+            if not is_constant(coeff):
+                return None, "the gradient of " + name + " is not linear in " + variables[j] + " with constant coefficients."
+            A[i][j] = sp.simplify(coeff)
+
+        forcing = sp.simplify(eq - sum([A[i][j] * symbols[j] for j in range(n)]))
+        if len(forcing.free_symbols & set(symbols)) > 0:
+            return None, "the gradient of " + name + " is not linear."
+        b.append(forcing)
+
+    # Variables influencing each variable, directly or through other variables
+    reachable = [[i == j or A[i][j] != 0 for j in range(n)] for i in range(n)]
+    for k in range(n):
+        for i in range(n):
+            for j in range(n):
+                reachable[i][j] = reachable[i][j] or (reachable[i][k] and reachable[k][j])
+
+    prefix = variables[0]
+    P = {}
+    Q = {}
+    for i in range(n):
+        for j in range(n):
+            if reachable[i][j]:
+                P[(i, j)] = sp.Symbol("__P__" + prefix + "_" + str(i) + "_" + str(j))
+                Q[(i, j)] = sp.Symbol("__Q__" + prefix + "_" + str(i) + "_" + str(j))
+
+    new_values = []
+    updates = []
+
+    for i, name in enumerate(variables):
+
+        # x_i(t + dt) = sum_j P_ij x_j + sum_j Q_ij b_j
+        rhs = 0
+        for j in range(n):
+            if (i, j) in P:
+                rhs += P[(i, j)] * symbols[j]
+                if b[j] != 0:
+                    rhs += Q[(i, j)] * b[j]
+
+        new_var = "__exact__" + name
+        new_values.append(
+            {
+            'type': 'tmp',
+            'name': new_var,
+            'op': "=",
+            'rhs': rhs,
+            'human-readable': new_var + " = " + parser.ccode(rhs),
+            }
+        )
+        updates.append(
+            {
+            'type': 'assignment',
+            'name': name,
+            'op': "=",
+            'rhs': sp.Symbol(new_var),
+            'human-readable': name + " = " + new_var,
+            }
+        )
+
+    propagator = {
+        'name': prefix,
+        'variables': variables,
+        'A': A,
+        'P': P,
+        'Q': Q,
+    }
+
+    return new_values + updates, propagator
+
+
+def implicit(equations, iterations:int = parser.Config.newton_iterations) -> list:
+    """Implicit (backward) Euler method, suited for stiff systems.
+
+    The new values `y` of the variables solve `y = x + dt*f(y)`. The equation is solved with Newton's method, 
+    starting from the current values `x`, using the Jacobian `J` of the system derived by sympy:
+
+    y <- y - (I - dt*J(y))^-1 * (y - x - dt*f(y))
+
+    When the system is linear in its variables (the Jacobian does not depend on them, e.g. conductance-based 
+    models), a single iteration gives the exact solution of the implicit equation, i.e. a closed form. 
+    Otherwise, `iterations` Newton steps are performed per neuron and per step. The first iteration alone 
+    is the semi-implicit (linearized) Euler method.
+
+    The linear system of each iteration is solved symbolically, which is only reasonable for 
+    blocks of a few coupled variables.
+
+    Args:
+        equations: list of (name, gradient) pairs.
+        iterations: number of Newton iterations for non-linear systems.
+
+    Returns:
+        the list of processed equations, or None if the Jacobian can not be computed.
+    """
+
+    dt = sp.Symbol('dt')
+
+    variables = [name for name, _ in equations]
+    symbols = [sp.Symbol(name) for name in variables]
+    gradients = sp.Matrix([eq for _, eq in equations])
+    n = len(variables)
+
+    # Jacobian of the system
+    jacobian = gradients.jacobian(symbols)
+    if jacobian.has(sp.Derivative):
+        return None
+
+    # Linear systems are solved by the first iteration
+    linear = len(jacobian.free_symbols & set(symbols)) == 0
+    if linear:
+        iterations = 1
+
+    processed_equations = []
+
+    current = symbols
+    for it in range(1, iterations+1):
+
+        values = dict(zip(symbols, current))
+
+        # Residuals F(y) = y - x - dt*f(y)
+        residuals = []
+        for i, name in enumerate(variables):
+            residual = current[i] - symbols[i] - dt * gradients[i].subs(values, simultaneous=True)
+            residual_var = "__F" + str(it) + "__" + name
+            processed_equations.append(
+                {
+                'type': 'tmp',
+                'name': residual_var,
+                'op': "=",
+                'rhs': residual,
+                'human-readable': residual_var + " = " + parser.ccode(residual),
+                }
+            )
+            residuals.append(sp.Symbol(residual_var))
+
+        # Jacobian of the residuals I - dt*J(y). Constant elements are used directly.
+        matrix = sp.zeros(n, n)
+        for i in range(n):
+            for j in range(n):
+                element = (1 if i == j else 0) - dt * jacobian[i, j].subs(values, simultaneous=True)
+                if element.is_Number:
+                    matrix[i, j] = element
+                    continue
+                element_var = "__J" + str(it) + "__" + variables[i] + "_" + str(j)
+                processed_equations.append(
+                    {
+                    'type': 'tmp',
+                    'name': element_var,
+                    'op': "=",
+                    'rhs': element,
+                    'human-readable': element_var + " = " + parser.ccode(element),
+                    }
+                )
+                matrix[i, j] = sp.Symbol(element_var)
+
+        # Newton step
+        delta = matrix.LUsolve(sp.Matrix(residuals))
+
+        new_values = []
+        for i, name in enumerate(variables):
+            new_value = current[i] - sp.simplify(delta[i])
+            new_var = "__y" + str(it) + "__" + name
+            processed_equations.append(
+                {
+                'type': 'tmp',
+                'name': new_var,
+                'op': "=",
+                'rhs': new_value,
+                'human-readable': new_var + " = " + parser.ccode(new_value),
+                }
+            )
+            new_values.append(sp.Symbol(new_var))
+
+        current = new_values
+
+    for i, name in enumerate(variables):
+        processed_equations.append(
+            {
+            'type': 'assignment',
+            'name': name,
+            'op': "=",
+            'rhs': current[i],
+            'human-readable': name + " = " + str(current[i]),
+            }
+        )
+
+    return processed_equations
@@ -0,0 +1,147 @@
+import logging
+import collections
+
+import ANNarchy_future.api as api
+import ANNarchy_future.parser as parser
+
+# Analysed parsers: (class, signature) -> parser, from the least to the most recently used.
+# A parser keeps the instance it analysed, and therefore its class, alive: the number of entries is 
+# bounded so that classes redefined many times (e.g. in a notebook) do not accumulate.
+_neuron_parsers = collections.OrderedDict()
+_synapse_parsers = collections.OrderedDict()
+
+# Maximal number of parsers kept per kind
+max_entries = 256
+
+# Attributes set on the instances by the framework itself
+_stamped_attributes = [
+    'attributes', 'pre_attributes', 'post_attributes', 'random_variables',
+    '_data', '_inputs', '_outputs', '_current_eq', '_parser', '_random_variables',
+]
+
+
+def signature(obj) -> tuple:
+    """Signature of a Neuron or Synapse instance, determining its equations.
+
+    Two instances of the same class with the same signature produce the same parsed equations.
+    The signature contains the name, kind, locality, dtype and input/output status of each attribute,
+    but not their initial values. Other instance attributes (e.g. flags used in `update()`, public or not)
+    are included through their `repr()`, so that instances differing in them are parsed separately.
+
+    Args:
+        obj: Neuron or Synapse instance.
+
+    Returns:
+        a hashable tuple.
+    """
+
+    inputs = getattr(obj, '_inputs', [])
+    outputs = getattr(obj, '_outputs', [])
+
+    items = []
+    for name, value in obj.__dict__.items():
+        if isinstance(value, (api.Parameter, api.Variable)):
+            items.append((
+                name,
+                type(value).__name__,
+                value._shared,
+                value._dtype_string,
+                any(value is var for var in inputs),
+                any(value is var for var in outputs),
+            ))
+        elif not name in _stamped_attributes:
+            items.append((name, repr(value)))
+
+    return tuple(items)
+
+
+def neuron_parser(neuron:'api.Neuron') -> 'parser.NeuronParser':
+    """Returns an analysed parser for the neuron, reusing the one of a previous instance if possible.
+
+    The equations of a neuron class are only parsed (and transformed by the numerical methods)
+    once per signature (see `signature()`), however many populations use it.
+
+    Args:
+        neuron: Neuron instance.
+
+    Returns:
+        a `NeuronParser` instance on which `extract_variables()` and `analyse_equations()` were called.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    key = (type(neuron), signature(neuron))
+
+    if key in _neuron_parsers:
+        logger.debug("Reusing the parser of " + type(neuron).__name__ + ".")
+        _neuron_parsers.move_to_end(key)
+        neuron_parser = _neuron_parsers[key]
+        neuron.attributes = neuron_parser.attributes
+        neuron._parser = neuron_parser
+        return neuron_parser
+
+    neuron_parser = parser.NeuronParser(neuron)
+    neuron_parser.extract_variables()
+    neuron_parser.analyse_equations()
+
+    _store(_neuron_parsers, key, neuron_parser)
+
+    return neuron_parser
+
+
+def synapse_parser(synapse:'api.Synapse', pre:'api.Neuron', post:'api.Neuron') -> 'parser.SynapseParser':
+    """Returns an analysed parser for the synapse, reusing the one of a previous instance if possible.
+
+    The key also contains the signatures of the pre- and post-synaptic neurons,
+    whose attributes can be used in the synaptic equations.
+
+    Args:
+        synapse: Synapse instance.
+        pre: pre-synaptic Neuron instance.
+        post: post-synaptic Neuron instance.
+
+    Returns:
+        a `SynapseParser` instance on which `extract_variables()` and `analyse_equations()` were called.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    key = (
+        type(synapse), signature(synapse),
+        type(pre), signature(pre),
+        type(post), signature(post),
+    )
+
+    if key in _synapse_parsers:
+        logger.debug("Reusing the parser of " + type(synapse).__name__ + ".")
+        _synapse_parsers.move_to_end(key)
+        synapse_parser = _synapse_parsers[key]
+        synapse.attributes = synapse_parser.attributes
+        synapse.pre_attributes = pre.attributes
+        synapse.post_attributes = post.attributes
+        synapse._parser = synapse_parser
+        return synapse_parser
+
+    synapse_parser = parser.SynapseParser(synapse, pre, post)
+    synapse_parser.extract_variables()
+    synapse_parser.analyse_equations()
+
+    _store(_synapse_parsers, key, synapse_parser)
+
+    return synapse_parser
+
+
+def _store(parsers:collections.OrderedDict, key:tuple, value):
+    "Adds a parser to the cache and removes the least recently used ones above `max_entries`."
+
+    parsers[key] = value
+    while len(parsers) > max_entries:
+        parsers.popitem(last=False)
+
+
+def clear():
+    """Empties the parser cache.
+    """
+
+    _neuron_parsers.clear()
+    _synapse_parsers.clear()
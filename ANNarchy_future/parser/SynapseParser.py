@@ -20,11 +20,9 @@ class SynapseParser(object):
         attributes (list): list of attributes (parameters and variables)
         parameters (list): list of parameters
         variables (list): list of variables
-
-        TODO:
+        dtypes (dict): numerical type of each attribute ('float', 'int' or 'bool').
         update_equations (list): update equations.
-        spike_condition (Condition): spike condition.
-        reset_equations (list): reset equations.
+        transmit_equation (dict): increment of the post-synaptic target, None if `transmit()` is not defined.
     """
 
     def __init__(self, 
@@ -55,10 +53,13 @@ class SynapseParser(object):
         self.parameters = []
         self.variables = []
         self.shared = []
+        self.dtypes = {}
 
         # Equations to retrieve
         self.update_equations = []
         self.update_dependencies = []
+        self.transmit_equation = None
+        self.transmit_dependencies = []
 
     def is_spiking(self) -> bool:
         "Returns True if the Neuron class is spiking."
@@ -75,6 +76,7 @@ class SynapseParser(object):
         * `self.parameters`
         * `self.variables`
         * `self.shared`
+        * `self.dtypes`
 
         """
 
@@ -91,10 +93,11 @@ class SynapseParser(object):
                 self.variables.append(attr)
                 self.attributes.append(attr)
 
-        # Shared variables
+        # Shared variables and numerical types
         for attr in self.attributes:
             if getattr(self.synapse, attr)._shared:
                 self.shared.append(attr)
+            self.dtypes[attr] = getattr(self.synapse, attr)._dtype_string
 
         # Get lists of parameters and variables
         self._logger.info("Attributes: " + str(self.attributes))
@@ -111,13 +114,12 @@ class SynapseParser(object):
 
         """Analyses the synapse equations.
 
-        Calls update(), spike() and reset() to retrieve the `Equations` objects.
+        Calls update() and transmit() to retrieve the `Equations` objects.
 
         Sets:
 
         * `self.update_equations`
-        * `self.spike_condition`
-        * `self.reset_equations`
+        * `self.transmit_equation`
 
         """
 
@@ -146,6 +148,19 @@ class SynapseParser(object):
                 self.update_equations, self.update_dependencies =  self.process_equations(self.synapse._current_eq)
                 self.synapse._current_eq = []
 
+        if 'transmit' in callables:
+            self._logger.info("Calling Synapse.transmit().")
+
+            try:
+                with self.synapse.Equations() as s:
+                    self.synapse.transmit(s)
+            except Exception:
+                self._logger.exception("Error when parsing " + self.name + ".transmit().")
+                sys.exit(1)
+            else:
+                self.transmit_equation, self.transmit_dependencies = self.process_transmit(self.synapse._current_eq)
+                self.synapse._current_eq = []
+
     def process_equations(self, equations) -> list:
         
         """Checks all declared equations and applies a numerical method if necessary.
@@ -170,6 +185,52 @@ class SynapseParser(object):
 
         return blocks, dependencies
 
+    def process_transmit(self, equations) -> tuple:
+
+        """Extracts the contribution of a single synapse to the post-synaptic target.
+
+        `transmit()` must contain a single increment of the target, for example `s.target += s.w * s.pre.r`.
+
+        Args:
+            equations: list of Equations objects.
+
+        Returns:
+            a dictionary describing the increment and the list of its dependencies.
+        """
+
+        if len(equations) != 1 or len(equations[0].equations) != 1:
+            self._logger.error(self.name + ".transmit() must define a single equation.")
+            sys.exit(1)
+
+        name, eq = equations[0].equations[0]
+        target = equations[0].symbols['target']
+
+        if name != 'target':
+            self._logger.error(self.name + ".transmit() can only modify s.target.")
+            sys.exit(1)
+
+        # The increment must not depend on the current value of the target
+        psp = eq - target
+        free_symbols = psp.free_symbols
+
+        if target in free_symbols:
+            self._logger.error(self.name + ".transmit() must increment the target: s.target += ...")
+            sys.exit(1)
+
+        dependencies = list(set([
+            str(symbol) for symbol in free_symbols if str(symbol) in self.attributes
+        ]))
+
+        equation = {
+            'type': 'transmit',
+            'name': 'target',
+            'op': "+=",
+            'rhs': psp,
+            'human-readable': "target += " + parser.ccode(psp),
+        }
+
+        return equation, dependencies
+
     def __str__(self):
 
         code = "Synapse " + self.name + "\n"
@@ -182,4 +243,8 @@ class SynapseParser(object):
         for block in self.update_equations:
             code += str(block)
 
+        if self.transmit_equation is not None:
+            code += "\nTransmission:\n"
+            code += self.transmit_equation['human-readable'] + "\n"
+
         return code
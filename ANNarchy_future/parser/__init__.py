@@ -3,5 +3,6 @@ from .CodeGeneration import ccode, code_generation
 from .EquationParser import Condition, AssignmentBlock, ODEBlock, get_blocks
 from .NeuronParser import NeuronParser
 from .SynapseParser import SynapseParser
+import ANNarchy_future.parser.ParserCache as ParserCache
 import ANNarchy_future.parser.NumericalMethods as NM
 from .RandomDistributions import Normal
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""Compares two benchmark results produced by `run.py`.
+
+Measurements are matched by network, size, backend, number of threads, fusion and precision.
+A measurement is a regression when it is worse than the baseline by more than the threshold
+(times and memory increase, steps per second decrease). Changes in the generated code are reported.
+The script exits with code 1 if a regression is found, so that it can be used in continuous integration.
+
+    python compare.py baseline.json results.json --threshold 0.1
+"""
+import sys
+import json
+import argparse
+
+# Compared measurements: name -> True if higher is better
+measurements = {
+    'build': False,
+    'generate': False,
+    'compile': False,
+    'instantiate': False,
+    'steps_per_second': True,
+    'peak_memory': False,
+    'network_memory': False,
+}
+
+# Fields identifying a configuration
+configuration = ['network', 'size', 'backend', 'num_threads', 'fused', 'precision']
+
+def load(filename:str) -> tuple:
+    "Returns the metadata and the results indexed by configuration."
+
+    with open(filename, 'r') as f:
+        data = json.load(f)
+
+    results = {}
+    for result in data['results']:
+        results[tuple(result[field] for field in configuration)] = result
+
+    return data['metadata'], results
+
+def compare(baseline:dict, results:dict, threshold:float) -> list:
+    "Prints the relative changes and returns the list of regressions."
+
+    regressions = []
+
+    print("{:<40} {:<18} {:>12} {:>12} {:>9}".format("configuration", "measurement", "baseline", "new", "change"))
+
+    for key, result in results.items():
+
+        name = " ".join(str(field) for field in key)
+
+        if not key in baseline:
+            print("{:<40} not in the baseline".format(name))
+            continue
+
+        reference = baseline[key]
+
+        for measurement, higher_is_better in measurements.items():
+            old, new = reference[measurement], result[measurement]
+            if old <= 0.0:
+                continue
+            change = (new - old) / old
+            regression = -change > threshold if higher_is_better else change > threshold
+            print("{:<40} {:<18} {:>12.4g} {:>12.4g} {:>+8.1f}% {}".format(
+                name, measurement, old, new, 100. * change, "REGRESSION" if regression else ""))
+            if regression:
+                regressions.append((name, measurement, change))
+
+        if reference['code_hash'] != result['code_hash']:
+            print("{:<40} generated code changed ({} -> {} bytes)".format(
+                name, reference['code_size'], result['code_size']))
+
+    return regressions
+
+if __name__ == "__main__":
+
+    argparser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    argparser.add_argument('baseline', type=str, help="JSON file of the reference commit.")
+    argparser.add_argument('results', type=str, help="JSON file of the new commit.")
+    argparser.add_argument('--threshold', type=float, default=0.1,
+        help="relative change above which a measurement is a regression (default: 0.1).")
+    args = argparser.parse_args()
+
+    baseline_metadata, baseline = load(args.baseline)
+    metadata, results = load(args.results)
+
+    print("Baseline:", baseline_metadata['commit'], baseline_metadata['date'])
+    print("New:     ", metadata['commit'], metadata['date'])
+    for field in ['compiler', 'cpu', 'cores']:
+        if baseline_metadata[field] != metadata[field]:
+            print("Warning: different", field, "(" + str(baseline_metadata[field]), "->", str(metadata[field]) + ")")
+    print()
+
+    regressions = compare(baseline, results, args.threshold)
+
+    print()
+    if len(regressions) > 0:
+        print(len(regressions), "regression(s) above", str(100. * args.threshold) + "%.")
+        sys.exit(1)
+
+    print("No regression above", str(100. * args.threshold) + "%.")
@@ -0,0 +1,163 @@
+# pylint: disable=no-member
+"""Compares the separate and fused neural phases on the Izhikevich example.
+
+For each variant, the script reports the measured simulation time per step. As an indication, it also 
+prints an estimate (not a measurement) of the memory traffic per step, obtained by counting the arrays 
+read and written by each loop over neurons, with the item size of their type.
+
+    python fused_update.py --size 100000 --duration 1000 --precision float32
+"""
+import time
+import argparse
+
+import numpy as np
+import sympy as sp
+
+import ANNarchy_future as ann
+import ANNarchy_future.generator as generator
+
+
+class Izhikevich(ann.Neuron):
+
+    def __init__(self, params):
+
+        self.a = self.Parameter(params['a'])
+        self.b = self.Parameter(params['b'])
+        self.c = self.Parameter(params['c'])
+        self.d = self.Parameter(params['d'])
+
+        self.v_thresh = self.Parameter(params['v_thresh'])
+        self.i_offset = self.Parameter(params['i_offset'], shared=False)
+        self.noise = self.Parameter(params['noise'])
+
+        self.ge = self.Variable(init=0.0, input=True)
+        self.gi = self.Variable(init=0.0, input=True)
+
+        self.v = self.Variable(init=-65.0)
+        self.u = self.Variable(init=-13.0)
+
+    def update(self, n, method='midpoint'):
+
+        I = n.ge - n.gi + n.i_offset + n.Normal(0.0, n.noise)
+
+        n.dv_dt = n.cast(4e-2) * (n.v)**2 + n.cast(5.0) * n.v + n.cast(140.0) - n.u + I
+
+        n.du_dt = n.a * (n.b * n.v - n.u)
+
+    def spike(self, n):
+
+        n.spike = (n.v >= n.v_thresh)
+
+    def reset(self, n):
+
+        n.v = n.c
+        n.u += n.d
+
+
+def accessed_arrays(parser, blocks:list) -> tuple:
+    "Returns the sets of arrays read and written in a loop over neurons."
+
+    arrays = [attr for attr in parser.attributes if not attr in parser.shared]
+    arrays += list(parser.random_variables.keys())
+
+    read = set()
+    written = set()
+    for block in blocks:
+        for eq in block.equations:
+            if not isinstance(eq['rhs'], sp.Basic):
+                continue
+            for symbol in eq['rhs'].free_symbols:
+                if str(symbol) in arrays:
+                    read.add(str(symbol))
+            if eq['type'] != 'tmp' and eq['name'] in arrays:
+                written.add(eq['name'])
+                if eq['op'] != "=":
+                    read.add(eq['name'])
+
+    return read, written
+
+def itemsize(parser, name:str, precision:str) -> int:
+    "Size in bytes of an element of the array of an attribute or of a random variable."
+
+    dtype = parser.dtypes[name] if name in parser.attributes else 'float'
+
+    return generator.type_sizes[generator.attribute_type(dtype, precision)]
+
+def estimated_traffic(pop, fused:bool, precision:str) -> int:
+    "Estimates the number of bytes streamed through the cache by the neural phases during one step."
+
+    parser = pop._parser
+
+    def nbytes(names) -> int:
+        return pop.size * sum(itemsize(parser, name, precision) for name in names)
+
+    # Spike condition
+    condition = set(
+        str(symbol) for symbol in parser.spike_condition.equation['eq'].free_symbols
+        if str(symbol) in parser.attributes and not str(symbol) in parser.shared
+    )
+
+    # The reset is only applied to the spiking neurons, it is neglected here.
+    read, written = accessed_arrays(parser, parser.update_equations)
+
+    if fused:
+        # Single pass: each array is read and written at most once, random numbers are not stored
+        read = (read | condition) - set(parser.random_variables.keys())
+        return nbytes(read) + nbytes(written)
+
+    # Random variables used in update() are drawn inline, rng() only writes the arrays of the other ones
+    inline = read & set(parser.random_variables.keys())
+    buffered = set(parser.random_variables.keys()) - inline
+    read = read - inline
+    # update() reads and writes its arrays, spike() reads the arrays of the condition
+    return nbytes(buffered) + nbytes(read) + nbytes(written) + nbytes(condition)
+
+def run(size:int, duration:float, fused:bool, backend:str, precision:str) -> dict:
+    "Builds and simulates the network."
+
+    net = ann.Network(dt=0.1, verbose=0, compile_dir="./annarchy_fused_" + str(fused) + "/")
+
+    params = {
+        'a': 0.02, 'b': 0.2, 'c': -65., 'd': 8.,
+        'v_thresh': 30., 'i_offset': 0.0, 'noise': 1.0
+    }
+    pop = net.add(size, Izhikevich(params))
+    pop.i_offset = np.random.uniform(0.0, 10.0, size)
+
+    net.compile(backend=backend, fused=fused, precision=precision)
+
+    nb_steps = int(duration / net.dt)
+    tstart = time.time()
+    net.simulate(duration)
+    elapsed = time.time() - tstart
+
+    return {
+        'time_per_step': elapsed / nb_steps,
+        'estimated_traffic_per_step': estimated_traffic(pop, fused, precision),
+    }
+
+if __name__ == "__main__":
+
+    argparser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    argparser.add_argument('--size', type=int, default=100000, help="number of neurons.")
+    argparser.add_argument('--duration', type=float, default=1000., help="simulated duration in ms.")
+    argparser.add_argument('--backend', type=str, default='single', help="'single' or 'openmp'.")
+    argparser.add_argument('--precision', type=str, default='float64', help="'float64' or 'float32'.")
+    args = argparser.parse_args()
+
+    results = {}
+    for fused in [False, True]:
+        results[fused] = run(args.size, args.duration, fused, args.backend, args.precision)
+
+    print("Izhikevich network of", args.size, "neurons,", args.backend, "backend,", args.precision + ".")
+    print("{:>10} {:>18} {:>32}".format("", "time/step (ms)", "estimated memory traffic/step (MB)"))
+    for fused, res in results.items():
+        print("{:>10} {:>18.4f} {:>32.2f}".format(
+            "fused" if fused else "separate",
+            1000. * res['time_per_step'],
+            res['estimated_traffic_per_step'] / 1024**2,
+        ))
+    print("Speedup: {:.2f}x (estimated traffic reduction: {:.1f}x)".format(
+        results[False]['time_per_step'] / results[True]['time_per_step'],
+        results[False]['estimated_traffic_per_step'] / results[True]['estimated_traffic_per_step'],
+    ))
@@ -0,0 +1,227 @@
+# pylint: disable=no-member
+"""Standard networks used by the benchmarks.
+
+Each builder adds its populations and projections to an existing `Network` and returns the list of populations:
+
+* `izhikevich`: pulse-coupled Izhikevich neurons with noise (80% excitatory, 20% inhibitory).
+* `coba`: conductance-based leaky integrate-and-fire neurons (COBA benchmark of Vogels and Abbott, 2005).
+* `rate_coded`: rate-coded neurons with plastic (Hebbian) projections.
+
+The number of synapses per neuron is kept constant when the size increases.
+"""
+import numpy as np
+import sympy as sp
+
+import ANNarchy_future as ann
+
+
+###########################################################################
+# Izhikevich
+###########################################################################
+class Izhikevich(ann.Neuron):
+
+    def __init__(self, params):
+
+        self.a = self.Parameter(params['a'], shared=False)
+        self.b = self.Parameter(params['b'], shared=False)
+        self.c = self.Parameter(params['c'], shared=False)
+        self.d = self.Parameter(params['d'], shared=False)
+
+        self.v_thresh = self.Parameter(30.0)
+        self.noise = self.Parameter(params['noise'])
+
+        self.ge = self.Variable(init=0.0, input=True)
+        self.gi = self.Variable(init=0.0, input=True)
+
+        self.v = self.Variable(init=-65.0)
+        self.u = self.Variable(init=-13.0)
+
+    def update(self, n, method='midpoint'):
+
+        I = n.ge - n.gi + n.Normal(0.0, n.noise)
+
+        n.dv_dt = n.cast(4e-2) * (n.v)**2 + n.cast(5.0) * n.v + n.cast(140.0) - n.u + I
+
+        n.du_dt = n.a * (n.b * n.v - n.u)
+
+    def spike(self, n):
+
+        n.spike = (n.v >= n.v_thresh)
+
+    def reset(self, n):
+
+        n.v = n.c
+        n.u += n.d
+
+
+class Pulse(ann.Synapse):
+
+    def __init__(self):
+
+        self.w = self.Variable(init=0.0)
+
+    def transmit(self, s):
+
+        s.target += s.w
+
+
+def izhikevich(net:'ann.Network', size:int) -> list:
+    "Izhikevich (2003) network with random excitatory and inhibitory connections."
+
+    nb_exc = int(0.8 * size)
+    nb_inh = size - nb_exc
+
+    rng = np.random.default_rng(0)
+
+    exc = net.add(nb_exc, Izhikevich({'a': 0.02, 'b': 0.2, 'c': -65., 'd': 8., 'noise': 5.0}))
+    re = rng.random(nb_exc)
+    exc.c = -65.0 + 15.0 * re**2
+    exc.d = 8.0 - 6.0 * re**2
+
+    inh = net.add(nb_inh, Izhikevich({'a': 0.02, 'b': 0.25, 'c': -65., 'd': 2., 'noise': 2.0}))
+    ri = rng.random(nb_inh)
+    inh.a = 0.02 + 0.08 * ri
+    inh.b = 0.25 - 0.05 * ri
+
+    probability = min(1.0, 100.0 / size)
+    for pre, target, w in [(exc, 'ge', 0.5), (inh, 'gi', 1.0)]:
+        for post in [exc, inh]:
+            proj = net.connect(pre, post, target, Pulse())
+            proj.fixed_probability(probability, w=w)
+
+    return [exc, inh]
+
+
+###########################################################################
+# COBA
+###########################################################################
+class COBA(ann.Neuron):
+
+    def __init__(self):
+
+        self.tau_m = self.Parameter(20.0)
+        self.tau_e = self.Parameter(5.0)
+        self.tau_i = self.Parameter(10.0)
+        self.E_L = self.Parameter(-49.0)
+        self.E_e = self.Parameter(0.0)
+        self.E_i = self.Parameter(-80.0)
+        self.v_thresh = self.Parameter(-50.0)
+        self.v_reset = self.Parameter(-60.0)
+
+        self.ge = self.Variable(init=0.0, input=True)
+        self.gi = self.Variable(init=0.0, input=True)
+
+        self.g_exc = self.Variable(init=0.0)
+        self.g_inh = self.Variable(init=0.0)
+        self.v = self.Variable(init=-60.0)
+
+    def update(self, n, method='exponential'):
+
+        n.dv_dt = (n.E_L - n.v + n.g_exc * (n.E_e - n.v) + n.g_inh * (n.E_i - n.v)) / n.tau_m
+
+        n.dg_exc_dt = - n.g_exc / n.tau_e
+        n.dg_inh_dt = - n.g_inh / n.tau_i
+
+        n.g_exc += n.ge
+        n.g_inh += n.gi
+
+    def spike(self, n):
+
+        n.spike = (n.v >= n.v_thresh)
+
+    def reset(self, n):
+
+        n.v = n.v_reset
+
+
+def coba(net:'ann.Network', size:int) -> list:
+    "COBA network of Vogels and Abbott (2005): 80% excitatory, 20% inhibitory, about 80 synapses per neuron."
+
+    nb_exc = int(0.8 * size)
+    nb_inh = size - nb_exc
+
+    rng = np.random.default_rng(0)
+
+    exc = net.add(nb_exc, COBA())
+    exc.v = -60.0 + 10.0 * rng.random(nb_exc)
+
+    inh = net.add(nb_inh, COBA())
+    inh.v = -60.0 + 10.0 * rng.random(nb_inh)
+
+    probability = min(1.0, 80.0 / size)
+    for pre, target, w in [(exc, 'ge', 0.6), (inh, 'gi', 6.7)]:
+        for post in [exc, inh]:
+            proj = net.connect(pre, post, target, Pulse())
+            proj.fixed_probability(probability, w=w)
+
+    return [exc, inh]
+
+
+###########################################################################
+# Rate-coded
+###########################################################################
+class RateCoded(ann.Neuron):
+
+    def __init__(self, tau):
+
+        self.tau = self.Parameter(tau)
+
+        self.ge = self.Variable(init=0.0, input=True)
+        self.v = self.Variable(init=0.0)
+        self.r = self.Variable(init=0.0, output=True)
+
+    def update(self, n, method='rk4'):
+
+        n.dv_dt = (n.ge + n.Uniform(-0.1, 0.1) - n.v) / n.tau
+        n.r = n.clip(sp.tanh(n.v), 0.0)
+
+
+class Input(ann.Neuron):
+
+    def __init__(self):
+
+        self.tau = self.Parameter(10.0)
+        self.r = self.Variable(init=0.5, output=True)
+
+    def update(self, n, method='exponential'):
+
+        n.dr_dt = (n.Normal(0.5, 0.1) - n.r) / n.tau
+
+
+class Hebb(ann.Synapse):
+
+    def __init__(self, eta):
+
+        self.eta = self.Parameter(eta)
+        self.w = self.Variable(init=0.0)
+
+    def update(self, s):
+
+        s.w += s.eta * s.pre.r * s.post.r
+
+    def transmit(self, s):
+
+        s.target += s.w * s.pre.r
+
+
+def rate_coded(net:'ann.Network', size:int) -> list:
+    "Input layer projecting on two rate-coded layers with Hebbian learning, about 100 synapses per neuron."
+
+    inp = net.add(size, Input())
+    hidden = net.add(size, RateCoded(tau=20.0))
+    output = net.add(size, RateCoded(tau=10.0))
+
+    probability = min(1.0, 100.0 / size)
+    for pre, post in [(inp, hidden), (hidden, output)]:
+        proj = net.connect(pre, post, 'ge', Hebb(eta=1e-4))
+        proj.fixed_probability(probability, w=0.01)
+
+    return [inp, hidden, output]
+
+
+# Available networks
+networks = {
+    'izhikevich': izhikevich,
+    'coba': coba,
+    'rate_coded': rate_coded,
+}
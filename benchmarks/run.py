@@ -0,0 +1,207 @@
+"""Benchmarks the compilation and simulation of standard networks.
+
+For each network (see `networks.py`) and size, the benchmark measures in a separate process:
+
+* `build`: creation of the populations and projections, including the parsing of the equations.
+* `generate`, `write`, `compile`, `load`: phases of the compilation (`Compiler.timings`).
+  The library is always compiled (the compilation cache is disabled).
+* `instantiate`: creation of the C++ objects and of the connectivity.
+* `steps_per_second`: simulation throughput.
+* `peak_memory` and `network_memory`: peak resident memory of the process and increase of the
+  resident memory caused by the compilation and instantiation of the network, in MB.
+* `code_hash` and `code_size`: SHA-256 and size in bytes of the generated sources, to detect
+  changes in the output of the code generators.
+
+The results are saved as JSON and can be compared across commits with `compare.py`:
+
+    python run.py --networks izhikevich coba rate_coded --sizes 1000 4000 --output results.json
+    python compare.py baseline.json results.json
+"""
+import sys, os
+import json
+import time
+import hashlib
+import argparse
+import platform
+import resource
+import datetime
+import tempfile
+import shutil
+import subprocess
+
+import numpy as np
+
+def resident_memory() -> float:
+    "Current resident memory of the process in MB (0 if unavailable)."
+
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 1024**2
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+def peak_memory() -> float:
+    "Peak resident memory of the process in MB."
+
+    # ru_maxrss is in kB on Linux and in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return maxrss / 1024**2
+    return maxrss / 1024
+
+def run(network:str, size:int, duration:float, backend:str, num_threads:int, fused:bool, precision:str) -> dict:
+    "Builds, compiles and simulates a network in the current process."
+
+    import ANNarchy_future as ann
+    from networks import networks
+
+    compile_dir = tempfile.mkdtemp(prefix="annarchy_benchmark_")
+
+    try:
+        net = ann.Network(dt=0.1, seed=42, verbose=0, compile_dir=compile_dir)
+
+        # Construction and parsing (the parser cache is empty in a new process)
+        tstart = time.time()
+        populations = networks[network](net, size)
+        t_build = time.time() - tstart
+
+        # Compilation
+        memory_before = resident_memory()
+        tstart = time.time()
+        net.compile(backend=backend, num_threads=num_threads, fused=fused, precision=precision, cache=False)
+        t_compile = time.time() - tstart
+        memory_after = resident_memory()
+
+        timings = net._compiler.timings
+        sources = net._compiler.sources
+
+        h = hashlib.sha256()
+        for filename in sorted(sources.keys()):
+            h.update(filename.encode('utf-8'))
+            h.update(sources[filename].encode('utf-8'))
+
+        # Simulation
+        nb_steps = int(duration / net.dt)
+        tstart = time.time()
+        net.simulate(duration)
+        t_simulate = time.time() - tstart
+
+        return {
+            'network': network,
+            'size': size,
+            'neurons': sum([pop.size for pop in populations]),
+            'synapses': sum([proj.nb_synapses for proj in net._projections]),
+            'backend': backend,
+            'num_threads': num_threads,
+            'fused': fused,
+            'precision': precision,
+            'build': t_build,
+            'generate': timings['generate'],
+            'write': timings['write'],
+            'compile': timings['compile'],
+            'load': timings['load'],
+            'instantiate': t_compile - sum(timings.values()),
+            'steps_per_second': nb_steps / t_simulate,
+            'peak_memory': peak_memory(),
+            'network_memory': memory_after - memory_before,
+            'code_hash': h.hexdigest(),
+            'code_size': sum([len(code) for code in sources.values()]),
+        }
+
+    finally:
+        shutil.rmtree(compile_dir, True)
+
+def metadata() -> dict:
+    "Information about the commit, the tools and the machine."
+
+    import ANNarchy_future as ann
+    import sympy
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def command(args:list) -> str:
+        try:
+            return subprocess.run(args, cwd=root, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL).stdout.decode('utf-8').strip()
+        except OSError:
+            return ""
+
+    try:
+        import Cython
+        cython_version = Cython.__version__
+    except ImportError:
+        cython_version = ""
+
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo", 'r') as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+
+    return {
+        'commit': command(["git", "rev-parse", "HEAD"]),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'sympy': sympy.__version__,
+        'cython': cython_version,
+        'compiler': command(["g++", "-dumpfullversion", "-dumpversion"]),
+        'platform': platform.platform(),
+        'cpu': cpu,
+        'cores': os.cpu_count(),
+    }
+
+if __name__ == "__main__":
+
+    argparser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    argparser.add_argument('--networks', type=str, nargs='+', default=['izhikevich', 'coba', 'rate_coded'],
+        help="networks to benchmark.")
+    argparser.add_argument('--sizes', type=int, nargs='+', default=[1000, 4000], help="number of neurons.")
+    argparser.add_argument('--duration', type=float, default=1000., help="simulated duration in ms.")
+    argparser.add_argument('--backend', type=str, default='single', help="'single' or 'openmp'.")
+    argparser.add_argument('--num-threads', type=int, default=None, help="number of threads (openmp).")
+    argparser.add_argument('--fused', action='store_true', help="fuses the neural phases.")
+    argparser.add_argument('--precision', type=str, default='float64', help="'float64' or 'float32'.")
+    argparser.add_argument('--output', type=str, default='benchmark.json', help="JSON file.")
+    argparser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = argparser.parse_args()
+
+    # Single measurement, printed as JSON on the last line
+    if args.worker:
+        result = run(args.networks[0], args.sizes[0], args.duration,
+            args.backend, args.num_threads, args.fused, args.precision)
+        print(json.dumps(result))
+        sys.exit(0)
+
+    # Each measurement runs in its own process, so that the memory and the caches are not shared
+    results = []
+    for network in args.networks:
+        for size in args.sizes:
+            print("Benchmarking", network, "with", size, "neurons...", flush=True)
+            command = [sys.executable, os.path.abspath(__file__), '--worker',
+                '--networks', network, '--sizes', str(size), '--duration', str(args.duration),
+                '--backend', args.backend, '--precision', args.precision]
+            if args.num_threads is not None:
+                command += ['--num-threads', str(args.num_threads)]
+            if args.fused:
+                command += ['--fused']
+
+            process = subprocess.run(command, cwd=os.path.dirname(os.path.abspath(__file__)),
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            if process.returncode != 0:
+                print(process.stderr.decode('utf-8'))
+                sys.exit(1)
+
+            result = json.loads(process.stdout.decode('utf-8').strip().split("\n")[-1])
+            print("    compile: {:.2f} s, {:.0f} steps/s".format(result['compile'], result['steps_per_second']))
+            results.append(result)
+
+    with open(args.output, 'w') as f:
+        json.dump({'metadata': metadata(), 'results': results}, f, indent=2)
+
+    print("Results saved in", args.output)
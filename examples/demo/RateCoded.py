@@ -21,6 +21,7 @@ class RateCoded(ann.Neuron):
         self.r_mean = self.Variable(0.0, shared=True)
 
         self.ge = self.Variable(init=0.0, input=True)
+        self.gi = self.Variable(init=0.0, input=True)
 
         self.v = self.Variable(init=0.0)
         self.r = self.Variable(init=0.0, output=True)
@@ -31,7 +32,7 @@ class RateCoded(ann.Neuron):
         shunting = n.ite(n.ge > 1, n.ge, 0)
         
         # ODEs use the dX_dt trick
-        n.dv_dt = (n.ge + shunting + sp.exp(n.v**3) + n.Uniform(-1, 1) - n.v) / n.tau
+        n.dv_dt = (n.ge - n.gi + shunting + sp.exp(n.v**3) + n.Uniform(-1, 1) - n.v) / n.tau
         
         n.v = n.clip(n.v, 0.0) # sets minimum bound
         #n.v = n.clip(n.v, None, 1.0) # sets maximum bound
@@ -76,7 +77,8 @@ proj = net.connect(pop, pop, 'ge', Hebb(eta=0.01))
 
 proj2 = net.connect(pop, pop2, 'gi', Hebb(eta=0.01))
 
-# proj.dense(w=1.0)
+proj.dense(w=1.0)
+proj2.fixed_probability(0.5, w=0.5)
 
 net.compile()
 
@@ -23,28 +23,22 @@ class Izhikevich(ann.Neuron):
         self.v = self.Variable(init=-65.0)
         self.u = self.Variable(init=-13.0)
 
-    def update(self):
+    def update(self, n, method='midpoint'):
 
-        with self.Equations(method="midpoint") as n:
+        I = n.ge - n.gi + n.i_offset # + noise
 
-            I = n.ge - n.gi + n.i_offset # + noise
-
-            n.dv_dt = n.cast(4e-2) * (n.v)**2 + n.cast(5.0) * n.v + n.cast(140.0) - n.u + I
-            
-            n.du_dt = n.a * (n.b * n.v - n.u) 
-
-    def spike(self):
-
-        with self.Equations() as n:
+        n.dv_dt = n.cast(4e-2) * (n.v)**2 + n.cast(5.0) * n.v + n.cast(140.0) - n.u + I
+        
+        n.du_dt = n.a * (n.b * n.v - n.u) 
 
-            n.spike = (n.v >= n.v_thresh)
+    def spike(self, n):
 
-    def reset(self):
+        n.spike = (n.v >= n.v_thresh)
 
-        with self.Equations() as n: 
+    def reset(self, n):
 
-            n.v = n.c
-            n.u += n.d 
+        n.v = n.c
+        n.u += n.d 
 
 
 net = ann.Network()